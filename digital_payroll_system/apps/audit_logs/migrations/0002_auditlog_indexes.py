@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit_logs', '0001_initial'),
+        ('profiles', '0008_profile_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='auditlog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action', 'created_at'], name='auditlog_action_created_idx'),
+        ),
+    ]
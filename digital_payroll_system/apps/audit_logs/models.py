@@ -7,5 +7,11 @@ class AuditLog(BaseModel):
     action = models.CharField(max_length=100)
     description = models.TextField()
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='auditlog_created_idx'),
+            models.Index(fields=['action', 'created_at'], name='auditlog_action_created_idx'),
+        ]
+
     def __str__(self):
         return f"[{self.created_at}] {self.action} - {self.profile}"
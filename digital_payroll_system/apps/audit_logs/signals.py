@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.audit_logs.models import AuditLog
+from common.cache import bump_cache_version
+
+
+@receiver(post_save, sender=AuditLog)
+def audit_log_created(sender, created, **kwargs):
+    if created:
+        bump_cache_version('audit-logs')
@@ -1,3 +1,65 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from common.tests.query_plans import QueryPlanAssertionsMixin
+from .models import AuditLog
+from .views import day_start
 
-# Create your tests here.
+
+class AuditLogQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """Las consultas de logs y de auditoría de seguridad sobre AuditLog deben resolverse con índices."""
+
+    table = AuditLog._meta.db_table
+
+    def setUp(self):
+        admin = User.objects.create(username='admin')
+        admin.profile.role = 'admin'
+        admin.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        # Un log por hora hacia atrás: created_at es auto_now_add, así que se fija el reloj de cada alta.
+        now = timezone.now()
+        clock = (now - timedelta(hours=i) for i in range(5000) for _ in ('created_at', 'updated_at'))
+        with patch('django.db.models.fields.timezone.now', side_effect=clock):
+            AuditLog.objects.bulk_create([
+                AuditLog(action='LOGIN_FAILED' if i % 100 == 0 else 'VISUALIZAR BOLETA', description=f'log {i}')
+                for i in range(5000)
+            ])
+
+    def get(self, url, **params):
+        return lambda: self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def test_logs_page(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/logs/', pagination='cursor'),
+            self.table,
+            index='auditlog_created_idx'
+        )
+
+    def test_logs_date_range(self):
+        today = timezone.localdate()
+        self.assertQueriesUseIndex(
+            self.get(
+                '/api/audit-logs/logs/',
+                start_date=day_start(today - timedelta(days=2)).isoformat(),
+                end_date=day_start(today).isoformat()
+            ),
+            self.table
+        )
+
+    def test_failed_logins(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/security-audit/'),
+            self.table,
+            index='auditlog_action_created_idx',
+            contains="'LOGIN_FAILED'"
+        )
+
+    def test_day_start_is_local_midnight(self):
+        start = day_start(timezone.localdate())
+        self.assertEqual(timezone.localtime(start).hour, 0)
+        self.assertTrue(timezone.is_aware(start))
@@ -3,18 +3,27 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils.timezone import now
-from django.db.models import Count, Q, Max, Avg, Value
+from django.db.models import Count, Max, Avg, Value
 from django.db.models.functions import ExtractHour
 from datetime import date, timedelta
 from apps.profiles.models import Profile
 from apps.payslips.models import Payslip
 from common.response_handler import APIResponse
+from common.cache import cache_version
+from common.conditional import make_etag, not_modified_response, set_validators
 from .models import AuditLog
 from django.db.models.functions import Concat
 from django.utils.dateparse import parse_datetime
 from django.core.paginator import Paginator
+from common.pagination import InvalidCursor, paginate_by_cursor, wants_cursor_pagination
 from datetime import datetime
-from django.db.models import F, ExpressionWrapper, DurationField
+from django.db.models import F, ExpressionWrapper, DurationField, Exists, OuterRef
+from django.utils import timezone
+
+
+def day_start(day):
+    """Inicio del día en la zona horaria local, para filtrar `created_at` por rango y no con __date."""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
 
 class AuditDashboardViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated] 
@@ -27,21 +36,28 @@ class AuditDashboardViewSet(viewsets.ViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        # Las cifras dependen de los datos y también del día y la hora (actividad por hora).
+        versions = tuple(cache_version(name) for name in ('profiles', 'payslip-summaries', 'audit-logs'))
+        etag = make_etag('dashboard-stats', versions, date.today(), datetime.now().hour)
+        not_modified = not_modified_response(request, etag)
+        if not_modified:
+            return not_modified
+
         today = date.today()
+        today_range = (day_start(today), day_start(today + timedelta(days=1)))
 
         total_users = Profile.objects.count()
-        today_registered = Profile.objects.filter(created_at__date=today).count()
+        today_registered = Profile.objects.filter(created_at__gte=today_range[0], created_at__lt=today_range[1]).count()
 
         users_never_seen = (
             Profile.objects
             .filter(resigned=False)
-            .annotate(seen_count=Count('payslips', filter=Q(payslips__view_status='seen')))
-            .filter(seen_count=0)
+            .exclude(Exists(Payslip.objects.filter(profile=OuterRef('pk'), view_status='seen')))
             .count()
         )
 
         inactive_users = Profile.objects.filter(
-            last_login__lt=today - timedelta(days=15),
+            last_login__lt=day_start(today - timedelta(days=15)),
             resigned=False
         ).count()
         
@@ -64,7 +80,7 @@ class AuditDashboardViewSet(viewsets.ViewSet):
             )
         ).aggregate(avg=Avg('time_to_open'))['avg']
 
-        logs_today = AuditLog.objects.filter(created_at__date=today).count()
+        logs_today = AuditLog.objects.filter(created_at__gte=today_range[0], created_at__lt=today_range[1]).count()
 
         top_users = (
             AuditLog.objects
@@ -82,7 +98,7 @@ class AuditDashboardViewSet(viewsets.ViewSet):
 
         raw_activity = (
             AuditLog.objects
-            .filter(created_at__date=today)
+            .filter(created_at__gte=today_range[0], created_at__lt=today_range[1])
             .annotate(hour=ExtractHour('created_at'))
             .values('hour')
             .annotate(total=Count('id'))
@@ -127,12 +143,15 @@ class AuditDashboardViewSet(viewsets.ViewSet):
             }
         }
 
-        return Response(
-            APIResponse.success(
-                data=data,
-                message="Dashboard unificado obtenido correctamente."
+        return set_validators(
+            Response(
+                APIResponse.success(
+                    data=data,
+                    message="Dashboard unificado obtenido correctamente."
+                ),
+                status=status.HTTP_200_OK
             ),
-            status=status.HTTP_200_OK
+            etag
         )
 
     @action(detail=False, methods=['get'], url_path='logs')
@@ -142,7 +161,7 @@ class AuditDashboardViewSet(viewsets.ViewSet):
         - Filtrado por rango de fechas
         - Filtrado por usuario
         - Filtrado por acción
-        - Paginación
+        - Paginación (por página o, con ?pagination=cursor, por llave (created_at, id))
         """
         if not hasattr(request.user, 'profile') or request.user.profile.role != 'admin':
             return Response(
@@ -173,8 +192,21 @@ class AuditDashboardViewSet(viewsets.ViewSet):
         if action_filter:
             logs = logs.filter(action__icontains=action_filter)
 
-        paginator = Paginator(logs, limit)
-        page_obj = paginator.get_page(page)
+        logs = logs.select_related('profile__user')
+
+        if wants_cursor_pagination(request):
+            try:
+                page_logs, pagination = paginate_by_cursor(logs, request, ('created_at', 'id'), limit)
+            except InvalidCursor:
+                return Response(
+                    APIResponse.error("Cursor de paginación inválido.", code=status.HTTP_400_BAD_REQUEST),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            paginator = Paginator(logs, limit)
+            page_obj = paginator.get_page(page)
+            page_logs = page_obj.object_list
+            pagination = None
 
         results = [
             {
@@ -185,20 +217,27 @@ class AuditDashboardViewSet(viewsets.ViewSet):
                 "description": log.description,
                 "created_at": log.created_at,
             }
-            for log in page_obj.object_list
+            for log in page_logs
         ]
 
-        data = {
-            "total_logs": paginator.count,
-            "total_pages": paginator.num_pages,
-            "current_page": page_obj.number,
-            "results": results
-        }
+        if pagination is None:
+            data = {
+                "total_logs": paginator.count,
+                "total_pages": paginator.num_pages,
+                "current_page": page_obj.number,
+                "results": results
+            }
+        else:
+            data = {
+                "total_logs": pagination.get("total_items"),
+                "results": results
+            }
 
         return Response(
             APIResponse.success(
                 data=data,
-                message="Registros de auditoría obtenidos correctamente."
+                message="Registros de auditoría obtenidos correctamente.",
+                meta={"pagination": pagination} if pagination else None
             ),
             status=status.HTTP_200_OK
         )
@@ -235,8 +274,8 @@ class AuditDashboardViewSet(viewsets.ViewSet):
 
         inactive_profiles = Profile.objects.filter(
             is_active=True,
-            last_login__lt=limit_date
-        ).values(
+            last_login__lt=day_start(limit_date)
+        ).order_by('last_login').values(
             'dni',
             'user__first_name',
             'user__last_name',
@@ -278,7 +317,7 @@ class AuditDashboardViewSet(viewsets.ViewSet):
 
         admin_actions_last_30d = AuditLog.objects.filter(
             profile__role='admin',
-            created_at__date__gte=limit_date
+            created_at__gte=day_start(limit_date)
         ).count()
 
         recent_admin_actions_qs = (
@@ -0,0 +1,28 @@
+from django.contrib import admin
+from .models import ImportJob, ImportJobError
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'kind',
+        'status',
+        'original_name',
+        'processed_rows',
+        'total_rows',
+        'created_count',
+        'updated_count',
+        'skipped_count',
+        'attempts',
+        'created_at',
+    )
+
+    list_filter = ('kind', 'status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'finished_at')
+
+
+@admin.register(ImportJobError)
+class ImportJobErrorAdmin(admin.ModelAdmin):
+    list_display = ('job', 'row_number', 'message')
+    search_fields = ('message',)
+    ordering = ('job', 'row_number')
@@ -0,0 +1,43 @@
+from apps.payslips.services.payslip_import import (
+    PAYSLIP_COLUMN_LOOKUP,
+    REQUIRED_PAYSLIP_COLUMNS,
+    import_payslip_rows,
+    load_profile_ids,
+)
+from apps.profiles.services.user_import import (
+    REQUIRED_COLUMNS,
+    USER_COLUMN_LOOKUP,
+    import_user_rows,
+)
+from apps.profiles.services.work_details_import import (
+    WORK_DETAILS_COLUMN_LOOKUP,
+    WORK_DETAILS_COLUMNS,
+    import_work_details_rows,
+)
+
+
+def payslip_processor():
+    profile_ids = load_profile_ids()
+    return lambda rows: import_payslip_rows(rows, profile_ids=profile_ids)
+
+
+IMPORTERS = {
+    'payslips': {
+        'lookup': PAYSLIP_COLUMN_LOOKUP,
+        'required_columns': (REQUIRED_PAYSLIP_COLUMNS,),
+        'audit_action': "CARGA DE BOLETAS",
+        'make_processor': payslip_processor,
+    },
+    'users': {
+        'lookup': USER_COLUMN_LOOKUP,
+        'required_columns': (REQUIRED_COLUMNS,),
+        'audit_action': "CARGA DE USUARIOS",
+        'make_processor': lambda: import_user_rows,
+    },
+    'work_details': {
+        'lookup': WORK_DETAILS_COLUMN_LOOKUP,
+        'required_columns': (WORK_DETAILS_COLUMNS,),
+        'audit_action': "CARGA DE WORK DETAILS",
+        'make_processor': lambda: import_work_details_rows,
+    },
+}
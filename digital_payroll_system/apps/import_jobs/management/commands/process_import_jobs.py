@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.import_jobs.services.job_runner import run_worker
+
+
+class Command(BaseCommand):
+    help = "Procesa los trabajos de importación de Excel pendientes (boletas, usuarios y work details)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Procesa los trabajos pendientes y termina.")
+        parser.add_argument('--sleep', type=float, default=2, help="Segundos de espera cuando no hay trabajos.")
+        parser.add_argument('--chunk-size', type=int, default=None, help="Filas por bloque confirmado.")
+
+    def handle(self, *args, **options):
+        run_worker(
+            once=options['once'],
+            sleep=options['sleep'],
+            chunk_size=options['chunk_size'],
+        )
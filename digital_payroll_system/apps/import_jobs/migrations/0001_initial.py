@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('profiles', '0006_profile_last_login'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated.')),
+                ('kind', models.CharField(choices=[('payslips', 'Boletas'), ('users', 'Usuarios'), ('work_details', 'Work Details')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('completed', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=20)),
+                ('file', models.FileField(upload_to='imports/')),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('updated_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to='profiles.profile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportJobError',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated.')),
+                ('row_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('message', models.TextField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='errors', to='import_jobs.importjob')),
+            ],
+            options={
+                'ordering': ['row_number', 'created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import models
+from common.base_models import BaseModel
+from apps.profiles.models import Profile
+
+class ImportJob(BaseModel):
+    KIND_CHOICES = (
+        ('payslips', 'Boletas'),
+        ('users', 'Usuarios'),
+        ('work_details', 'Work Details'),
+    )
+
+    STATUS_CHOICES = (
+        ('pending', 'Pendiente'),
+        ('running', 'En proceso'),
+        ('completed', 'Completado'),
+        ('failed', 'Fallido'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='imports/')
+    original_name = models.CharField(max_length=255, blank=True)
+    requested_by = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"ImportJob {self.kind} ({self.status})"
+
+class ImportJobError(BaseModel):
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='errors')
+    row_number = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField()
+
+    class Meta:
+        ordering = ['row_number', 'created_at']
+
+    def __str__(self):
+        return f"[{self.job_id}] Fila {self.row_number}: {self.message}"
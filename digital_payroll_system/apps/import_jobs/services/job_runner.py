@@ -0,0 +1,153 @@
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from itertools import islice
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.audit_logs.models import AuditLog
+from common.excel_reader import ExcelSheetReader, missing_columns
+from ..importers import IMPORTERS
+from ..models import ImportJob, ImportJobError
+
+logger = logging.getLogger(__name__)
+
+def enqueue_import_job(kind, file, profile):
+    job = ImportJob(kind=kind, original_name=file.name, requested_by=profile)
+    job.file.save(file.name, file, save=False)
+    job.save()
+    return job
+
+def reclaim_stale_jobs():
+    """
+    Devuelve a 'pending' los trabajos 'running' cuyo worker dejó de avanzar (sin guardar
+    progreso durante IMPORT_JOB_STALE_AFTER segundos). Los que ya agotaron sus intentos
+    se marcan como fallidos. `.update()` no aplica auto_now, por eso se fija `updated_at`.
+    """
+    now = timezone.now()
+    stale = ImportJob.objects.filter(
+        status='running',
+        updated_at__lt=now - timedelta(seconds=settings.IMPORT_JOB_STALE_AFTER)
+    )
+    failed = stale.filter(attempts__gte=settings.IMPORT_JOB_MAX_ATTEMPTS).update(
+        status='failed',
+        error_message="El trabajo se interrumpió y agotó sus reintentos.",
+        finished_at=now,
+        updated_at=now
+    )
+    reclaimed = stale.update(status='pending', updated_at=now)
+    if failed or reclaimed:
+        logger.warning("Trabajos de importación abandonados: %s retomados, %s fallidos", reclaimed, failed)
+    return reclaimed
+
+def claim_next_job():
+    """
+    Toma el siguiente trabajo pendiente, incluidos los abandonados por un worker caído.
+    En PostgreSQL usa SKIP LOCKED para que varios workers puedan ejecutarse en paralelo
+    sin tomar el mismo trabajo.
+    """
+    reclaim_stale_jobs()
+
+    with transaction.atomic():
+        job = (
+            ImportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .order_by('created_at')
+            .first()
+        )
+        if not job:
+            return None
+
+        job.status = 'running'
+        job.attempts += 1
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'attempts', 'started_at', 'updated_at'])
+    return job
+
+def iter_chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def run_import_job(job, chunk_size=None):
+    """
+    Procesa el archivo del trabajo en bloques; cada bloque se confirma en su propia
+    transacción y el progreso se guarda al terminar cada uno. Un trabajo retomado
+    continúa después de las `processed_rows` filas ya confirmadas.
+    """
+    chunk_size = chunk_size or settings.IMPORT_JOB_CHUNK_SIZE
+    importer = IMPORTERS[job.kind]
+
+    try:
+        with job.file.open('rb') as file, ExcelSheetReader(file) as reader:
+            column_map = reader.map_columns(importer['lookup'])
+            missing = missing_columns(column_map, *importer['required_columns'])
+            if missing:
+                raise ValueError(f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}")
+
+            job.total_rows = max(reader.max_row - 1, 0) if reader.max_row else None
+            job.save(update_fields=['total_rows', 'updated_at'])
+
+            rows = reader.iter_row_data(column_map)
+            deque(islice(rows, job.processed_rows), maxlen=0)
+
+            process = importer['make_processor']()
+            for chunk in iter_chunks(rows, chunk_size):
+                with transaction.atomic():
+                    result = process(chunk)
+                    ImportJobError.objects.bulk_create([
+                        ImportJobError(job=job, row_number=row_idx, message=message)
+                        for row_idx, message in result['errors']
+                    ])
+                    job.processed_rows += len(chunk)
+                    job.created_count += result.get('created_count', 0)
+                    job.updated_count += result.get('updated_count', 0)
+                    job.skipped_count += result.get('skipped_count', 0)
+                    job.save(update_fields=[
+                        'processed_rows', 'created_count', 'updated_count', 'skipped_count', 'updated_at'
+                    ])
+    except Exception as e:
+        logger.exception("Error al procesar el trabajo de importación %s", job.id)
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+        return job
+
+    job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+
+    AuditLog.objects.create(
+        profile=job.requested_by,
+        action=importer['audit_action'],
+        description=(
+            f"Importación en segundo plano de {job.original_name} finalizada: "
+            f"{job.created_count} creados, {job.updated_count} actualizados, "
+            f"{job.skipped_count} filas saltadas o con errores."
+        )
+    )
+    return job
+
+def run_worker(once=False, sleep=2, chunk_size=None):
+    while True:
+        job = claim_next_job()
+        if job:
+            started = time.time()
+            run_import_job(job, chunk_size=chunk_size)
+            logger.info("Trabajo %s (%s) %s en %.1fs", job.id, job.kind, job.status, time.time() - started)
+            continue
+
+        if once:
+            return
+        time.sleep(sleep)
+
+def rows_per_second(job):
+    if not job.started_at or not job.processed_rows:
+        return 0.0
+    elapsed = ((job.finished_at or timezone.now()) - job.started_at).total_seconds()
+    return round(job.processed_rows / elapsed, 2) if elapsed > 0 else float(job.processed_rows)
@@ -0,0 +1,204 @@
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+from apps.audit_logs.models import AuditLog
+from apps.payslips.models import Payslip
+from apps.payslips.services.payslip_import import import_payslip_rows
+from .models import ImportJob
+from .services.job_runner import claim_next_job, enqueue_import_job, run_import_job, run_worker
+
+PAYSLIP_HEADERS = ['DNI', 'Concepto', 'Monto', 'OrigenDato', 'TipoPlanilla', 'TipoDato', 'Posicion', 'Periodo']
+
+
+def payslip_row(dni, concept, amount=100, period='MARZO 2025'):
+    return [dni, concept, amount, 'BASICO', 'INGRESOS', 'N', 0, period]
+
+
+def xlsx_file(rows, headers=PAYSLIP_HEADERS, name='boletas.xlsx'):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class ImportJobTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.admin = User.objects.create(username='admin')
+        self.admin.profile.role = 'admin'
+        self.admin.profile.save()
+        employee = User.objects.create(username='40001234')
+        employee.profile.dni = '40001234'
+        employee.profile.save()
+        self.employee = employee
+
+    def enqueue(self, rows, **kwargs):
+        return enqueue_import_job('payslips', xlsx_file(rows, **kwargs), self.admin.profile)
+
+
+class ImportJobRunnerTests(ImportJobTestCase):
+    def test_worker_imports_the_file_in_chunks(self):
+        job = self.enqueue([
+            payslip_row('40001234', 'BASICO'),
+            payslip_row('49999999', 'BASICO'),
+            payslip_row('40001234', 'LIQUIDO'),
+            payslip_row('40001234', 'BASICO'),
+            payslip_row('40001234', 'BONO'),
+        ])
+
+        run_worker(once=True, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual((job.total_rows, job.processed_rows), (5, 5))
+        self.assertEqual((job.created_count, job.skipped_count), (3, 2))
+        self.assertEqual([e.row_number for e in job.errors.all()], [3, 5])
+        self.assertEqual(Payslip.objects.filter(profile=self.employee.profile).count(), 3)
+        self.assertTrue(AuditLog.objects.filter(action="CARGA DE BOLETAS", profile=self.admin.profile).exists())
+
+    def test_missing_columns_fail_the_job(self):
+        job = self.enqueue([['40001234', 'BASICO']], headers=['DNI', 'Concepto'])
+
+        with self.assertLogs('apps.import_jobs.services.job_runner', 'ERROR'):
+            run_import_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Faltan columnas obligatorias', job.error_message)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_committed_chunks_survive_a_failing_chunk(self):
+        job = self.enqueue([payslip_row('40001234', f'CONCEPTO {i}') for i in range(5)])
+        calls = []
+
+        def failing_import(rows, **kwargs):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError('sin conexión')
+            return import_payslip_rows(rows, **kwargs)
+
+        with mock.patch('apps.import_jobs.importers.import_payslip_rows', failing_import), self.assertLogs('apps.import_jobs.services.job_runner', 'ERROR'):
+            run_import_job(claim_next_job(), chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_message, 'sin conexión')
+        self.assertEqual((job.processed_rows, job.created_count), (2, 2))
+        self.assertEqual(Payslip.objects.count(), 2)
+
+
+@override_settings(IMPORT_JOB_STALE_AFTER=60, IMPORT_JOB_MAX_ATTEMPTS=2)
+class ImportJobReclaimTests(ImportJobTestCase):
+    def crash_after_first_chunk(self, job):
+        calls = []
+
+        def killed_worker(rows, **kwargs):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return import_payslip_rows(rows, **kwargs)
+
+        with mock.patch('apps.import_jobs.importers.import_payslip_rows', killed_worker):
+            with self.assertRaises(KeyboardInterrupt):
+                run_import_job(claim_next_job(), chunk_size=2)
+        ImportJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(minutes=5))
+
+    def test_stale_running_job_is_resumed_after_the_committed_rows(self):
+        job = self.enqueue([payslip_row('40001234', f'CONCEPTO {i}') for i in range(5)])
+        self.crash_after_first_chunk(job)
+
+        with self.assertLogs('apps.import_jobs.services.job_runner', 'WARNING'):
+            run_worker(once=True, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual((job.processed_rows, job.created_count, job.skipped_count), (5, 5, 0))
+        self.assertEqual(Payslip.objects.count(), 5)
+
+    def test_running_job_with_recent_progress_is_not_reclaimed(self):
+        job = self.enqueue([payslip_row('40001234', 'BASICO')])
+        claim_next_job()
+
+        self.assertIsNone(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('running', 1))
+
+    def test_stale_job_without_attempts_left_fails(self):
+        job = self.enqueue([payslip_row('40001234', 'BASICO')])
+        ImportJob.objects.filter(id=job.id).update(
+            status='running', attempts=2, updated_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        with self.assertLogs('apps.import_jobs.services.job_runner', 'WARNING'):
+            self.assertIsNone(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(Payslip.objects.exists())
+
+
+class ImportJobStatusTests(ImportJobTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_background_upload_is_accepted_and_queued(self):
+        response = self.client.post(
+            '/api/payslips/upload-payslips/?background=1',
+            {'file': xlsx_file([payslip_row('40001234', 'BASICO')])},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()['data']
+        self.assertEqual((data['kind'], data['status']), ('payslips', 'pending'))
+        self.assertIn(f"?id={data['id']}", data['status_url'])
+        self.assertFalse(Payslip.objects.exists())
+
+    def test_status_pages_the_row_errors(self):
+        job = self.enqueue([payslip_row('49999999', f'CONCEPTO {i}') for i in range(5)])
+        run_worker(once=True)
+
+        response = self.client.get('/api/import-jobs/job-status/', {'id': str(job.id), 'page': 2, 'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['data']['status'], 'completed')
+        self.assertEqual(body['data']['progress'], 100)
+        self.assertEqual([e['row'] for e in body['data']['errors']], [4, 5])
+        pagination = body['meta']['pagination']
+        self.assertEqual((pagination['total_items'], pagination['total_pages']), (5, 3))
+        self.assertTrue(pagination['has_next'])
+        self.assertTrue(pagination['has_previous'])
+
+    def test_status_rejects_bad_requests(self):
+        job = self.enqueue([payslip_row('40001234', 'BASICO')])
+
+        self.assertEqual(self.client.get('/api/import-jobs/job-status/', {'id': 'x'}).status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/import-jobs/job-status/', {'id': '00000000-0000-0000-0000-000000000000'}).status_code,
+            404
+        )
+
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.client.get('/api/import-jobs/job-status/', {'id': str(job.id)}).status_code, 403)
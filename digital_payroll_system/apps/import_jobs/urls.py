@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import ImportJobViewSet
+
+router = DefaultRouter()
+router.register(r'', ImportJobViewSet, basename='import-jobs')
+
+urlpatterns = router.urls
@@ -0,0 +1,124 @@
+from uuid import UUID
+from django.urls import reverse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from common.response_handler import APIResponse
+from .models import ImportJob
+from .services.job_runner import rows_per_second
+
+def wants_background(request):
+    value = request.query_params.get('background') or request.data.get('background')
+    return str(value).lower() in ('1', 'true')
+
+def serialize_job(job, request):
+    progress = None
+    if job.total_rows:
+        progress = round(min(job.processed_rows / job.total_rows, 1) * 100, 2)
+
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "file_name": job.original_name,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "progress": progress,
+        "rows_per_second": rows_per_second(job),
+        "created_count": job.created_count,
+        "updated_count": job.updated_count,
+        "skipped_count": job.skipped_count,
+        "error_message": job.error_message or None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": request.build_absolute_uri(
+            f"{reverse('import-jobs-job-status')}?id={job.id}"
+        ),
+    }
+
+def import_job_accepted(job, request):
+    return Response(
+        APIResponse.success(
+            data=serialize_job(job, request),
+            message="Archivo recibido. La importación se procesará en segundo plano.",
+            code=status.HTTP_202_ACCEPTED
+        ),
+        status=status.HTTP_202_ACCEPTED
+    )
+
+class ImportJobViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'], url_path='job-status')
+    def job_status(self, request):
+        """
+        Estado de un trabajo de importación: filas procesadas, filas por segundo,
+        conteos y errores paginados.
+        """
+        if request.user.profile.role != 'admin':
+            return Response(
+                APIResponse.error(
+                    message="No tiene permisos para realizar esta acción.",
+                    code=status.HTTP_403_FORBIDDEN
+                ),
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        job_id = request.query_params.get('id')
+        try:
+            UUID(str(job_id))
+        except ValueError:
+            return Response(
+                APIResponse.error(
+                    message="Debe proporcionar un ID de trabajo válido.",
+                    code=status.HTTP_400_BAD_REQUEST
+                ),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        job = ImportJob.objects.filter(id=job_id).first()
+        if not job:
+            return Response(
+                APIResponse.error(
+                    message=f"No se encontró ningún trabajo con ID {job_id}.",
+                    code=status.HTTP_404_NOT_FOUND
+                ),
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = max(int(request.query_params.get('page_size', 50)), 1)
+        except ValueError:
+            page = 1
+            page_size = 50
+
+        offset = (page - 1) * page_size
+        errors_qs = job.errors.all()
+        total_errors = errors_qs.count()
+
+        data = serialize_job(job, request)
+        data["errors"] = [
+            {"row": e.row_number, "message": e.message}
+            for e in errors_qs[offset:offset + page_size]
+        ]
+
+        pagination = {
+            "current_page": page,
+            "page_size": page_size,
+            "total_items": total_errors,
+            "total_pages": (total_errors + page_size - 1) // page_size,
+            "has_next": offset + page_size < total_errors,
+            "has_previous": page > 1
+        }
+
+        return Response(
+            APIResponse.success(
+                data=data,
+                message="Estado del trabajo de importación obtenido correctamente.",
+                meta={"pagination": pagination}
+            ),
+            status=status.HTTP_200_OK
+        )
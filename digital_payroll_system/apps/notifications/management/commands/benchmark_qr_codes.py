@@ -0,0 +1,50 @@
+import statistics
+import time
+from datetime import date
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from apps.notifications.services.email_service import build_payslip_email
+from apps.notifications.services.qr_service import QR_FORMATS, QR_STYLES, cached_qr_code, render_qr_code
+
+
+class Command(BaseCommand):
+    help = "Mide los QR de los correos de boletas por estilo y formato: tiempo de generación, acierto de caché y tamaño del correo."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="QR generados por estilo y formato.")
+        parser.add_argument(
+            '--url',
+            default='https://boletas.example.edu.pe/api/payslips/download-payslip/?id=3fa85f64-5717-4562-b3fc-2c963f66afa6',
+            help="Contenido del QR (la URL del PDF)."
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(options['iterations'], 1)
+        url = options['url']
+        user = User(first_name="ANA MARIA", last_name="PEREZ QUISPE", email="ana.perez@example.com")
+
+        self.stdout.write(f"{'estilo':<8} {'formato':<7} {'media ms':>9} {'caché µs':>9} {'QR bytes':>9} {'correo KiB':>11}")
+        for style in QR_STYLES:
+            for fmt in QR_FORMATS:
+                durations = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    qr_bytes = render_qr_code(url, style, fmt)
+                    durations.append((time.perf_counter() - started) * 1000)
+
+                cached_qr_code(url, style, fmt)
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    cached_qr_code(url, style, fmt)
+                cached_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+                # El correo incrusta el QR como imagen PNG; un SVG no se envía por correo.
+                email_size = '-'
+                if fmt == 'png':
+                    email = build_payslip_email(user, url, qr_bytes, date(2025, 3, 1))
+                    email_size = f"{len(email.message().as_bytes()) / 1024:.1f}"
+
+                self.stdout.write(
+                    f"{style:<8} {fmt:<7} {statistics.fmean(durations):>9.2f} {cached_us:>9.1f} "
+                    f"{len(qr_bytes):>9} {email_size:>11}"
+                )
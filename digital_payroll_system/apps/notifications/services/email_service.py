@@ -1,14 +1,19 @@
-from django.core.mail import EmailMultiAlternatives
+import logging
+import smtplib
+import time
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from email.mime.image import MIMEImage
 
+logger = logging.getLogger(__name__)
+
 MONTHS_ES = [
     "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
     "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
 ]
 
-def send_payslip_email(user, secure_url, qr_bytes, issue_date):
+def build_payslip_email(user, secure_url, qr_bytes, issue_date, connection=None):
     subject = "Tu boleta de pago está lista"
 
     try:
@@ -27,7 +32,8 @@ def send_payslip_email(user, secure_url, qr_bytes, issue_date):
         subject=subject,
         body="Tu boleta está lista.",
         from_email=settings.EMAIL_HOST_USER,
-        to=[user.email]
+        to=[user.email],
+        connection=connection
     )
 
     email.attach_alternative(html, "text/html")
@@ -35,10 +41,12 @@ def send_payslip_email(user, secure_url, qr_bytes, issue_date):
     qr_image = MIMEImage(qr_bytes)
     qr_image.add_header("Content-ID", "<qr_image>")
     email.attach(qr_image)
+    return email
 
-    email.send()
+def send_payslip_email(user, secure_url, qr_bytes, issue_date, connection=None):
+    build_payslip_email(user, secure_url, qr_bytes, issue_date, connection).send()
 
-def send_email_updated_notification(user, new_email):
+def build_email_updated_notification(user, new_email, connection=None):
     subject = "Tu correo ha sido actualizado correctamente"
 
     html_content = render_to_string("emails/email_updated.html", {
@@ -50,14 +58,17 @@ def send_email_updated_notification(user, new_email):
         subject=subject,
         body="Tu correo ha sido actualizado.",
         from_email=settings.EMAIL_HOST_USER,
-        to=[new_email]
+        to=[new_email],
+        connection=connection
     )
 
     email.attach_alternative(html_content, "text/html")
-    email.send()
+    return email
 
+def send_email_updated_notification(user, new_email, connection=None):
+    build_email_updated_notification(user, new_email, connection).send()
 
-def send_password_changed_notification(user):
+def build_password_changed_notification(user, connection=None):
     subject = "Tu contraseña ha sido modificada"
 
     html_content = render_to_string("emails/password_changed.html", {
@@ -69,8 +80,69 @@ def send_password_changed_notification(user):
         subject=subject,
         body="Tu contraseña fue cambiada.",
         from_email=settings.EMAIL_HOST_USER,
-        to=[user.email]
+        to=[user.email],
+        connection=connection
     )
 
     email.attach_alternative(html_content, "text/html")
-    email.send()
\ No newline at end of file
+    return email
+
+def send_password_changed_notification(user, connection=None):
+    build_password_changed_notification(user, connection).send()
+
+def send_on_connection(connection, message):
+    """
+    Envía un mensaje por `connection` (abriéndola si hace falta). Si el servidor cortó la
+    conexión, reconecta y lo reintenta una vez. Devuelve cuántos mensajes se enviaron (0 o 1).
+    """
+    try:
+        connection.open()
+        return connection.send_messages([message])
+    except smtplib.SMTPServerDisconnected as e:
+        logger.info("Conexión SMTP cerrada por el servidor (%s); se reintenta el correo a %s", e, ', '.join(message.to))
+        connection.close()
+        connection.open()
+        return connection.send_messages([message])
+
+def send_bulk_emails(messages, chunk_size=None):
+    """
+    Envía `messages` (puede ser un generador de los build_* anteriores) reutilizando una
+    conexión de get_connection() (un solo saludo TLS y login) para `chunk_size` mensajes
+    (EMAIL_BATCH_SIZE); luego se cierra y se abre otra, porque muchos servidores limitan los
+    mensajes por sesión. Cada mensaje se envía y se cuenta por separado: tras una desconexión
+    se reintenta una vez, y si vuelve a fallar se registra y cuenta solo ese mensaje.
+
+    Devuelve enviados, fallidos, segundos y mensajes por segundo.
+    """
+    chunk_size = chunk_size or settings.EMAIL_BATCH_SIZE
+    stats = {'sent': 0, 'failed': 0, 'seconds': 0.0, 'messages_per_second': 0.0}
+    started = time.perf_counter()
+
+    connection = get_connection()
+    sent_on_connection = 0
+    try:
+        for message in messages:
+            if sent_on_connection >= chunk_size:
+                connection.close()
+                sent_on_connection = 0
+            try:
+                delivered = send_on_connection(connection, message)
+            except (smtplib.SMTPException, OSError) as e:
+                logger.warning("No se pudo enviar el correo a %s: %s", ', '.join(message.to), e)
+                stats['failed'] += 1
+                connection.close()
+                sent_on_connection = 0
+                continue
+            sent_on_connection += 1
+            stats['sent' if delivered else 'failed'] += 1
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - started
+    stats['seconds'] = round(elapsed, 3)
+    stats['messages_per_second'] = round(stats['sent'] / elapsed, 2) if elapsed > 0 else 0.0
+    logger.info(
+        "%s correos enviados (%s fallidos) en %.2f s, %.2f msg/s",
+        stats['sent'], stats['failed'], elapsed, stats['messages_per_second']
+    )
+    return stats
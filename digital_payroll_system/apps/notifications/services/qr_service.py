@@ -1,16 +1,64 @@
+import hashlib
 import qrcode
+from functools import lru_cache
 from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from qrcode.image.svg import SvgPathImage
 
-def generate_qr_code(data: str):
+# 'default' es el QR original; 'compact' usa módulos de 4 px y el margen mínimo de la norma (4 módulos).
+QR_STYLES = {
+    'default': {'box_size': 10, 'border': 5},
+    'compact': {'box_size': 4, 'border': 4},
+}
+QR_FORMATS = ('png', 'svg')
+
+def render_qr_code(data: str, style='default', fmt='png'):
     qr = qrcode.QRCode(
         version=1,
-        box_size=10,
-        border=5
+        **QR_STYLES[style]
     )
     qr.add_data(data)
     qr.make(fit=True)
 
-    img = qr.make_image()
     buffer = BytesIO()
-    img.save(buffer, format="PNG")
+    if fmt == 'svg':
+        qr.make_image(image_factory=SvgPathImage).save(buffer)
+    else:
+        # PNG de 1 bit por píxel (modo "1" de Pillow)
+        qr.make_image().save(buffer, format="PNG")
     return buffer.getvalue()
+
+def qr_cache_key(data, style, fmt):
+    return f"qr-code:{style}:{fmt}:{hashlib.sha256(data.encode()).hexdigest()}"
+
+@lru_cache(maxsize=1024)
+def cached_qr_code(data, style, fmt):
+    """
+    QR del contenido `data`: primero en la LRU del proceso y luego en la caché de Django
+    (FileBasedCache en disco en docker-compose), compartida con los demás workers.
+    """
+    key = qr_cache_key(data, style, fmt)
+    qr_bytes = cache.get(key)
+    if qr_bytes is None:
+        qr_bytes = render_qr_code(data, style, fmt)
+        cache.set(key, qr_bytes, settings.QR_CODE_CACHE_TIMEOUT)
+    return qr_bytes
+
+def generate_qr_code(data: str, style=None, fmt='png'):
+    return cached_qr_code(data, style or settings.QR_CODE_STYLE, fmt)
+
+def generate_qr_codes(payloads, style=None, fmt='png'):
+    """
+    Versión por lotes para la generación masiva: {contenido: QR}. Consulta la caché una sola
+    vez (get_many), genera solo los que faltan y los guarda juntos (set_many).
+    """
+    style = style or settings.QR_CODE_STYLE
+    keys = {qr_cache_key(data, style, fmt): data for data in dict.fromkeys(payloads)}
+
+    found = cache.get_many(list(keys))
+    missing = {key: render_qr_code(data, style, fmt) for key, data in keys.items() if key not in found}
+    if missing:
+        cache.set_many(missing, settings.QR_CODE_CACHE_TIMEOUT)
+
+    return {keys[key]: qr_bytes for key, qr_bytes in {**found, **missing}.items()}
@@ -1,3 +1,142 @@
-from django.test import TestCase
+import smtplib
+from io import BytesIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.test import TestCase, override_settings
+from PIL import Image
+from .services import qr_service
+from .services.email_service import build_password_changed_notification, send_bulk_emails
+from .services.qr_service import cached_qr_code, generate_qr_code, generate_qr_codes
 
-# Create your tests here.
+PDF_URL = 'http://testserver/media/payslips/2025/03/boleta_1.pdf'
+
+
+class StandInSMTPBackend(locmem.EmailBackend):
+    """
+    Servidor SMTP de prueba: guarda en mail.outbox y cuenta conexiones y mensajes por envío.
+    `fail_at` son los números de envío (desde 1) en los que el servidor corta la conexión y
+    `session_limit` los mensajes que acepta por sesión antes de cortarla.
+    """
+    connections = 0
+    chunks = []
+    fail_at = set()
+    session_limit = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_open = False
+        self.session_sent = 0
+
+    def open(self):
+        if self.is_open:
+            return False
+        type(self).connections += 1
+        self.is_open = True
+        self.session_sent = 0
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        type(self).chunks.append(len(messages))
+        limit = type(self).session_limit
+        if len(type(self).chunks) in type(self).fail_at or (limit and self.session_sent >= limit):
+            self.is_open = False
+            raise smtplib.SMTPServerDisconnected("Conexión cerrada por el servidor")
+        self.session_sent += len(messages)
+        return super().send_messages(messages)
+
+
+@override_settings(QR_CODE_STYLE='compact')
+class QRCodeServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        cached_qr_code.cache_clear()
+        self.addCleanup(cached_qr_code.cache_clear)
+
+    def test_compact_png_is_one_bit_and_smaller(self):
+        compact = generate_qr_code(PDF_URL)
+        default = generate_qr_code(PDF_URL, style='default')
+
+        self.assertLess(len(compact), len(default))
+        with Image.open(BytesIO(compact)) as image:
+            self.assertEqual((image.format, image.mode), ('PNG', '1'))
+        self.assertIn(b'<svg', generate_qr_code(PDF_URL, fmt='svg'))
+
+    def test_same_payload_is_rendered_once(self):
+        with mock.patch.object(qr_service, 'render_qr_code', wraps=qr_service.render_qr_code) as render:
+            first = generate_qr_code(PDF_URL)
+            self.assertEqual(generate_qr_code(PDF_URL), first)
+            self.assertEqual(render.call_count, 1)
+
+            # Otro proceso (LRU vacía) lo toma de la caché compartida.
+            cached_qr_code.cache_clear()
+            self.assertEqual(generate_qr_code(PDF_URL), first)
+            self.assertEqual(render.call_count, 1)
+
+    def test_batch_renders_only_missing_payloads(self):
+        other_url = PDF_URL.replace('boleta_1', 'boleta_2')
+        cached = generate_qr_code(PDF_URL)
+
+        with mock.patch.object(qr_service, 'render_qr_code', wraps=qr_service.render_qr_code) as render:
+            codes = generate_qr_codes([PDF_URL, other_url, other_url])
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(set(codes), {PDF_URL, other_url})
+        self.assertEqual(codes[PDF_URL], cached)
+        self.assertEqual(codes[other_url], generate_qr_code(other_url))
+
+
+@override_settings(EMAIL_BACKEND='apps.notifications.tests.StandInSMTPBackend', EMAIL_BATCH_SIZE=2)
+class BulkEmailTests(TestCase):
+    def setUp(self):
+        StandInSMTPBackend.connections = 0
+        StandInSMTPBackend.chunks = []
+        StandInSMTPBackend.fail_at = set()
+        StandInSMTPBackend.session_limit = None
+        self.users = [
+            User(username=f'4000000{index}', first_name='ANA', email=f'ana{index}@example.com')
+            for index in range(5)
+        ]
+
+    def messages(self):
+        return (build_password_changed_notification(user) for user in self.users)
+
+    def test_connection_is_reopened_every_chunk_of_messages(self):
+        stats = send_bulk_emails(self.messages())
+
+        self.assertEqual((stats['sent'], stats['failed']), (5, 0))
+        self.assertGreater(stats['messages_per_second'], 0)
+        self.assertEqual(StandInSMTPBackend.connections, 3)
+        self.assertEqual(StandInSMTPBackend.chunks, [1] * 5)
+        self.assertEqual([email.to for email in mail.outbox], [[user.email] for user in self.users])
+
+        StandInSMTPBackend.connections = 0
+        send_bulk_emails(self.messages(), chunk_size=10)
+        self.assertEqual(StandInSMTPBackend.connections, 1)
+
+    def test_message_cut_by_the_session_limit_is_retried_on_a_new_connection(self):
+        StandInSMTPBackend.session_limit = 3
+        stats = send_bulk_emails(self.messages(), chunk_size=10)
+
+        self.assertEqual((stats['sent'], stats['failed']), (5, 0))
+        self.assertEqual(StandInSMTPBackend.connections, 2)
+        self.assertEqual([email.to for email in mail.outbox], [[user.email] for user in self.users])
+
+    def test_message_failing_again_after_the_retry_counts_alone(self):
+        StandInSMTPBackend.fail_at = {3, 4}
+        with self.assertLogs('apps.notifications.services.email_service', 'WARNING') as logs:
+            stats = send_bulk_emails(self.messages(), chunk_size=10)
+
+        self.assertEqual((stats['sent'], stats['failed']), (4, 1))
+        self.assertEqual(StandInSMTPBackend.connections, 3)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('ana2@example.com', logs.output[0])
+        self.assertEqual(
+            [email.to for email in mail.outbox],
+            [[user.email] for index, user in enumerate(self.users) if index != 2]
+        )
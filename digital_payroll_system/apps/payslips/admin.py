@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payslip
+from .models import Payslip, PayslipPeriodSummary, PayslipRenderJob
 
 @admin.register(Payslip)
 class PayslipAdmin(admin.ModelAdmin):
@@ -45,3 +45,59 @@ class PayslipAdmin(admin.ModelAdmin):
         return f"S/ {obj.amount:,.2f}"
     
     amount_display.short_description = 'Amount'
+
+
+@admin.register(PayslipPeriodSummary)
+class PayslipPeriodSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        'profile',
+        'issue_date',
+        'total_ingresos',
+        'total_descuentos',
+        'liquido_pagar',
+        'view_status',
+        'updated_at',
+    )
+
+    search_fields = (
+        'profile__dni',
+        'profile__user__username',
+    )
+
+    list_filter = (
+        'view_status',
+        'issue_date',
+    )
+    readonly_fields = ('created_at', 'updated_at')
+
+    ordering = ('-issue_date',)
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related('profile', 'profile__user')
+
+
+@admin.register(PayslipRenderJob)
+class PayslipRenderJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'kind',
+        'payslip',
+        'reference_payslip',
+        'period',
+        'status',
+        'attempts',
+        'generated_count',
+        'failed_count',
+        'requested_by',
+        'available_at',
+        'finished_at',
+        'created_at',
+    )
+
+    list_filter = ('kind', 'status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = (
+        'created_at', 'updated_at', 'started_at', 'finished_at', 'timings', 'pdfs_per_second',
+        'pdf_bytes_before', 'pdf_bytes_after',
+    )
+    raw_id_fields = ('payslip', 'requested_by')
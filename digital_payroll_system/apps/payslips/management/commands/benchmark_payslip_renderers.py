@@ -0,0 +1,90 @@
+import statistics
+import time
+import tracemalloc
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from apps.payslips.models import Payslip
+from apps.payslips.services.payslip_pdf import build_payslip_payload, period_concepts
+from apps.payslips.services.pdf_renderers import PDF_RENDERERS
+
+
+def sample_payload(concepts):
+    ingresos = [
+        {"code": index, "name": f"CONCEPTO DE INGRESO {index}", "amount": Decimal("150.00")}
+        for index in range(1, concepts // 2 + 1)
+    ]
+    descuentos = [
+        {"code": index, "name": f"CONCEPTO DE DESCUENTO {index}", "amount": Decimal("25.50")}
+        for index in range(1, concepts - concepts // 2 + 1)
+    ]
+    total_bruto = sum(item['amount'] for item in ingresos)
+    total_descuento = sum(item['amount'] for item in descuentos)
+    return {
+        "issue_date_es": "MARZO 2025",
+        "print_date": "01/04/2025",
+        "dni": "40001234",
+        "first_name": "ANA MARIA",
+        "last_name": "PEREZ QUISPE",
+        "position": "DOCENTE",
+        "description": "FACULTAD DE INGENIERIA",
+        "condition": "CONTRATADO",
+        "regimen": "728",
+        "category": "AUXILIAR",
+        "worked_days": 30,
+        "worked_hours": 120,
+        "discount_lateness": 0,
+        "start_date": "01/03/2020",
+        "end_date": "VIGENTE",
+        "sistema_pension": "AFP INTEGRA",
+        "codigo_afiliado": "123456ABCDE7",
+        "ingresos": ingresos,
+        "descuentos": descuentos,
+        "total_bruto": total_bruto,
+        "total_descuento": total_descuento,
+        "total_liquido": total_bruto - total_descuento,
+        "aporte_patronal": round(total_bruto * Decimal("0.09"), 2),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compara los renderizadores de boletas en PDF: tiempo por boleta, memoria pico y tamaño."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renderer', action='append', choices=sorted(PDF_RENDERERS), help="Renderizador a medir. Se puede repetir (por defecto todos).")
+        parser.add_argument('--iterations', type=int, default=20, help="Boletas generadas por renderizador.")
+        parser.add_argument('--payslip', help="ID de una boleta real cuyo contexto se usará.")
+        parser.add_argument('--concepts', type=int, default=20, help="Conceptos del contexto de ejemplo (sin --payslip).")
+
+    def handle(self, *args, **options):
+        if options['payslip']:
+            payslip = Payslip.objects.select_related('profile__user', 'profile__work_details').filter(id=options['payslip']).first()
+            if not payslip:
+                raise CommandError(f"No existe la boleta {options['payslip']}.")
+            payload = build_payslip_payload(payslip, list(period_concepts(payslip)))
+        else:
+            payload = sample_payload(options['concepts'])
+
+        iterations = max(options['iterations'], 1)
+        self.stdout.write(f"{'renderer':<10} {'media ms':>9} {'p95 ms':>8} {'PDF/s':>7} {'pico KiB':>9} {'tamaño KiB':>11}")
+
+        for name in options['renderer'] or sorted(PDF_RENDERERS):
+            render = PDF_RENDERERS[name]['render']
+            render(payload)
+
+            durations = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                pdf_bytes = render(payload)
+                durations.append((time.perf_counter() - started) * 1000)
+
+            tracemalloc.start()
+            render(payload)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            mean = statistics.fmean(durations)
+            p95 = sorted(durations)[max(int(len(durations) * 0.95) - 1, 0)]
+            self.stdout.write(
+                f"{name:<10} {mean:>9.1f} {p95:>8.1f} {1000 / mean:>7.1f} "
+                f"{peak / 1024:>9.0f} {len(pdf_bytes) / 1024:>11.1f}"
+            )
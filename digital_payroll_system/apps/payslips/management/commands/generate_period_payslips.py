@@ -0,0 +1,55 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.payslips.services.period_render import generate_period_pdfs
+
+
+class Command(BaseCommand):
+    help = "Genera los PDF de todas las boletas de un periodo repartiendo el render en un pool de procesos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', required=True, help="Mes a generar en formato AAAA-MM.")
+        parser.add_argument('--workers', type=int, default=None, help="Procesos de render (por defecto PAYSLIP_RENDER_WORKERS).")
+        parser.add_argument('--batch-size', type=int, default=None, help="Boletas por lote guardado.")
+        parser.add_argument('--send-email', action='store_true', help="Envía el correo con el QR a cada trabajador.")
+        parser.add_argument('--base-url', default='', help="Origen público para las URL de los PDF en los correos.")
+
+    def handle(self, *args, **options):
+        try:
+            period = date(*map(int, options['period'].split('-')), 1)
+        except (TypeError, ValueError):
+            raise CommandError("El periodo debe tener el formato AAAA-MM.")
+
+        if options['send_email'] and not options['base_url']:
+            raise CommandError("--send-email requiere --base-url para construir los enlaces de los correos.")
+
+        def report(result):
+            self.stdout.write(f"{result['total']} boletas procesadas ({result['failed']} con errores).")
+
+        result = generate_period_pdfs(
+            period,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            send_email=options['send_email'],
+            base_url=options['base_url'],
+            on_progress=report,
+        )
+
+        for error in result['errors']:
+            self.stderr.write(f"Boleta {error['payslip_id']}: {error['message']}")
+
+        timings = ", ".join(f"{stage} {ms} ms" for stage, ms in result['timings'].items())
+        self.stdout.write(f"Tiempos: {timings}.")
+        if result['pdf_bytes_before']:
+            self.stdout.write(
+                f"Tamaño de los PDF: {result['pdf_bytes_before'] / 1024:.1f} KiB antes de optimizar, "
+                f"{result['pdf_bytes_after'] / 1024:.1f} KiB después."
+            )
+        if options['send_email']:
+            self.stdout.write(
+                f"Correos: {result['emails_sent']} enviados, {result['emails_failed']} fallidos "
+                f"({result['emails_per_second']} msg/s)."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{period.strftime('%Y-%m')}: {result['generated']} PDF generados en "
+            f"{result['timings']['total'] / 1000:.1f} s ({result['pdfs_per_second']} PDF/s)."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.payslips.services.render_jobs import run_render_worker
+
+
+class Command(BaseCommand):
+    help = "Genera en segundo plano los PDF de boletas pendientes (render, QR y correo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Procesa los trabajos pendientes y termina.")
+        parser.add_argument('--sleep', type=float, default=2, help="Segundos de espera cuando no hay trabajos.")
+
+    def handle(self, *args, **options):
+        run_render_worker(once=options['once'], sleep=options['sleep'])
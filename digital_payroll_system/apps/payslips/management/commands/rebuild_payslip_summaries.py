@@ -0,0 +1,26 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.payslips.services.period_summary import rebuild_period_summaries
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los resúmenes por periodo (PayslipPeriodSummary) a partir de las boletas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', action='append', default=None, help="Mes a reconstruir en formato AAAA-MM. Se puede repetir.")
+
+    def handle(self, *args, **options):
+        periods = None
+        if options['period']:
+            try:
+                periods = [date(*map(int, value.split('-')), 1) for value in options['period']]
+            except (TypeError, ValueError):
+                raise CommandError("El periodo debe tener el formato AAAA-MM.")
+
+        with transaction.atomic():
+            rebuilt = rebuild_period_summaries(periods)
+
+        for period, count in rebuilt.items():
+            self.stdout.write(f"{period.strftime('%Y-%m')}: {count} resúmenes.")
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes reconstruidos: {sum(rebuilt.values())}."))
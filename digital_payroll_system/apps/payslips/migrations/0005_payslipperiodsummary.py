@@ -0,0 +1,88 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:40
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from itertools import groupby
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+STATUS_RANK = {'unseen': 0, 'generated': 1, 'seen': 2}
+STATUS_BY_RANK = {rank: status for status, rank in STATUS_RANK.items()}
+
+
+def build_summary(PayslipPeriodSummary, profile_id, period, rows):
+    # Copia fija de la aritmética de services.period_summary.compute_period_summaries al crear
+    # esta migración: máximo por concepto (0 si no hay), el mayor pdf_file, el estado más
+    # avanzado y como referencia la primera boleta con PDF o, si no hay, el primer concepto.
+    def total(source):
+        amounts = [amount for _, _, data_source, amount, _, _, _ in rows if data_source == source]
+        return max(amounts) if amounts else Decimal('0.00')
+
+    pdf_files = [pdf_file for _, _, _, _, pdf_file, _, _ in rows if pdf_file]
+    reference_id = next((row[0] for row in rows if row[4]), rows[0][0])
+    return PayslipPeriodSummary(
+        profile_id=profile_id,
+        issue_date=period,
+        reference_payslip_id=reference_id,
+        total_ingresos=total('TOTALINGRESOS'),
+        total_descuentos=total('TOTALDSCTO'),
+        liquido_pagar=total('LIQUIDOPAGAR'),
+        pdf_path=max(pdf_files) if pdf_files else '',
+        view_status=STATUS_BY_RANK[max(STATUS_RANK.get(row[5], 0) for row in rows)],
+    )
+
+
+def backfill_summaries(apps, schema_editor):
+    Payslip = apps.get_model('payslips', 'Payslip')
+    PayslipPeriodSummary = apps.get_model('payslips', 'PayslipPeriodSummary')
+
+    # Las boletas de un mismo perfil y mes llegan contiguas: se agrupan en streaming y los
+    # resúmenes se insertan por lotes, sin cargar toda la tabla en memoria.
+    rows = Payslip.objects.annotate(month=TruncMonth('issue_date')).order_by(
+        'profile_id', 'month', 'position_order', 'created_at'
+    ).values_list('id', 'profile_id', 'data_source', 'amount', 'pdf_file', 'view_status', 'month')
+
+    batch = []
+    for (profile_id, period), group in groupby(rows.iterator(chunk_size=2000), key=lambda row: (row[1], row[6])):
+        batch.append(build_summary(PayslipPeriodSummary, profile_id, period, list(group)))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            PayslipPeriodSummary.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        PayslipPeriodSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0004_alter_payslip_view_status'),
+        ('profiles', '0006_profile_last_login'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayslipPeriodSummary',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated.')),
+                ('issue_date', models.DateField(help_text='Primer día del mes del periodo.')),
+                ('total_ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('total_descuentos', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('liquido_pagar', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('pdf_path', models.CharField(blank=True, default='', max_length=255)),
+                ('view_status', models.CharField(choices=[('unseen', 'No visto'), ('seen', 'Visto'), ('generated', 'Generado')], default='unseen', max_length=20)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslip_summaries', to='profiles.profile')),
+                ('reference_payslip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='payslips.payslip')),
+            ],
+            options={
+                'ordering': ['-issue_date'],
+                'constraints': [models.UniqueConstraint(fields=('profile', 'issue_date'), name='unique_payslip_summary_period')],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+def backfill_period(apps, schema_editor):
+    Payslip = apps.get_model('payslips', 'Payslip')
+
+    issue_dates = Payslip.objects.filter(period__isnull=True).order_by().values_list('issue_date', flat=True).distinct()
+    for issue_date in list(issue_dates):
+        Payslip.objects.filter(issue_date=issue_date).update(period=issue_date.replace(day=1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0005_payslipperiodsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='period',
+            field=models.DateField(editable=False, null=True, help_text='Primer día del mes de issue_date, para filtrar por periodo con índices.'),
+        ),
+        migrations.RunPython(backfill_period, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='payslip',
+            name='period',
+            field=models.DateField(editable=False, help_text='Primer día del mes de issue_date, para filtrar por periodo con índices.'),
+        ),
+        migrations.AddIndex(
+            model_name='payslip',
+            index=models.Index(fields=['profile', 'period'], name='payslip_profile_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payslip',
+            index=models.Index(fields=['period'], name='payslip_period_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0006_payslip_period'),
+        ('profiles', '0008_profile_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payslip',
+            index=models.Index(fields=['view_status', 'created_at'], name='payslip_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payslip',
+            index=models.Index(condition=models.Q(('view_status', 'seen')), fields=['updated_at'], name='payslip_seen_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payslip',
+            index=models.Index(condition=models.Q(('view_status', 'seen')), fields=['profile'], name='payslip_seen_profile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payslipperiodsummary',
+            index=models.Index(fields=['-issue_date', '-id'], name='summary_issue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payslipperiodsummary',
+            index=models.Index(fields=['view_status', '-issue_date'], name='summary_status_issue_idx'),
+        ),
+    ]
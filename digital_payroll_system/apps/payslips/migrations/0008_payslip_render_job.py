@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:55
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0007_payslip_indexes'),
+        ('profiles', '0008_profile_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayslipRenderJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated.')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En proceso'), ('completed', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=20)),
+                ('send_email', models.BooleanField(default=True)),
+                ('base_url', models.CharField(blank=True, help_text='Origen de la petición, para construir la URL absoluta del PDF.', max_length=255)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Desde cuándo puede tomarse (reintentos).')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('timings', models.JSONField(blank=True, default=dict, help_text='Milisegundos por etapa del último intento.')),
+                ('error_message', models.TextField(blank=True)),
+                ('payslip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='render_jobs', to='payslips.payslip')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='render_jobs', to='profiles.profile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['status', 'available_at'], name='render_job_status_avail_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0008_payslip_render_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='failed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='generated_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='kind',
+            field=models.CharField(choices=[('payslip', 'Boleta'), ('period', 'Periodo')], default='payslip', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='pdfs_per_second',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='period',
+            field=models.DateField(blank=True, help_text='Primer día del mes, en trabajos de periodo.', null=True),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='total_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='paysliprenderjob',
+            name='payslip',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='render_jobs', to='payslips.payslip'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0009_render_job_period'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='pdf_hash',
+            field=models.CharField(blank=True, default='', help_text='Hash del contenido con el que se generó pdf_file.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='cached_count',
+            field=models.PositiveIntegerField(default=0, help_text='Boletas cuyo PDF vigente se reutilizó sin volver a generarlo.'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0010_pdf_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='pdf_bytes_after',
+            field=models.PositiveBigIntegerField(default=0, help_text='Bytes de los PDF generados después de optimizarlos.'),
+        ),
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='pdf_bytes_before',
+            field=models.PositiveBigIntegerField(default=0, help_text='Bytes de los PDF generados antes de optimizarlos.'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0011_render_job_pdf_bytes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paysliprenderjob',
+            name='reference_payslip',
+            field=models.ForeignKey(blank=True, help_text='Boleta del periodo donde quedó guardado el PDF (puede no ser la solicitada).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reference_render_jobs', to='payslips.payslip'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from common.base_models import BaseModel
 from apps.profiles.models import Profile
 
@@ -11,7 +12,9 @@ class Payslip(BaseModel):
 
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='payslips')
     issue_date = models.DateField()
+    period = models.DateField(editable=False, help_text="Primer día del mes de issue_date, para filtrar por periodo con índices.")
     pdf_file = models.FileField(upload_to='payslips/', null=True, blank=True)
+    pdf_hash = models.CharField(max_length=64, blank=True, default='', help_text="Hash del contenido con el que se generó pdf_file.")
     view_status = models.CharField(max_length=20, choices=VIEW_STATUS_CHOICES, default='unseen')
 
     concept = models.CharField(max_length=150)
@@ -21,5 +24,102 @@ class Payslip(BaseModel):
     data_type = models.CharField(max_length=50)
     position_order = models.PositiveIntegerField()
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['profile', 'period'], name='payslip_profile_period_idx'),
+            models.Index(fields=['period'], name='payslip_period_idx'),
+            models.Index(fields=['view_status', 'created_at'], name='payslip_status_created_idx'),
+            models.Index(fields=['updated_at'], condition=models.Q(view_status='seen'), name='payslip_seen_updated_idx'),
+            models.Index(fields=['profile'], condition=models.Q(view_status='seen'), name='payslip_seen_profile_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # bulk_create no pasa por aquí: quien inserte por lotes debe asignar `period`.
+        self.period = self.issue_date.replace(day=1)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Payslip for {self.profile.dni} - {self.issue_date}"
+
+
+class PayslipPeriodSummary(BaseModel):
+    """
+    Resumen materializado de las boletas de un perfil en un mes: totales, boleta de
+    referencia, ruta del PDF y estado de visualización. Lo mantiene `services.period_summary`.
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='payslip_summaries')
+    issue_date = models.DateField(help_text="Primer día del mes del periodo.")
+    reference_payslip = models.ForeignKey(Payslip, on_delete=models.CASCADE, related_name='+')
+
+    total_ingresos = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    total_descuentos = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    liquido_pagar = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    pdf_path = models.CharField(max_length=255, blank=True, default='')
+    view_status = models.CharField(max_length=20, choices=Payslip.VIEW_STATUS_CHOICES, default='unseen')
+
+    class Meta:
+        ordering = ['-issue_date']
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'issue_date'], name='unique_payslip_summary_period'),
+        ]
+        indexes = [
+            models.Index(fields=['-issue_date', '-id'], name='summary_issue_date_idx'),
+            models.Index(fields=['view_status', '-issue_date'], name='summary_status_issue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Payslip summary for {self.profile_id} - {self.issue_date}"
+
+
+class PayslipRenderJob(BaseModel):
+    """
+    Generación en segundo plano del PDF de una boleta (render, almacenamiento, QR y correo)
+    o de todas las boletas de un periodo (`kind='period'`). La procesa
+    `manage.py process_render_jobs`; los fallos se reintentan con espera creciente.
+    """
+    KIND_CHOICES = (
+        ('payslip', 'Boleta'),
+        ('period', 'Periodo'),
+    )
+
+    STATUS_CHOICES = (
+        ('pending', 'Pendiente'),
+        ('running', 'En proceso'),
+        ('completed', 'Completado'),
+        ('failed', 'Fallido'),
+    )
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='payslip')
+    payslip = models.ForeignKey(Payslip, on_delete=models.CASCADE, null=True, blank=True, related_name='render_jobs')
+    reference_payslip = models.ForeignKey(
+        Payslip, on_delete=models.SET_NULL, null=True, blank=True, related_name='reference_render_jobs',
+        help_text="Boleta del periodo donde quedó guardado el PDF (puede no ser la solicitada)."
+    )
+    period = models.DateField(null=True, blank=True, help_text="Primer día del mes, en trabajos de periodo.")
+    requested_by = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True, blank=True, related_name='render_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    send_email = models.BooleanField(default=True)
+    base_url = models.CharField(max_length=255, blank=True, help_text="Origen de la petición, para construir la URL absoluta del PDF.")
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Desde cuándo puede tomarse (reintentos).")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    total_count = models.PositiveIntegerField(default=0)
+    generated_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    cached_count = models.PositiveIntegerField(default=0, help_text="Boletas cuyo PDF vigente se reutilizó sin volver a generarlo.")
+    pdfs_per_second = models.FloatField(null=True, blank=True)
+    pdf_bytes_before = models.PositiveBigIntegerField(default=0, help_text="Bytes de los PDF generados antes de optimizarlos.")
+    pdf_bytes_after = models.PositiveBigIntegerField(default=0, help_text="Bytes de los PDF generados después de optimizarlos.")
+    timings = models.JSONField(default=dict, blank=True, help_text="Milisegundos por etapa del último intento.")
+    error_message = models.TextField(blank=True)
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='render_job_status_avail_idx'),
+        ]
+
+    def __str__(self):
+        target = self.period if self.kind == 'period' else self.payslip_id
+        return f"PayslipRenderJob {self.kind} {target} ({self.status})"
@@ -0,0 +1,143 @@
+from datetime import datetime
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from apps.profiles.models import Profile
+from common.excel_reader import compile_columns
+from ..models import Payslip
+from .period_summary import refresh_period_summaries
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+REQUIRED_PAYSLIP_COLUMNS = {
+    "dni": ["DNI"],
+    "concept": ["Concepto"],
+    "amount": ["Monto"],
+    "data_source": ["OrigenDato"],
+    "payroll_type": ["TipoPlanilla"],
+    "data_type": ["TipoDato"],
+    "position_order": ["Posicion"],
+    "issue_date": ["Periodo"],
+}
+
+PAYSLIP_COLUMN_LOOKUP = compile_columns(REQUIRED_PAYSLIP_COLUMNS)
+
+MONTHS_MAP = {
+    "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
+    "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
+    "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
+}
+
+def parse_period(period_text):
+    try:
+        parts = period_text.upper().split()
+        month = MONTHS_MAP.get(parts[0], 1)
+        year = int(parts[1])
+        return datetime(year, month, 1).date()
+    except Exception:
+        return None
+
+def load_existing_keys(periods):
+    """
+    Carga en una sola consulta las llaves (perfil, concepto, periodo) ya registradas
+    para los periodos indicados.
+    """
+    if not periods:
+        return set()
+
+    return set(
+        Payslip.objects.filter(period__in=periods).values_list('profile_id', 'concept', 'period')
+    )
+
+def load_profile_ids():
+    return dict(Profile.objects.exclude(dni__isnull=True).values_list('dni', 'id'))
+
+def import_payslip_rows(rows, profile_ids=None, batch_size=BULK_CREATE_BATCH_SIZE):
+    """
+    Ingesta por conjuntos de filas de boletas.
+
+    `rows` es un iterable de (row_idx, row_data). Las filas se validan en memoria,
+    los duplicados se resuelven contra las llaves existentes de los periodos afectados
+    (una sola consulta) y las boletas se insertan con `bulk_create` por lotes. Al final se
+    recalculan los resúmenes por periodo de los perfiles afectados.
+    Devuelve los mismos conteos y errores por fila (row_idx, mensaje) que la carga fila a fila.
+    """
+    if profile_ids is None:
+        profile_ids = load_profile_ids()
+
+    row_errors = []
+    candidates = []
+
+    for row_idx, row_data in rows:
+        dni = str(row_data.get('dni')).strip() if row_data.get('dni') else None
+
+        if not dni:
+            row_errors.append((row_idx, f"Fila {row_idx}: DNI no encontrado. Se saltó la fila."))
+            continue
+
+        profile_id = profile_ids.get(dni)
+        if not profile_id:
+            row_errors.append((row_idx, f"Fila {row_idx}: Usuario con DNI {dni} no existe. Se saltó la fila."))
+            continue
+
+        period_text = str(row_data.get('issue_date'))
+        issue_date = parse_period(period_text)
+        if not issue_date:
+            row_errors.append((row_idx, f"Fila {row_idx}: Periodo '{period_text}' inválido. Se saltó la fila."))
+            continue
+
+        try:
+            amount = Decimal(str(row_data.get('amount')))
+        except Exception:
+            row_errors.append((row_idx, f"Fila {row_idx}: Monto inválido '{row_data.get('amount')}'. Se saltó la fila."))
+            continue
+
+        concept = str(row_data.get('concept')).upper()
+        candidates.append((row_idx, dni, profile_id, concept, amount, issue_date, row_data))
+
+    existing_keys = load_existing_keys({c[5] for c in candidates})
+    to_create = []
+
+    for row_idx, dni, profile_id, concept, amount, issue_date, row_data in candidates:
+        key = (profile_id, concept, issue_date)
+        if key in existing_keys:
+            row_errors.append((
+                row_idx,
+                f"Fila {row_idx}: Ya existe una boleta con el concepto '{concept}' "
+                f"para el periodo {issue_date.strftime('%Y-%m')}. Se saltó la fila."
+            ))
+            continue
+
+        try:
+            payslip = Payslip(
+                profile_id=profile_id,
+                concept=concept,
+                amount=amount,
+                data_source=str(row_data.get('data_source')).upper(),
+                payroll_type=str(row_data.get('payroll_type')).upper(),
+                data_type=str(row_data.get('data_type')).upper(),
+                position_order=int(row_data.get('position_order')),
+                issue_date=issue_date,
+                period=issue_date,
+                pdf_file='',
+                view_status='unseen'
+            )
+            payslip.clean_fields(exclude=['profile', 'pdf_file'])
+        except (ValidationError, TypeError, ValueError) as e:
+            row_errors.append((row_idx, f"Fila {row_idx}: Error al crear la boleta para DNI {dni}: {str(e)}. Se saltó la fila."))
+            continue
+
+        existing_keys.add(key)
+        to_create.append(payslip)
+
+    for start in range(0, len(to_create), batch_size):
+        Payslip.objects.bulk_create(to_create[start:start + batch_size])
+
+    refresh_period_summaries({(p.profile_id, p.issue_date) for p in to_create})
+
+    row_errors.sort(key=lambda e: e[0])
+
+    return {
+        'created_count': len(to_create),
+        'skipped_count': len(row_errors),
+        'errors': row_errors,
+    }
@@ -0,0 +1,179 @@
+import hashlib
+import json
+from decimal import Decimal
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from django.utils import timezone
+from common.cache import invalidate_profile_cache
+from ..models import Payslip
+from .pdf_renderers import get_renderer
+from .pdf_signing import signing_enabled, signing_fingerprint
+from .period_summary import refresh_period_summaries
+
+MONTHS_ES = [
+    "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
+    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
+]
+
+TOTAL_SOURCES = ('TOTALINGRESOS', 'TOTALDSCTO', 'LIQUIDOPAGAR')
+
+# Campos del contexto que cambian en cada render sin que cambie la boleta.
+VOLATILE_PAYLOAD_KEYS = ('print_date',)
+
+DOWNLOAD_LINK_SALT = 'payslips.download-link'
+
+def issue_date_label(issue_date):
+    return f"{MONTHS_ES[issue_date.month - 1]} {issue_date.year}"
+
+def pdf_download_path(payslip_id):
+    """
+    Ruta del PDF del periodo de una boleta: el endpoint de descarga, que comprueba el acceso.
+    Los archivos de MEDIA_ROOT no se publican.
+    """
+    return f"{reverse('payslips-download-payslip')}?id={payslip_id}"
+
+def signed_pdf_download_path(payslip_id):
+    """
+    Ruta de descarga para correos y QR: lleva un `token` firmado (TimestampSigner) sobre el id
+    que permite descargar sin sesión durante PAYSLIP_DOWNLOAD_LINK_MAX_AGE segundos.
+    """
+    signer = signing.TimestampSigner(salt=DOWNLOAD_LINK_SALT)
+    token = signer.sign(str(payslip_id)).split(signer.sep, 1)[1]
+    return f"{pdf_download_path(payslip_id)}&token={token}"
+
+def download_token_is_valid(payslip_id, token):
+    """True si `token` es una firma vigente de signed_pdf_download_path para `payslip_id`."""
+    signer = signing.TimestampSigner(salt=DOWNLOAD_LINK_SALT)
+    try:
+        signer.unsign(f"{payslip_id}{signer.sep}{token}", max_age=settings.PAYSLIP_DOWNLOAD_LINK_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+def period_concepts(reference_payslip):
+    """Conceptos del mismo perfil y periodo que la boleta de referencia."""
+    return Payslip.objects.filter(
+        profile_id=reference_payslip.profile_id,
+        period=reference_payslip.period
+    ).order_by('position_order')
+
+def reference_of(concepts):
+    """Igual que el resumen: la boleta que ya tiene PDF o, si no hay, el primer concepto."""
+    return next((item for item in concepts if item.pdf_file), concepts[0])
+
+def build_payslip_payload(reference_payslip, concepts, print_date=None):
+    """
+    Contexto de `boleta.html` para la boleta de referencia. `concepts` son las filas del
+    periodo ordenadas por `position_order`; el perfil debe venir con `user` y `work_details`.
+    """
+    profile = reference_payslip.profile
+    user = profile.user
+
+    ingresos_list = []
+    descuentos_list = []
+
+    total_ingresos = Decimal("0.00")
+    total_descuentos = Decimal("0.00")
+    liquido_pagar = Decimal("0.00")
+
+    for item in concepts:
+        if item.data_source in TOTAL_SOURCES:
+            if item.data_source == 'TOTALINGRESOS': total_ingresos = item.amount
+            if item.data_source == 'TOTALDSCTO': total_descuentos = item.amount
+            if item.data_source == 'LIQUIDOPAGAR': liquido_pagar = item.amount
+            continue
+
+        concept_data = {
+            "code": item.position_order,
+            "name": item.concept,
+            "amount": item.amount
+        }
+
+        if item.payroll_type == 'INGRESOS':
+            ingresos_list.append(concept_data)
+        elif item.payroll_type == 'DESCUENTOS':
+            descuentos_list.append(concept_data)
+
+    work_details = getattr(profile, 'work_details', None)
+
+    return {
+        "issue_date_es": issue_date_label(reference_payslip.issue_date),
+        "print_date": print_date or timezone.now().strftime("%d/%m/%Y"),
+        "dni": profile.dni,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "position": profile.position,
+        "description": profile.description,
+        "condition": profile.condition,
+        "regimen": profile.regimen,
+        "category": profile.category,
+        "worked_days": work_details.worked_days if work_details else 0,
+        "worked_hours": work_details.worked_hours if work_details else 0,
+        "discount_lateness": ((work_details.discount_lateness or 0) + (work_details.personal_leave_hours or 0)) if work_details else 0,
+        "start_date": profile.start_date.strftime("%d/%m/%Y") if profile.start_date else "—",
+        "end_date": profile.end_date.strftime("%d/%m/%Y") if profile.end_date else "VIGENTE",
+        "sistema_pension": profile.descriptionSP or "—",
+        "codigo_afiliado": profile.identification_code or "—",
+        "ingresos": ingresos_list,
+        "descuentos": descuentos_list,
+        "total_bruto": total_ingresos,
+        "total_descuento": total_descuentos,
+        "total_liquido": liquido_pagar,
+        "aporte_patronal": round(total_ingresos * Decimal("0.09"), 2),
+    }
+
+def payload_hash(payload, renderer=None):
+    """
+    Hash del contenido de la boleta: el contexto sin `print_date` más la versión del diseño
+    del renderizador y, si están activas, la optimización y el certificado de firma. Si no
+    cambia, el PDF guardado sigue siendo válido (conserva la fecha de impresión original).
+    """
+    renderer = renderer or settings.PAYSLIP_PDF_RENDERER
+    data = {key: value for key, value in payload.items() if key not in VOLATILE_PAYLOAD_KEYS}
+    encoded = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    version = f"{renderer}:{get_renderer(renderer)['fingerprint']()}"
+    if settings.PAYSLIP_PDF_OPTIMIZE:
+        version = f"{version}:optimizado"
+    if signing_enabled():
+        version = f"{version}:firma:{signing_fingerprint()}"
+    return hashlib.sha256(f"{version}:{encoded}".encode()).hexdigest()
+
+def pdf_is_current(payslip, pdf_hash):
+    """True si la boleta ya tiene en el storage un PDF generado con el mismo contenido."""
+    return bool(payslip.pdf_file) and payslip.pdf_hash == pdf_hash and payslip.pdf_file.storage.exists(payslip.pdf_file.name)
+
+def pdf_filename(payslip):
+    return f"boleta_{payslip.id}.pdf"
+
+def render_payslip_pdf(payload, renderer=None):
+    """Genera los bytes del PDF con el renderizador indicado o el de `PAYSLIP_PDF_RENDERER`."""
+    return get_renderer(renderer)['render'](payload)
+
+def save_pdf_file(payslip, pdf_bytes, pdf_hash, save=True):
+    """
+    Guarda el PDF reemplazando el anterior con el mismo nombre, en lugar de dejar una copia
+    con sufijo aleatorio por cada regeneración.
+    """
+    field = payslip.pdf_file
+    storage = field.storage
+    previous = field.name
+    name = field.field.generate_filename(payslip, pdf_filename(payslip))
+
+    if storage.exists(name):
+        storage.delete(name)
+    payslip.pdf_hash = pdf_hash
+    field.save(pdf_filename(payslip), ContentFile(pdf_bytes), save=save)
+    if previous and previous != field.name and storage.exists(previous):
+        storage.delete(previous)
+
+def store_payslip_pdf(reference_payslip, pdf_bytes, pdf_hash):
+    """
+    Guarda el PDF en la boleta de referencia, marca el periodo como generado y actualiza
+    el resumen y la caché del perfil.
+    """
+    save_pdf_file(reference_payslip, pdf_bytes, pdf_hash)
+    period_concepts(reference_payslip).update(view_status='generated')
+    refresh_period_summaries([(reference_payslip.profile_id, reference_payslip.issue_date)])
+    invalidate_profile_cache([reference_payslip.profile_id])
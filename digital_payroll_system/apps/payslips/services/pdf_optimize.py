@@ -0,0 +1,18 @@
+from io import BytesIO
+from pypdf import PdfReader, PdfWriter
+
+def optimize_pdf(pdf_bytes):
+    """
+    Reescribe el PDF con pypdf antes de guardarlo: comprime los content streams (Flate, sin
+    la capa ASCII85 que agregan xhtml2pdf y ReportLab) y fusiona los objetos idénticos, como
+    los subconjuntos de fuentes repetidos. Si el resultado no es menor, devuelve el original.
+    """
+    writer = PdfWriter(clone_from=PdfReader(BytesIO(pdf_bytes)))
+    for page in writer.pages:
+        page.compress_content_streams()
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
+    output = BytesIO()
+    writer.write(output)
+    optimized = output.getvalue()
+    return optimized if len(optimized) < len(pdf_bytes) else pdf_bytes
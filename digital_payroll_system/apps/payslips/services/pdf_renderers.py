@@ -0,0 +1,299 @@
+"""
+Backends que convierten el contexto de una boleta (`build_payslip_payload`) en un PDF.
+`settings.PAYSLIP_PDF_RENDERER` elige cuál usa la aplicación:
+
+- 'pisa': la plantilla `boleta.html` renderizada con xhtml2pdf.
+- 'reportlab': el mismo diseño dibujado directamente en un canvas de ReportLab, sin
+  interpretar HTML ni CSS.
+
+Cada backend declara `render(payload) -> bytes` y `fingerprint()`, que identifica su
+versión del diseño para el hash de contenido de los PDF guardados.
+"""
+import hashlib
+from functools import lru_cache
+from io import BytesIO
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+from django.utils.formats import localize
+from reportlab.lib.colors import HexColor, black
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from xhtml2pdf import pisa
+
+class PayslipRenderError(Exception):
+    pass
+
+# --- xhtml2pdf ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def pisa_fingerprint():
+    return hashlib.sha256(get_template('boleta.html').template.source.encode()).hexdigest()
+
+def render_with_pisa(payload):
+    html = render_to_string('boleta.html', payload)
+    pdf_buffer = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=pdf_buffer)
+    if pisa_status.err:
+        raise PayslipRenderError("Error al generar el PDF.")
+    return pdf_buffer.getvalue()
+
+# --- ReportLab ---------------------------------------------------------------------------
+
+# Cambiar al modificar el diseño dibujado, para invalidar los PDF guardados.
+REPORTLAB_LAYOUT_VERSION = 'boleta-reportlab-1'
+
+REGULAR = 'Helvetica'
+BOLD = 'Helvetica-Bold'
+LABEL_COLOR = HexColor('#444444')
+MUTED_COLOR = HexColor('#777777')
+RULE_COLOR = HexColor('#cccccc')
+
+PAGE_WIDTH, PAGE_HEIGHT = landscape(A4)
+MARGIN = 0.5 * cm
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+ROW_HEIGHT = 11
+
+def reportlab_fingerprint():
+    return REPORTLAB_LAYOUT_VERSION
+
+def display(value):
+    """Texto de un valor tal como lo imprime la plantilla (números localizados: 1500,00)."""
+    return str(localize(value))
+
+def fit_text(text, font, size, width):
+    """Recorta `text` con '…' para que no exceda `width`."""
+    text = str(text)
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '…', font, size) > width:
+        text = text[:-1]
+    return text + '…'
+
+def draw_pairs(pdf, x, y, parts):
+    """Dibuja en línea pares (texto, fuente, tamaño, color) y devuelve la x final."""
+    for text, font, size, color in parts:
+        pdf.setFont(font, size)
+        pdf.setFillColor(color)
+        pdf.drawString(x, y, text)
+        x += stringWidth(text, font, size)
+    pdf.setFillColor(black)
+    return x
+
+def draw_boxed_field(pdf, center_x, y, label, value, size=8.5):
+    label = f"{label} "
+    value = display(value)
+    label_width = stringWidth(label, BOLD, size)
+    value_width = stringWidth(value, BOLD, size) + 8
+    x = center_x - (label_width + value_width) / 2
+    draw_pairs(pdf, x, y, [(label, BOLD, size, LABEL_COLOR)])
+    pdf.rect(x + label_width, y - 2.5, value_width, size + 3.5, stroke=1, fill=0)
+    pdf.setFont(BOLD, size)
+    pdf.drawString(x + label_width + 4, y, value)
+
+def draw_concepts(pdf, x, y, width, concepts, empty_message, row_height):
+    # Con muchos conceptos las filas se comprimen (y la letra con ellas) para caber en la hoja.
+    size = min(9, row_height * 0.82)
+    name_width = width * 0.7 - 8
+    for concept in concepts:
+        pdf.setFont(REGULAR, size)
+        pdf.drawString(x + 4, y, fit_text(display(concept['name']), REGULAR, size, name_width))
+        pdf.drawRightString(x + width - 4, y, display(concept['amount']))
+        y -= row_height
+    if not concepts:
+        pdf.setFillColor(MUTED_COLOR)
+        pdf.setFont(REGULAR, 9)
+        pdf.drawString(x + 5, y, empty_message)
+        pdf.setFillColor(black)
+
+def render_with_reportlab(payload):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT), pageCompression=1)
+    pdf.setTitle("Boleta de Pagos de Remuneraciones")
+    pdf.setLineWidth(1)
+
+    left = MARGIN
+    right = PAGE_WIDTH - MARGIN
+    y = PAGE_HEIGHT - MARGIN - 9
+
+    # Encabezado institucional
+    pdf.setFont(REGULAR, 8.5)
+    pdf.drawString(left, y, "UNIVERSIDAD TECNOLOGICA DE LOS ANDES")
+    pdf.drawCentredString(left + CONTENT_WIDTH * 0.425, y, "RUC: 20104988204")
+    pdf.drawCentredString(left + CONTENT_WIDTH * 0.725, y, "SUB DIRECCION DE RECURSOS HUMANOS")
+    pdf.setFont(BOLD, 8.5)
+    pdf.drawRightString(right, y, "Nro. 18")
+    y -= 15
+    pdf.setFont(BOLD, 10)
+    pdf.drawCentredString(PAGE_WIDTH / 2, y, "PLANILLA PERSONAL DOCENTE CONTRATADO TIEMPO PARCIAL SEDE CENTRAL")
+    y -= 15
+    pdf.setFont(BOLD, 11)
+    pdf.drawCentredString(PAGE_WIDTH / 2, y, "BOLETA DE PAGOS DE REMUNERACIONES")
+    y -= 6
+    pdf.line(left, y, right, y)
+
+    # Fecha de impresión y periodo
+    y -= 16
+    draw_pairs(pdf, left, y, [
+        ("Fecha Impr.: ", BOLD, 9, LABEL_COLOR),
+        (display(payload['print_date']), BOLD, 9, black),
+    ])
+    pdf.setFont(BOLD, 10)
+    pdf.drawRightString(right, y, display(payload['issue_date_es']))
+    y -= 9
+
+    # Datos del trabajador
+    split_x = left + CONTENT_WIDTH * 0.6
+    top = y
+    pdf.line(left, top, right, top)
+    y -= 16
+    x = draw_pairs(pdf, left + 5, y, [("DNI: ", BOLD, 9, LABEL_COLOR), (display(payload['dni']), BOLD, 9, black)])
+    draw_pairs(pdf, x + 15, y, [(f"{display(payload['last_name'])}, {display(payload['first_name'])}", BOLD, 9, black)])
+    pdf.setFont(REGULAR, 8.5)
+    pdf.drawRightString(right - 5, y, fit_text(
+        f"{display(payload['position'])} {display(payload['description'])}", REGULAR, 8.5, CONTENT_WIDTH * 0.4 - 10
+    ))
+    y -= 14
+    start = f" {display(payload['start_date'])}"
+    pdf.setFont(REGULAR, 9)
+    pdf.drawRightString(right - 5, y, start)
+    draw_pairs(pdf, right - 5 - stringWidth(start, REGULAR, 9) - stringWidth("FechaIngreso:", BOLD, 9), y, [
+        ("FechaIngreso:", BOLD, 9, LABEL_COLOR),
+    ])
+
+    y -= 16
+    fields = [
+        ("Condición:", payload['condition']),
+        ("Régimen:", payload['regimen']),
+        ("Categoría:", payload['category']),
+        ("DíasPagar:", payload['worked_days']),
+        ("Hrs.Pagar:", payload['worked_hours']),
+        ("Tard. y PP:", payload['discount_lateness']),
+    ]
+    for index, (label, value) in enumerate(fields):
+        draw_boxed_field(pdf, left + CONTENT_WIDTH * (0.05 + 0.1 * index), y, label, display(value))
+    end = f" {display(payload['end_date'])}"
+    pdf.setFont(REGULAR, 8.5)
+    pdf.drawRightString(right - 5, y, end)
+    draw_pairs(pdf, right - 5 - stringWidth(end, REGULAR, 8.5) - stringWidth("FechaCese:", BOLD, 8.5), y, [
+        ("FechaCese:", BOLD, 8.5, LABEL_COLOR),
+    ])
+    y -= 8
+    pdf.setStrokeColor(RULE_COLOR)
+    pdf.line(split_x, top, split_x, y)
+    pdf.setStrokeColor(black)
+    pdf.line(left, y, right, y)
+
+    # Columnas de conceptos
+    totals_height = 24
+    column_width = CONTENT_WIDTH / 4
+    header_height = 15
+    ingresos = payload['ingresos']
+    descuentos = payload['descuentos']
+    pension_height = 34
+
+    available = y - MARGIN - totals_height - 8 - header_height - pension_height - 6
+    row_height = min(ROW_HEIGHT, available / max(len(ingresos), len(descuentos), 1))
+    box_height = header_height + max(
+        len(ingresos) * row_height + 6,
+        pension_height + len(descuentos) * row_height + 6,
+        120,
+    )
+    box_top = y
+    box_bottom = box_top - box_height
+
+    titles = [
+        ("Remuneraciones Ingresos", False),
+        ("Descuentos de Ley", True),
+        ("Descuentos Personales", False),
+        ("Días efectivos lab. y no lab.", False),
+    ]
+    for index, (title, centered) in enumerate(titles):
+        x = left + column_width * index
+        pdf.rect(x, box_bottom, column_width, box_height, stroke=1, fill=0)
+        pdf.line(x, box_top - header_height, x + column_width, box_top - header_height)
+        pdf.setFont(BOLD, 9)
+        if centered:
+            pdf.drawCentredString(x + column_width / 2, box_top - 11, title)
+        else:
+            pdf.drawString(x + 3, box_top - 11, title)
+
+    first_row = box_top - header_height - 11
+    draw_concepts(pdf, left, first_row, column_width, ingresos, "Sin conceptos", row_height)
+
+    x = left + column_width
+    pdf.setFont(REGULAR, 8)
+    pdf.drawString(x + 5, first_row, "Nombre del Sist. de Pensión:")
+    pdf.setFont(BOLD, 9)
+    pdf.drawString(x + 5, first_row - 10, fit_text(display(payload['sistema_pension']), BOLD, 9, column_width - 10))
+    pdf.setFont(REGULAR, 8)
+    pdf.drawString(x + 5, first_row - 21, f"Cód.Afil.Prof. {display(payload['codigo_afiliado'])}")
+    pdf.setStrokeColor(RULE_COLOR)
+    pdf.line(x, first_row - 26, x + column_width, first_row - 26)
+    pdf.setStrokeColor(black)
+    draw_concepts(pdf, x, first_row - pension_height - 3, column_width, descuentos, "Sin descuentos", row_height)
+
+    x = left + column_width * 2
+    pdf.setFillColor(MUTED_COLOR)
+    pdf.setFont(REGULAR, 9)
+    pdf.drawString(x + 5, first_row, "Ninguno")
+    pdf.setFillColor(black)
+
+    x = left + column_width * 3 + 5
+    inner_width = column_width - 10
+    days_top = box_top - header_height - 5
+    pdf.rect(x, days_top - 36, inner_width, 36, stroke=1, fill=0)
+    pdf.setFont(REGULAR, 9)
+    pdf.drawCentredString(x + inner_width / 2, days_top - 13, "Días Trab.")
+    pdf.setFont(BOLD, 13)
+    pdf.drawCentredString(x + inner_width / 2, days_top - 30, display(payload['worked_days']))
+    aporte_top = days_top - 46
+    pdf.rect(x, aporte_top - 38, inner_width, 38, stroke=1, fill=0)
+    pdf.setFont(BOLD, 8.5)
+    pdf.drawCentredString(x + inner_width / 2, aporte_top - 12, "Aporte Patronal")
+    pdf.line(x, aporte_top - 17, x + inner_width, aporte_top - 17)
+    pdf.setFont(REGULAR, 8.5)
+    pdf.drawString(x + 4, aporte_top - 30, "RPS. 9%")
+    pdf.setFont(BOLD, 8.5)
+    pdf.drawRightString(x + inner_width - 4, aporte_top - 30, display(payload['aporte_patronal']))
+
+    # Totales
+    y = box_bottom - 8
+    total_width = CONTENT_WIDTH / 3
+    totals = [
+        ("TOTAL", payload['total_bruto'], 9, 9),
+        ("TOT. DCTOS.", payload['total_descuento'], 9, 9),
+        ("LIQUIDO A PAGAR", payload['total_liquido'], 10, 11),
+    ]
+    for index, (label, value, label_size, value_size) in enumerate(totals):
+        x = left + total_width * index
+        pdf.setLineWidth(2 if index == 2 else 1)
+        pdf.rect(x, y - totals_height, total_width, totals_height, stroke=1, fill=0)
+        pdf.setFont(BOLD, label_size)
+        pdf.drawString(x + 5, y - 16, label)
+        pdf.setFont(BOLD, value_size)
+        pdf.drawRightString(x + total_width - 5, y - 16, display(value))
+    pdf.setLineWidth(1)
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+PDF_RENDERERS = {
+    'pisa': {
+        'render': render_with_pisa,
+        'fingerprint': pisa_fingerprint,
+    },
+    'reportlab': {
+        'render': render_with_reportlab,
+        'fingerprint': reportlab_fingerprint,
+    },
+}
+
+def get_renderer(name=None):
+    name = name or settings.PAYSLIP_PDF_RENDERER
+    try:
+        return PDF_RENDERERS[name]
+    except KeyError:
+        raise PayslipRenderError(f"Renderizador de boletas desconocido: {name}.")
@@ -0,0 +1,55 @@
+"""
+Funciones que ejecutan los procesos del pool de render. Este módulo no importa modelos al
+cargarse: con el método spawn los hijos lo importan antes de que `django.setup()` termine.
+"""
+import time
+
+def init_render_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    # El PKCS#12 se lee aquí una vez y el firmante queda en caché para todos los lotes del proceso.
+    from .pdf_signing import get_signer
+    get_signer()
+
+def render_batch_task(items):
+    """
+    [(id de la boleta, contexto)] -> [(id, bytes del PDF o None, error, métricas)]. Cada PDF se
+    optimiza si PAYSLIP_PDF_OPTIMIZE está activo y, con la firma activa, los PDF del lote se
+    firman juntos con el firmante del proceso. Métricas: `bytes_before` / `bytes_after` de la
+    optimización, `optimize_ms` y `sign_ms`.
+    """
+    from django.conf import settings
+    from .payslip_pdf import render_payslip_pdf
+    from .pdf_optimize import optimize_pdf
+    from .pdf_signing import sign_pdfs, signing_enabled
+
+    outcomes = []
+    rendered = []
+    for payslip_id, payload in items:
+        try:
+            pdf_bytes = render_payslip_pdf(payload)
+            metrics = {'bytes_before': len(pdf_bytes)}
+            if settings.PAYSLIP_PDF_OPTIMIZE:
+                started = time.perf_counter()
+                pdf_bytes = optimize_pdf(pdf_bytes)
+                metrics['optimize_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            metrics['bytes_after'] = len(pdf_bytes)
+            rendered.append((payslip_id, pdf_bytes, metrics))
+        except Exception as e:
+            outcomes.append((payslip_id, None, str(e), {}))
+
+    if not rendered or not signing_enabled():
+        return outcomes + [(payslip_id, pdf_bytes, None, metrics) for payslip_id, pdf_bytes, metrics in rendered]
+
+    try:
+        signed = sign_pdfs([pdf_bytes for _, pdf_bytes, _ in rendered])
+    except Exception as e:
+        return outcomes + [(payslip_id, None, f"Error al firmar: {e}", {}) for payslip_id, _, _ in rendered]
+    return outcomes + [
+        (payslip_id, pdf_bytes, None, {**metrics, 'sign_ms': sign_ms})
+        for (payslip_id, _, metrics), (pdf_bytes, sign_ms) in zip(rendered, signed)
+    ]
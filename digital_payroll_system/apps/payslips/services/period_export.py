@@ -0,0 +1,52 @@
+import logging
+from functools import partial
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from common.zip_stream import iter_zip
+from ..models import Payslip, PayslipPeriodSummary
+
+logger = logging.getLogger(__name__)
+
+def period_pdf_files(period, establishment=None, regimen=None):
+    """
+    (nombre dentro del ZIP, ruta en el storage) de cada PDF generado del mes, opcionalmente
+    filtrados por establecimiento o régimen del trabajador. Una sola consulta al resumen.
+    """
+    summaries = PayslipPeriodSummary.objects.filter(issue_date=period).exclude(pdf_path='')
+    if establishment:
+        summaries = summaries.filter(profile__establishment=establishment)
+    if regimen:
+        summaries = summaries.filter(profile__regimen=regimen)
+
+    rows = summaries.order_by('profile__user__last_name', 'profile__user__first_name', 'profile_id').values_list(
+        'pdf_path', 'profile_id', 'profile__dni', 'profile__user__last_name', 'profile__user__first_name'
+    )
+
+    files = []
+    used = set()
+    for pdf_path, profile_id, dni, last_name, first_name in rows:
+        base = get_valid_filename(f"{dni or profile_id}_{last_name or ''}_{first_name or ''}".strip('_'))
+        arcname = f"{base}.pdf"
+        suffix = 1
+        while arcname in used:
+            suffix += 1
+            arcname = f"{base}_{suffix}.pdf"
+        used.add(arcname)
+        files.append((arcname, pdf_path))
+    return files
+
+def iter_period_zip(files):
+    """Transmite el ZIP de `files`; los PDF que ya no están en el storage se omiten."""
+    storage = Payslip._meta.get_field('pdf_file').storage
+
+    def entries():
+        for arcname, name in files:
+            try:
+                size = storage.size(name)
+                modified = timezone.localtime(storage.get_modified_time(name))
+            except OSError:
+                logger.warning("PDF %s no encontrado; se omite del ZIP", name)
+                continue
+            yield arcname, partial(storage.open, name, 'rb'), size, modified
+
+    return iter_zip(entries())
@@ -0,0 +1,190 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+from urllib.parse import urljoin
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.notifications.services.email_service import build_payslip_email, send_bulk_emails
+from apps.notifications.services.qr_service import generate_qr_codes
+from common.cache import invalidate_profile_cache
+from ..models import Payslip
+from .payslip_pdf import (
+    build_payslip_payload,
+    payload_hash,
+    pdf_is_current,
+    reference_of,
+    save_pdf_file,
+    signed_pdf_download_path,
+)
+from .pdf_worker import init_render_worker, render_batch_task
+from .period_summary import period_payslips, refresh_period_summaries
+
+logger = logging.getLogger(__name__)
+
+def iter_period_payloads(period, profile_ids=None, print_date=None):
+    """
+    Recorre en una sola consulta los conceptos del mes (con perfil, usuario y work details)
+    y produce (boleta de referencia, contexto, hash del contenido) por cada perfil.
+    """
+    concepts = (
+        period_payslips(period)
+        .select_related('profile__user', 'profile__work_details')
+        .order_by('profile_id', 'position_order')
+    )
+    if profile_ids is not None:
+        concepts = concepts.filter(profile_id__in=profile_ids)
+
+    for _, group in groupby(concepts.iterator(chunk_size=2000), key=lambda item: item.profile_id):
+        group = list(group)
+        reference = reference_of(group)
+        payload = build_payslip_payload(reference, group, print_date=print_date)
+        yield reference, payload, payload_hash(payload)
+
+def store_period_batch(period, rendered):
+    """
+    Guarda los PDF de un lote y actualiza en bloque `pdf_file`, `view_status`, los
+    resúmenes y la caché de los perfiles.
+    """
+    for payslip, pdf_bytes in rendered:
+        save_pdf_file(payslip, pdf_bytes, payslip.pdf_hash, save=False)
+
+    profile_ids = [payslip.profile_id for payslip, _ in rendered]
+    with transaction.atomic():
+        Payslip.objects.bulk_update([payslip for payslip, _ in rendered], ['pdf_file', 'pdf_hash'])
+        period_payslips(period).filter(profile_id__in=profile_ids).update(
+            view_status='generated', updated_at=timezone.now()
+        )
+        refresh_period_summaries([(profile_id, period) for profile_id in profile_ids])
+        invalidate_profile_cache(profile_ids)
+
+def email_period_batch(payslips, base_url):
+    """Envía los correos de un lote por una sola conexión SMTP; devuelve las métricas del envío."""
+    urls = [urljoin(base_url or '/', signed_pdf_download_path(payslip.id)) for payslip in payslips]
+    qr_codes = generate_qr_codes(urls)
+    return send_bulk_emails(
+        build_payslip_email(
+            user=payslip.profile.user,
+            secure_url=pdf_url,
+            qr_bytes=qr_codes[pdf_url],
+            issue_date=payslip.issue_date
+        )
+        for payslip, pdf_url in zip(payslips, urls)
+    )
+
+def generate_period_pdfs(period, profile_ids=None, workers=None, batch_size=None,
+                         send_email=False, base_url='', on_progress=None):
+    """
+    Genera los PDF de todos los perfiles con boletas en el mes `period`. El render
+    (xhtml2pdf, limitado por CPU) y la firma, si está activa, se reparten entre un pool de
+    procesos; las consultas y escrituras se hacen en el proceso actual por lotes de
+    `batch_size` boletas. Las boletas cuyo PDF guardado tiene el mismo hash de contenido no
+    se vuelven a generar.
+
+    Devuelve conteos, milisegundos por etapa, PDFs por segundo, bytes de los PDF antes y
+    después de optimizarlos, milisegundos de firma de cada boleta (`sign_ms`, por id) y correos
+    enviados (con mensajes por segundo). `on_progress(result)` se llama al terminar cada lote.
+    """
+    workers = settings.PAYSLIP_RENDER_WORKERS if workers is None else workers
+    batch_size = batch_size or settings.PAYSLIP_RENDER_BATCH_SIZE
+    result = {
+        'total': 0, 'generated': 0, 'cached': 0, 'failed': 0, 'errors': [], 'timings': {}, 'pdfs_per_second': 0.0,
+        'pdf_bytes_before': 0, 'pdf_bytes_after': 0, 'emails_sent': 0, 'emails_failed': 0, 'emails_per_second': 0.0,
+        'sign_ms': {},
+    }
+    timings = dict.fromkeys(['query', 'render', 'store', 'email'], 0.0)
+    optimize_times = []
+    sign_times = result['sign_ms']
+    started = time.perf_counter()
+
+    # spawn: los procesos hijos no heredan la conexión abierta a la base de datos.
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_render_worker
+    ) if workers > 1 else None
+    try:
+        payloads = iter_period_payloads(period, profile_ids)
+        while True:
+            stage = time.perf_counter()
+            batch = list(islice(payloads, batch_size))
+            timings['query'] += time.perf_counter() - stage
+            if not batch:
+                break
+
+            stage = time.perf_counter()
+            cached = []
+            references = {}
+            items = []
+            for payslip, payload, pdf_hash in batch:
+                if pdf_is_current(payslip, pdf_hash):
+                    cached.append(payslip)
+                    continue
+                payslip.pdf_hash = pdf_hash
+                references[payslip.id] = payslip
+                items.append((payslip.id, payload))
+
+            if not items:
+                outcomes = []
+            elif pool:
+                chunksize = max(len(items) // (workers * 4), 1)
+                chunks = [items[start:start + chunksize] for start in range(0, len(items), chunksize)]
+                outcomes = [outcome for chunk in pool.map(render_batch_task, chunks) for outcome in chunk]
+            else:
+                outcomes = render_batch_task(items)
+            timings['render'] += time.perf_counter() - stage
+
+            rendered = []
+            for payslip_id, pdf_bytes, error, metrics in outcomes:
+                if error:
+                    result['errors'].append({'payslip_id': str(payslip_id), 'message': error})
+                    continue
+                rendered.append((references[payslip_id], pdf_bytes))
+                result['pdf_bytes_before'] += metrics['bytes_before']
+                result['pdf_bytes_after'] += metrics['bytes_after']
+                if 'optimize_ms' in metrics:
+                    optimize_times.append(metrics['optimize_ms'])
+                if metrics.get('sign_ms') is not None:
+                    sign_times[str(payslip_id)] = metrics['sign_ms']
+
+            stage = time.perf_counter()
+            if rendered:
+                store_period_batch(period, rendered)
+            timings['store'] += time.perf_counter() - stage
+
+            if send_email and (rendered or cached):
+                stage = time.perf_counter()
+                sent = email_period_batch([payslip for payslip, _ in rendered] + cached, base_url)
+                result['emails_sent'] += sent['sent']
+                result['emails_failed'] += sent['failed']
+                timings['email'] += time.perf_counter() - stage
+
+            result['total'] += len(batch)
+            result['generated'] += len(rendered)
+            result['cached'] += len(cached)
+            result['failed'] += len(items) - len(rendered)
+            if on_progress:
+                on_progress(result)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    timings['total'] = elapsed
+    result['timings'] = {stage: round(value * 1000, 2) for stage, value in timings.items()}
+    # La optimización y la firma ocurren dentro de 'render' (en los procesos del pool): se informa el tiempo por PDF.
+    if optimize_times:
+        result['timings']['optimize_per_pdf'] = round(sum(optimize_times) / len(optimize_times), 2)
+    if sign_times:
+        result['timings']['sign_per_pdf'] = round(sum(sign_times.values()) / len(sign_times), 2)
+        result['timings']['sign_max'] = max(sign_times.values())
+    result['pdfs_per_second'] = round(result['generated'] / elapsed, 2) if elapsed > 0 else 0.0
+    if timings['email'] > 0:
+        result['emails_per_second'] = round(result['emails_sent'] / timings['email'], 2)
+    logger.info(
+        "Periodo %s: %s PDF generados, %s sin cambios, %s fallidos, %.2f PDF/s",
+        period, result['generated'], result['cached'], result['failed'], result['pdfs_per_second']
+    )
+    return result
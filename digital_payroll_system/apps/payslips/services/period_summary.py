@@ -0,0 +1,119 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db.models import Case, Exists, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from common.cache import bump_cache_version, invalidate_profile_cache
+from ..models import Payslip, PayslipPeriodSummary
+
+SUMMARY_BATCH_SIZE = 1000
+
+SUMMARY_UPDATE_FIELDS = [
+    'reference_payslip', 'total_ingresos', 'total_descuentos', 'liquido_pagar',
+    'pdf_path', 'view_status', 'updated_at',
+]
+
+STATUS_BY_RANK = {2: 'seen', 1: 'generated', 0: 'unseen'}
+
+def period_of(d):
+    return d.replace(day=1)
+
+def period_payslips(period):
+    return Payslip.objects.filter(period=period)
+
+def compute_period_summaries(period, profile_ids=None):
+    """
+    Calcula en una sola consulta agrupada los resúmenes del mes `period`, opcionalmente
+    limitados a `profile_ids`. La boleta de referencia es la que tiene el PDF o, si no hay,
+    el primer concepto del mes.
+    """
+    payslips = period_payslips(period)
+    if profile_ids is not None:
+        payslips = payslips.filter(profile_id__in=profile_ids)
+
+    without_pdf = Q(pdf_file__isnull=True) | Q(pdf_file='')
+    reference = period_payslips(period).filter(profile_id=OuterRef('profile_id')).order_by(
+        Case(When(without_pdf, then=Value(1)), default=Value(0), output_field=IntegerField()),
+        'position_order',
+        'created_at',
+    ).values('id')[:1]
+
+    groups = payslips.values('profile_id').annotate(
+        total_ingresos=Max('amount', filter=Q(data_source='TOTALINGRESOS')),
+        total_descuentos=Max('amount', filter=Q(data_source='TOTALDSCTO')),
+        liquido_pagar=Max('amount', filter=Q(data_source='LIQUIDOPAGAR')),
+        pdf_path=Max('pdf_file', filter=~without_pdf),
+        status_rank=Max(Case(
+            When(view_status='seen', then=Value(2)),
+            When(view_status='generated', then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )),
+        reference_id=Subquery(reference),
+    ).order_by()
+
+    return [
+        PayslipPeriodSummary(
+            profile_id=g['profile_id'],
+            issue_date=period,
+            reference_payslip_id=g['reference_id'],
+            total_ingresos=g['total_ingresos'] or Decimal('0.00'),
+            total_descuentos=g['total_descuentos'] or Decimal('0.00'),
+            liquido_pagar=g['liquido_pagar'] or Decimal('0.00'),
+            pdf_path=g['pdf_path'] or '',
+            view_status=STATUS_BY_RANK[g['status_rank']],
+        )
+        for g in groups
+    ]
+
+def sync_period(period, profile_ids=None):
+    """
+    Sincroniza los resúmenes de un mes: inserta o actualiza los grupos con boletas y
+    elimina los que ya no tienen ninguna. Invalida la caché de los perfiles afectados.
+    Devuelve la cantidad de resúmenes escritos.
+    """
+    summaries = compute_period_summaries(period, profile_ids)
+    PayslipPeriodSummary.objects.bulk_create(
+        summaries,
+        batch_size=SUMMARY_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['profile', 'issue_date'],
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+
+    stale = PayslipPeriodSummary.objects.filter(issue_date=period).exclude(
+        Exists(period_payslips(period).filter(profile_id=OuterRef('profile_id')))
+    )
+    if profile_ids is not None:
+        stale = stale.filter(profile_id__in=profile_ids)
+    stale_profile_ids = list(stale.values_list('profile_id', flat=True))
+    stale.delete()
+    bump_cache_version('payslip-summaries')
+    invalidate_profile_cache({s.profile_id for s in summaries} | set(stale_profile_ids))
+
+    return len(summaries)
+
+def refresh_period_summaries(keys):
+    """
+    Recalcula los resúmenes afectados por un cambio. `keys` es un iterable de
+    (profile_id, fecha); se hace una consulta agrupada por cada mes involucrado.
+    """
+    profiles_by_period = defaultdict(set)
+    for profile_id, issue_date in keys:
+        profiles_by_period[period_of(issue_date)].add(profile_id)
+
+    for period, profile_ids in profiles_by_period.items():
+        sync_period(period, profile_ids)
+
+def rebuild_period_summaries(periods=None):
+    """
+    Reconstruye los resúmenes desde las boletas. Sin `periods` se recorren todos los meses
+    con boletas y se eliminan los resúmenes de meses que ya no tienen ninguna.
+    """
+    if periods is None:
+        periods = list(Payslip.objects.order_by('period').values_list('period', flat=True).distinct())
+        orphaned = PayslipPeriodSummary.objects.exclude(issue_date__in=periods)
+        orphaned_profile_ids = set(orphaned.values_list('profile_id', flat=True))
+        orphaned.delete()
+        bump_cache_version('payslip-summaries')
+        invalidate_profile_cache(orphaned_profile_ids)
+
+    return {period: sync_period(period) for period in periods}
@@ -0,0 +1,247 @@
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urljoin
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from apps.audit_logs.models import AuditLog
+from apps.notifications.services.email_service import send_payslip_email
+from apps.notifications.services.qr_service import generate_qr_code
+from ..models import Payslip, PayslipRenderJob
+from .payslip_pdf import (
+    build_payslip_payload,
+    issue_date_label,
+    payload_hash,
+    pdf_download_path,
+    pdf_is_current,
+    period_concepts,
+    reference_of,
+    render_payslip_pdf,
+    signed_pdf_download_path,
+    store_payslip_pdf,
+)
+from .pdf_optimize import optimize_pdf
+from .pdf_signing import sign_pdf, signing_enabled
+from .period_render import generate_period_pdfs
+
+logger = logging.getLogger(__name__)
+
+def enqueue_render_job(payslip, profile, base_url='', send_email=True):
+    return PayslipRenderJob.objects.create(
+        payslip=payslip,
+        requested_by=profile,
+        base_url=base_url,
+        send_email=send_email
+    )
+
+def enqueue_period_render_job(period, profile, base_url='', send_email=False):
+    return PayslipRenderJob.objects.create(
+        kind='period',
+        period=period,
+        requested_by=profile,
+        base_url=base_url,
+        send_email=send_email
+    )
+
+def start_render_job(job):
+    job.status = 'running'
+    job.attempts += 1
+    job.started_at = timezone.now()
+    job.finished_at = None
+    job.save(update_fields=['status', 'attempts', 'started_at', 'finished_at', 'updated_at'])
+    return job
+
+def reclaim_stale_render_jobs():
+    """
+    Devuelve a 'pending' los trabajos 'running' cuyo worker dejó de avanzar (sin guardar
+    progreso durante PAYSLIP_RENDER_STALE_AFTER segundos). Los que ya agotaron sus intentos
+    se marcan como fallidos. `.update()` no aplica auto_now, por eso se fija `updated_at`.
+    """
+    now = timezone.now()
+    stale = PayslipRenderJob.objects.filter(
+        status='running',
+        updated_at__lt=now - timedelta(seconds=settings.PAYSLIP_RENDER_STALE_AFTER)
+    )
+    failed = stale.filter(attempts__gte=settings.PAYSLIP_RENDER_MAX_ATTEMPTS).update(
+        status='failed',
+        error_message="El trabajo se interrumpió y agotó sus reintentos.",
+        finished_at=now,
+        updated_at=now
+    )
+    reclaimed = stale.update(status='pending', available_at=now, updated_at=now)
+    if failed or reclaimed:
+        logger.warning("Trabajos de generación de boletas abandonados: %s retomados, %s fallidos", reclaimed, failed)
+    return reclaimed
+
+def claim_next_render_job():
+    """
+    Toma el siguiente trabajo pendiente cuyo reintento ya venció, incluidos los abandonados
+    por un worker caído. En PostgreSQL usa SKIP LOCKED para que varios workers puedan
+    ejecutarse en paralelo.
+    """
+    reclaim_stale_render_jobs()
+
+    with transaction.atomic():
+        job = (
+            PayslipRenderJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=timezone.now())
+            .order_by('available_at')
+            .first()
+        )
+        if not job:
+            return None
+        return start_render_job(job)
+
+@contextmanager
+def timed(timings, stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+def pdf_absolute_url(job, payslip, signed=False):
+    """URL absoluta de descarga; `signed` agrega el token que permite abrirla sin sesión (correos y QR)."""
+    path = signed_pdf_download_path(payslip.id) if signed else pdf_download_path(payslip.id)
+    return urljoin(job.base_url or '/', path)
+
+def render_payslip(job, timings):
+    with timed(timings, 'query'):
+        requested = Payslip.objects.select_related('profile__user', 'profile__work_details').get(id=job.payslip_id)
+        concepts = list(period_concepts(requested))
+
+    # El PDF se guarda siempre en la boleta de referencia del periodo, como en la generación masiva;
+    # el trabajo conserva la boleta solicitada y registra aparte la de referencia.
+    payslip = reference_of(concepts)
+    payslip.profile = requested.profile
+    job.reference_payslip = payslip
+
+    payload = build_payslip_payload(payslip, concepts)
+    pdf_hash = payload_hash(payload)
+
+    job.cached_count = int(pdf_is_current(payslip, pdf_hash))
+    if not job.cached_count:
+        with timed(timings, 'render'):
+            pdf_bytes = render_payslip_pdf(payload)
+        job.pdf_bytes_before = len(pdf_bytes)
+        if settings.PAYSLIP_PDF_OPTIMIZE:
+            with timed(timings, 'optimize'):
+                pdf_bytes = optimize_pdf(pdf_bytes)
+        job.pdf_bytes_after = len(pdf_bytes)
+        if signing_enabled():
+            pdf_bytes, timings['sign'] = sign_pdf(pdf_bytes)
+        with timed(timings, 'store'), transaction.atomic():
+            store_payslip_pdf(payslip, pdf_bytes, pdf_hash)
+
+    if job.send_email:
+        pdf_url = pdf_absolute_url(job, payslip, signed=True)
+        with timed(timings, 'qr'):
+            qr_bytes = generate_qr_code(pdf_url)
+        with timed(timings, 'email'):
+            send_payslip_email(
+                user=payslip.profile.user,
+                secure_url=pdf_url,
+                qr_bytes=qr_bytes,
+                issue_date=payslip.issue_date
+            )
+
+    return f"Boleta generada del periodo {issue_date_label(payslip.issue_date)} para {payslip.profile.user.first_name}."
+
+def render_period(job, timings):
+    def save_progress(result):
+        job.total_count = result['total']
+        job.generated_count = result['generated']
+        job.failed_count = result['failed']
+        job.cached_count = result['cached']
+        job.pdf_bytes_before = result['pdf_bytes_before']
+        job.pdf_bytes_after = result['pdf_bytes_after']
+        job.save(update_fields=[
+            'total_count', 'generated_count', 'failed_count', 'cached_count',
+            'pdf_bytes_before', 'pdf_bytes_after', 'updated_at',
+        ])
+
+    result = generate_period_pdfs(
+        job.period,
+        send_email=job.send_email,
+        base_url=job.base_url,
+        on_progress=save_progress
+    )
+    save_progress(result)
+    timings.update(result['timings'])
+    job.pdfs_per_second = result['pdfs_per_second']
+    job.save(update_fields=['pdfs_per_second', 'updated_at'])
+
+    for error in result['errors']:
+        logger.warning("Periodo %s: no se pudo generar la boleta %s: %s", job.period, error['payslip_id'], error['message'])
+
+    description = (
+        f"Generación masiva de boletas del periodo {issue_date_label(job.period)}: "
+        f"{result['generated']} generadas, {result['cached']} sin cambios, {result['failed']} con errores "
+        f"({result['pdfs_per_second']} PDF/s)."
+    )
+    if job.send_email:
+        description += (
+            f" Correos: {result['emails_sent']} enviados, {result['emails_failed']} fallidos "
+            f"({result['emails_per_second']} msg/s)."
+        )
+    return description
+
+def run_render_job(job, retry=True):
+    """
+    Ejecuta el trabajo (una boleta o un periodo completo) registrando los milisegundos
+    de cada etapa. Si falla y quedan intentos (y `retry`), vuelve a 'pending' con una
+    espera que se duplica en cada intento.
+    """
+    timings = {}
+    started = time.perf_counter()
+
+    try:
+        description = render_period(job, timings) if job.kind == 'period' else render_payslip(job, timings)
+    except Exception as e:
+        logger.exception("Error al generar las boletas del trabajo %s", job.id)
+        timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+        job.timings = timings
+        job.error_message = str(e)
+
+        if retry and job.attempts < settings.PAYSLIP_RENDER_MAX_ATTEMPTS:
+            job.status = 'pending'
+            job.available_at = timezone.now() + timedelta(
+                seconds=settings.PAYSLIP_RENDER_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'available_at', 'finished_at', 'timings', 'error_message', 'updated_at'])
+        return job
+
+    timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+    job.status = 'completed'
+    job.timings = timings
+    job.error_message = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'reference_payslip', 'timings', 'error_message', 'cached_count',
+        'pdf_bytes_before', 'pdf_bytes_after', 'finished_at', 'updated_at',
+    ])
+
+    AuditLog.objects.create(
+        profile=job.requested_by,
+        action="GENERAR BOLETA",
+        description=description
+    )
+    return job
+
+def run_render_worker(once=False, sleep=2):
+    while True:
+        job = claim_next_render_job()
+        if job:
+            run_render_job(job)
+            logger.info("Trabajo %s (%s) %s en %sms", job.id, job.kind, job.status, job.timings.get('total'))
+            continue
+
+        if once:
+            return
+        time.sleep(sleep)
@@ -1,3 +1,1085 @@
-from django.test import TestCase
+import re
+import tempfile
+import time
+import zipfile
+from importlib import import_module
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import BytesIO
+from decimal import Decimal
+from unittest import mock
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.mail import get_connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import BestAvailableEncryption, pkcs12
+from cryptography.x509.oid import NameOID
+from pyhanko.pdf_utils.reader import PdfFileReader
+from pyhanko.sign import signers
+from pyhanko.sign.validation import validate_pdf_signature
+from pyhanko_certvalidator import ValidationContext
+from pypdf import PdfReader
+from rest_framework.test import APIClient
+from apps.profiles.models import Profile
+from common.tests.query_plans import QueryPlanAssertionsMixin
+from .models import Payslip, PayslipPeriodSummary, PayslipRenderJob
+from .services.payslip_import import import_payslip_rows
+from .services.period_summary import rebuild_period_summaries, refresh_period_summaries
+from .services.pdf_signing import get_signer, load_signer, sign_pdfs
+from .services.payslip_pdf import (
+    build_payslip_payload,
+    payload_hash,
+    period_concepts,
+    render_payslip_pdf,
+    signed_pdf_download_path,
+)
+from .services.period_render import generate_period_pdfs
+from .services.render_jobs import claim_next_render_job, run_render_job, run_render_worker
 
-# Create your tests here.
+
+def create_profile(username, dni, role='user', first_name='', last_name=''):
+    user = User.objects.create(username=username, first_name=first_name, last_name=last_name)
+    profile = user.profile
+    profile.dni = dni
+    profile.role = role
+    profile.save()
+    return user, profile
+
+
+def create_period(profile, issue_date, pdf_file=''):
+    rows = [
+        ('BASICO', 'BASICO', 'INGRESOS', Decimal('1500.00')),
+        ('TOTAL INGRESOS', 'TOTALINGRESOS', 'INGRESOS', Decimal('1500.00')),
+        ('TOTAL DESCUENTOS', 'TOTALDSCTO', 'DESCUENTOS', Decimal('200.00')),
+        ('LIQUIDO', 'LIQUIDOPAGAR', 'INGRESOS', Decimal('1300.00')),
+    ]
+    payslips = Payslip.objects.bulk_create([
+        Payslip(
+            profile=profile,
+            issue_date=issue_date,
+            period=issue_date.replace(day=1),
+            concept=concept,
+            amount=amount,
+            data_source=data_source,
+            payroll_type=payroll_type,
+            data_type='N',
+            position_order=position,
+            pdf_file=pdf_file if position == 0 else '',
+            view_status='generated' if pdf_file else 'unseen',
+        )
+        for position, (concept, data_source, payroll_type, amount) in enumerate(rows)
+    ])
+    refresh_period_summaries([(profile.id, issue_date)])
+    return payslips
+
+
+class ListPayslipsQueryCountTests(TestCase):
+    def setUp(self):
+        self.admin, self.admin_profile = create_profile('admin', 'ADMIN', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def seed(self, profiles, months):
+        for i in range(profiles):
+            _, profile = create_profile(f'user{i}', f'4000{i:04d}', first_name='JUAN', last_name=f'PEREZ {i}')
+            for month in range(1, months + 1):
+                create_period(profile, date(2025, month, 1), pdf_file=f'payslips/boleta_{i}_{month}.pdf')
+
+    def test_page_of_100_periods_uses_constant_queries(self):
+        self.seed(profiles=25, months=4)
+
+        # Una consulta para el total y otra para la página agrupada.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/payslips/list-payslips/', {'page_size': 100})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(len(data), 100)
+        self.assertTrue(all(row['full_name'].startswith('JUAN PEREZ') for row in data))
+        self.assertTrue(all(
+            row['pdf_url'] == f"http://testserver/api/payslips/download-payslip/?id={row['id']}" for row in data
+        ))
+        self.assertTrue(all(row['amount'] == 1300.0 for row in data))
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.seed(profiles=2, months=1)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/payslips/list-payslips/', {'page_size': 100})
+
+        self.assertEqual(len(response.json()['data']), 2)
+
+
+class MyPayslipsQueryCountTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_profile('40001234', '40001234', first_name='ANA', last_name='TORRES')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_page_of_monthly_payslips_uses_constant_queries(self):
+        for month in range(1, 13):
+            create_period(self.profile, date(2024, month, 1), pdf_file=f'payslips/boleta_{month}.pdf')
+        for month in range(1, 9):
+            create_period(self.profile, date(2025, month, 1))
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/payslips/my-payslips/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(len(data), 20)
+        self.assertEqual(data[0]['issue_date'], '2025-08-01')
+        self.assertIsNone(data[0]['pdf_url'])
+        self.assertEqual(data[0]['view_status'], 'unseen')
+        self.assertEqual(data[-1]['pdf_url'], f"http://testserver/api/payslips/download-payslip/?id={data[-1]['id']}")
+        self.assertEqual(data[-1]['view_status'], 'generated')
+
+    def test_only_own_payslips_are_listed(self):
+        _, other = create_profile('40009999', '40009999')
+        create_period(other, date(2025, 1, 1))
+        create_period(self.profile, date(2025, 2, 1))
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/payslips/my-payslips/', {'year': 2025})
+
+        data = response.json()['data']
+        self.assertEqual([row['issue_date'] for row in data], ['2025-02-01'])
+
+
+class PayslipImportTests(TestCase):
+    def setUp(self):
+        _, self.profile = create_profile('40001234', '40001234')
+        _, self.other = create_profile('40005678', '40005678')
+
+    def row(self, dni='40001234', concept='Basico', amount=1500, issue_date='MARZO 2025', position_order=0):
+        return {'dni': dni, 'concept': concept, 'amount': amount, 'data_source': 'basico',
+                'payroll_type': 'ingresos', 'data_type': 'n', 'position_order': position_order,
+                'issue_date': issue_date}
+
+    def test_valid_rows_are_created_in_chunks(self):
+        rows = [(idx, self.row(concept=f'Concepto {idx}', position_order=idx)) for idx in range(2, 7)]
+        rows.append((7, self.row(dni='40005678')))
+
+        with mock.patch.object(Payslip.objects, 'bulk_create', wraps=Payslip.objects.bulk_create) as bulk_create:
+            result = import_payslip_rows(rows, batch_size=2)
+
+        self.assertEqual(result, {'created_count': 6, 'skipped_count': 0, 'errors': []})
+        self.assertEqual(bulk_create.call_count, 3)
+        payslip = Payslip.objects.get(profile=self.profile, concept='CONCEPTO 2')
+        self.assertEqual(payslip.amount, Decimal('1500'))
+        self.assertEqual(payslip.data_source, 'BASICO')
+        self.assertEqual(payslip.period, date(2025, 3, 1))
+        self.assertEqual(payslip.view_status, 'unseen')
+
+    def test_rows_already_in_the_database_are_skipped(self):
+        import_payslip_rows([(2, self.row())])
+
+        result = import_payslip_rows([(2, self.row(amount=9999)), (3, self.row(issue_date='ABRIL 2025'))])
+
+        self.assertEqual(result['created_count'], 1)
+        self.assertEqual(result['skipped_count'], 1)
+        self.assertEqual(result['errors'], [
+            (2, "Fila 2: Ya existe una boleta con el concepto 'BASICO' para el periodo 2025-03. Se saltó la fila."),
+        ])
+        self.assertEqual(Payslip.objects.get(profile=self.profile, period=date(2025, 3, 1)).amount, Decimal('1500'))
+
+    def test_duplicates_within_one_upload_keep_the_first_row(self):
+        rows = [
+            (2, self.row(amount=100)),
+            (3, self.row(concept='basico', amount=200)),
+            (4, self.row(dni='40005678', amount=300)),
+        ]
+
+        result = import_payslip_rows(rows)
+
+        self.assertEqual(result['created_count'], 2)
+        self.assertEqual(result['errors'], [
+            (3, "Fila 3: Ya existe una boleta con el concepto 'BASICO' para el periodo 2025-03. Se saltó la fila."),
+        ])
+        self.assertEqual(Payslip.objects.get(profile=self.profile).amount, Decimal('100'))
+
+    def test_invalid_rows_are_reported_in_row_order(self):
+        rows = [
+            (6, self.row(position_order='primero')),
+            (2, self.row(dni=None)),
+            (3, self.row(dni='49999999')),
+            (4, self.row(issue_date='MARZO')),
+            (5, self.row(amount='mil')),
+            (7, self.row(concept='Liquido', position_order=1)),
+        ]
+
+        result = import_payslip_rows(rows)
+
+        self.assertEqual(result['created_count'], 1)
+        self.assertEqual(result['skipped_count'], 5)
+        self.assertEqual([idx for idx, _ in result['errors']], [2, 3, 4, 5, 6])
+        messages = dict(result['errors'])
+        self.assertEqual(messages[2], "Fila 2: DNI no encontrado. Se saltó la fila.")
+        self.assertEqual(messages[3], "Fila 3: Usuario con DNI 49999999 no existe. Se saltó la fila.")
+        self.assertEqual(messages[4], "Fila 4: Periodo 'MARZO' inválido. Se saltó la fila.")
+        self.assertEqual(messages[5], "Fila 5: Monto inválido 'mil'. Se saltó la fila.")
+        self.assertTrue(messages[6].startswith("Fila 6: Error al crear la boleta para DNI 40001234:"))
+        self.assertEqual(list(Payslip.objects.values_list('concept', flat=True)), ['LIQUIDO'])
+
+
+class PayslipPeriodSummaryTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_profile('40001234', '40001234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def summary(self):
+        return PayslipPeriodSummary.objects.get(profile=self.profile, issue_date=date(2025, 3, 1))
+
+    def test_import_creates_one_summary_per_period(self):
+        rows = [
+            (2, {'dni': '40001234', 'concept': 'Total Ingresos', 'amount': 2000, 'data_source': 'TOTALINGRESOS',
+                 'payroll_type': 'INGRESOS', 'data_type': 'N', 'position_order': 1, 'issue_date': 'MARZO 2025'}),
+            (3, {'dni': '40001234', 'concept': 'Liquido', 'amount': 1800, 'data_source': 'LIQUIDOPAGAR',
+                 'payroll_type': 'INGRESOS', 'data_type': 'N', 'position_order': 2, 'issue_date': 'MARZO 2025'}),
+        ]
+        import_payslip_rows(rows)
+
+        summary = self.summary()
+        self.assertEqual(summary.total_ingresos, Decimal('2000.00'))
+        self.assertEqual(summary.liquido_pagar, Decimal('1800.00'))
+        self.assertEqual(summary.view_status, 'unseen')
+        self.assertEqual(summary.reference_payslip.position_order, 1)
+
+    def test_migration_backfill_matches_the_summary_service(self):
+        backfill = import_module('apps.payslips.migrations.0005_payslipperiodsummary')
+        _, other = create_profile('40005678', '40005678')
+        create_period(self.profile, date(2025, 3, 1), pdf_file='payslips/boleta.pdf')
+        create_period(other, date(2025, 3, 1))
+        create_period(other, date(2025, 4, 1))
+        Payslip.objects.filter(profile=other, data_source='LIQUIDOPAGAR', period=date(2025, 3, 1)).update(
+            amount=Decimal('-150.00')
+        )
+        Payslip.objects.filter(profile=other, data_source='TOTALINGRESOS', period=date(2025, 4, 1)).delete()
+        refresh_period_summaries([(other.id, date(2025, 3, 1)), (other.id, date(2025, 4, 1))])
+
+        fields = ['profile_id', 'issue_date', 'reference_payslip_id', 'total_ingresos', 'total_descuentos',
+                  'liquido_pagar', 'pdf_path', 'view_status']
+        expected = sorted(PayslipPeriodSummary.objects.values_list(*fields))
+        PayslipPeriodSummary.objects.all().delete()
+
+        with mock.patch.object(backfill, 'BACKFILL_BATCH_SIZE', 2):
+            backfill.backfill_summaries(django_apps, None)
+
+        self.assertEqual(sorted(PayslipPeriodSummary.objects.values_list(*fields)), expected)
+        self.assertIn(Decimal('-150.00'), [row[5] for row in expected])
+
+    def test_view_and_delete_keep_summary_in_sync(self):
+        payslips = create_period(self.profile, date(2025, 3, 1), pdf_file='payslips/boleta.pdf')
+        reference = payslips[0]
+        self.assertEqual(self.summary().reference_payslip_id, reference.id)
+
+        self.client.get('/api/payslips/view-payslip/', {'id': str(reference.id)})
+        self.assertEqual(self.summary().view_status, 'seen')
+
+        Payslip.objects.filter(profile=self.profile).exclude(id=reference.id).delete()
+        refresh_period_summaries([(self.profile.id, date(2025, 3, 1))])
+        self.assertEqual(self.summary().liquido_pagar, Decimal('0.00'))
+
+        admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client.force_authenticate(admin)
+        self.client.delete('/api/payslips/delete-payslip/', {'id': str(reference.id)}, format='json')
+        self.assertFalse(PayslipPeriodSummary.objects.exists())
+
+    def test_rebuild_recreates_missing_summaries(self):
+        create_period(self.profile, date(2025, 3, 1))
+        PayslipPeriodSummary.objects.all().delete()
+
+        rebuilt = rebuild_period_summaries()
+
+        self.assertEqual(rebuilt, {date(2025, 3, 1): 1})
+        self.assertEqual(self.summary().total_descuentos, Decimal('200.00'))
+
+
+class ListPayslipsCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        for i in range(3):
+            _, profile = create_profile(f'user{i}', f'4000{i:04d}')
+            for month in range(1, 4):
+                create_period(profile, date(2025, month, 1))
+
+    def get_page(self, **params):
+        response = self.client.get('/api/payslips/list-payslips/', {'pagination': 'cursor', 'page_size': 4, **params})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body['data'], body['meta']['pagination']
+
+    def test_cursor_walks_all_periods_without_count(self):
+        with self.assertNumQueries(1):
+            first, pagination = self.get_page()
+        self.assertNotIn('total_items', pagination)
+        self.assertFalse(pagination['has_previous'])
+
+        second, pagination = self.get_page(cursor=pagination['next_cursor'])
+        third, pagination = self.get_page(cursor=pagination['next_cursor'])
+        self.assertFalse(pagination['has_next'])
+
+        ids = [row['id'] for row in first + second + third]
+        self.assertEqual(len(ids), 9)
+        self.assertEqual(len(set(ids)), 9)
+        dates = [row['issue_date'] for row in first + second + third]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+        back, _ = self.get_page(cursor=pagination['previous_cursor'])
+        self.assertEqual(back, second)
+
+    def test_backward_to_the_start_returns_a_full_first_page(self):
+        first, pagination = self.get_page(page_size=2)
+        rest, pagination = self.get_page(page_size=10, cursor=pagination['next_cursor'])
+        self.assertEqual(len(rest), 7)
+        self.assertFalse(pagination['has_next'])
+
+        back, pagination = self.get_page(page_size=10, cursor=pagination['previous_cursor'])
+        self.assertEqual(back, first + rest)
+        self.assertFalse(pagination['has_next'])
+        self.assertFalse(pagination['has_previous'])
+
+        _, pagination = self.get_page(page_size=2)
+        _, pagination = self.get_page(page_size=4, cursor=pagination['next_cursor'])
+        back, pagination = self.get_page(page_size=4, cursor=pagination['previous_cursor'])
+        self.assertEqual(back, (first + rest)[:4])
+        self.assertTrue(pagination['has_next'])
+        self.assertFalse(pagination['has_previous'])
+
+    def test_total_is_optional_and_bad_cursor_is_rejected(self):
+        _, pagination = self.get_page(with_total=1)
+        self.assertEqual(pagination['total_items'], 9)
+
+        response = self.client.get('/api/payslips/list-payslips/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ListPayslipsSearchTests(TestCase):
+    def setUp(self):
+        self.admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        _, self.pena = create_profile('40000001', '40000001', first_name='JOSÉ', last_name='PEÑA NÚÑEZ')
+        _, self.other = create_profile('40000002', '40000002', first_name='MARIA', last_name='PEREZ')
+        create_period(self.pena, date(2025, 1, 1))
+        create_period(self.other, date(2025, 1, 1))
+
+    def search(self, **params):
+        response = self.client.get('/api/payslips/list-payslips/', params)
+        return [row['profile_dni'] for row in response.json()['data']]
+
+    def test_name_search_ignores_accents_case_and_token_order(self):
+        self.assertEqual(self.search(name='nunez jose'), ['40000001'])
+        self.assertEqual(self.search(name='Peña'), ['40000001'])
+        self.assertEqual(self.search(name='pe'), ['40000001', '40000002'])
+
+    def test_search_name_follows_user_renames(self):
+        user = self.other.user
+        user.last_name = 'ÁLVAREZ'
+        user.save()
+        self.assertEqual(self.search(name='alvarez'), ['40000002'])
+
+    def test_dni_search_matches_substrings(self):
+        self.assertEqual(self.search(dni='0002'), ['40000002'])
+
+    def test_dni_search_ignores_case(self):
+        _, foreigner = create_profile('ce001234', 'ce001234')
+        create_period(foreigner, date(2025, 1, 1))
+        self.assertEqual(self.search(dni='CE0012'), ['ce001234'])
+        self.assertEqual(self.search(dni='ce0012'), ['ce001234'])
+
+
+class PayslipQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """Las consultas principales de boletas y resúmenes deben resolverse con índices."""
+
+    summaries = PayslipPeriodSummary._meta.db_table
+    payslips = Payslip._meta.db_table
+
+    @classmethod
+    def setUpTestData(cls):
+        # 200 perfiles x 12 meses x 4 conceptos. Casi todo está generado; el último mes sigue sin
+        # ver y solo algunos perfiles vieron enero, como en producción.
+        users = User.objects.bulk_create([User(username=f'4000{i:04d}') for i in range(200)])
+        cls.profiles = Profile.objects.bulk_create([Profile(user=user, dni=user.username) for user in users])
+        rows = ['TOTALINGRESOS', 'TOTALDSCTO', 'LIQUIDOPAGAR', 'BASICO']
+        payslips = []
+        for i, profile in enumerate(cls.profiles):
+            for month in range(1, 13):
+                status = 'unseen' if month == 12 else 'seen' if month == 1 and i % 20 == 0 else 'generated'
+                payslips.extend(
+                    Payslip(
+                        profile=profile,
+                        issue_date=date(2025, month, 1),
+                        period=date(2025, month, 1),
+                        concept=data_source,
+                        amount=Decimal('100.00'),
+                        data_source=data_source,
+                        position_order=position,
+                        pdf_file=f'payslips/boleta_{i}_{month}.pdf' if position == 0 and status != 'unseen' else '',
+                        view_status=status,
+                    )
+                    for position, data_source in enumerate(rows)
+                )
+        Payslip.objects.bulk_create(payslips, batch_size=1000)
+        rebuild_period_summaries()
+
+    def setUp(self):
+        self.admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, url, **params):
+        return lambda: self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def test_admin_listing_by_period(self):
+        self.assertQueriesUseIndex(self.get('/api/payslips/list-payslips/', year=2025, month=2), self.summaries)
+
+    def test_admin_listing_by_status(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/payslips/list-payslips/', status='seen'),
+            self.summaries,
+            index='summary_status_issue_idx'
+        )
+
+    def test_admin_listing_first_page(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/payslips/list-payslips/', pagination='cursor'),
+            self.summaries,
+            index='summary_issue_date_idx'
+        )
+
+    def test_employee_listing(self):
+        self.client.force_authenticate(self.profiles[0].user)
+        self.assertQueriesUseIndex(self.get('/api/payslips/my-payslips/'), self.summaries)
+
+    def test_generate_payslip_concepts(self):
+        reference = Payslip.objects.filter(profile=self.profiles[0], period=date(2025, 3, 1)).first()
+        self.assertQueriesUseIndex(
+            lambda: list(period_concepts(reference)),
+            self.payslips,
+            index='payslip_profile_period_idx'
+        )
+
+    def test_importer_duplicate_check(self):
+        row = {'dni': self.profiles[0].dni, 'concept': 'BONO', 'amount': 50, 'data_source': 'BONO',
+               'payroll_type': 'INGRESOS', 'data_type': 'N', 'position_order': 9, 'issue_date': 'MARZO 2025'}
+        self.assertQueriesUseIndex(
+            lambda: import_payslip_rows([(2, row)]),
+            self.payslips,
+            contains='"period" IN'
+        )
+
+    def test_dashboard_status_queries(self):
+        # 'generated' y 'unseen' abarcan gran parte de la tabla y contarlas recorriéndola es el plan
+        # correcto; las de 'seen' (último visto, tiempo de apertura) son pocas y deben usar índice.
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/dashboard-stats/'),
+            self.payslips,
+            contains="= 'seen'"
+        )
+
+
+class MyPayslipsCacheTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_profile('40001234', '40001234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payslips = create_period(self.profile, date(2025, 3, 1), pdf_file='payslips/boleta.pdf')
+
+    def get(self, **params):
+        body = self.client.get('/api/payslips/my-payslips/', params).json()
+        return body['data'], body['meta']['cacheHit']
+
+    def test_second_request_is_served_from_cache(self):
+        first, hit = self.get()
+        self.assertFalse(hit)
+
+        with self.assertNumQueries(0):
+            second, hit = self.get()
+        self.assertTrue(hit)
+        self.assertEqual(first, second)
+
+        _, hit = self.get(year=2025)
+        self.assertFalse(hit)
+
+    def test_viewing_a_payslip_invalidates_the_cache(self):
+        data, _ = self.get()
+        self.assertEqual(data[0]['view_status'], 'generated')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/api/payslips/view-payslip/', {'id': str(self.payslips[0].id)})
+
+        data, hit = self.get()
+        self.assertFalse(hit)
+        self.assertEqual(data[0]['view_status'], 'seen')
+
+    def test_import_invalidates_the_cache(self):
+        self.get()
+        rows = [(2, {'dni': '40001234', 'concept': 'Liquido', 'amount': 900, 'data_source': 'LIQUIDOPAGAR',
+                     'payroll_type': 'INGRESOS', 'data_type': 'N', 'position_order': 1, 'issue_date': 'ABRIL 2025'})]
+        with self.captureOnCommitCallbacks(execute=True):
+            import_payslip_rows(rows)
+
+        data, hit = self.get()
+        self.assertFalse(hit)
+        self.assertEqual([row['issue_date'] for row in data], ['2025-04-01', '2025-03-01'])
+
+    def test_period_sync_invalidates_the_cache(self):
+        self.get()
+        Payslip.objects.filter(profile=self.profile).update(amount=Decimal('2000.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_period_summaries([date(2025, 3, 1)])
+
+        data, hit = self.get()
+        self.assertFalse(hit)
+        self.assertEqual(data[0]['amount'], 2000.0)
+
+    def test_full_rebuild_invalidates_the_cache(self):
+        self.get()
+        Payslip.objects.filter(profile=self.profile).update(issue_date=date(2025, 4, 1), period=date(2025, 4, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_period_summaries()
+
+        data, hit = self.get()
+        self.assertFalse(hit)
+        self.assertEqual([row['issue_date'] for row in data], ['2025-04-01'])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user, self.profile = create_profile('40001234', '40001234')
+        self.admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client = APIClient()
+        self.payslips = create_period(self.profile, date(2025, 3, 1), pdf_file='payslips/boleta.pdf')
+
+    def test_my_payslips_answers_304_without_queries(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/payslips/my-payslips/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/payslips/my-payslips/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get('/api/payslips/my-payslips/', {'year': 2025}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_payslips_etag_changes_when_summaries_change(self):
+        self.client.force_authenticate(self.admin)
+        etag = self.client.get('/api/payslips/list-payslips/')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/payslips/list-payslips/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/api/payslips/view-payslip/', {'id': str(self.payslips[0].id)})
+
+        response = self.client.get('/api/payslips/list-payslips/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['data'][0]['view_status'], 'seen')
+
+    def test_list_users_etag_survives_logins(self):
+        self.client.force_authenticate(self.admin)
+        etag = self.client.get('/api/profiles/list-users/')['ETag']
+
+        self.profile.last_login = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save(update_fields=['last_login'])
+
+        response = self.client.get('/api/profiles/list-users/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.profile.position = 'DOCENTE'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save(update_fields=['position', 'updated_at'])
+
+        response = self.client.get('/api/profiles/list-users/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'][0]['position'], 'DOCENTE')
+
+
+def write_signing_pkcs12(directory, password='secreto'):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'Oficina de Remuneraciones')])
+    now = datetime.now(dt_timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    path = f"{directory}/firma.p12"
+    with open(path, 'wb') as file:
+        file.write(pkcs12.serialize_key_and_certificates(
+            b'firma', key, certificate, None, BestAvailableEncryption(password.encode())
+        ))
+    return path
+
+@override_settings(PAYSLIP_RENDER_IN_BACKGROUND=True, PAYSLIP_RENDER_MAX_ATTEMPTS=2, PAYSLIP_RENDER_WORKERS=1)
+class PayslipRenderJobTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user, self.profile = create_profile('40001234', '40001234', first_name='ANA', last_name='PEREZ')
+        self.user.email = 'ana@example.com'
+        self.user.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payslips = create_period(self.profile, date(2025, 3, 1))
+
+    def enqueue(self):
+        response = self.client.get('/api/payslips/generate-payslip/', {'id': str(self.payslips[0].id)})
+        self.assertEqual(response.status_code, 202)
+        return response.json()['data']
+
+    def test_generate_payslip_enqueues_and_worker_renders(self):
+        job = self.enqueue()
+        self.assertEqual(job['status'], 'pending')
+        self.assertFalse(Payslip.objects.exclude(pdf_file='').exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+
+        reference = Payslip.objects.get(id=self.payslips[0].id)
+        self.assertTrue(reference.pdf_file.name.endswith('.pdf'))
+        self.assertEqual(set(Payslip.objects.values_list('view_status', flat=True)), {'generated'})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ana@example.com'])
+
+        data = self.client.get('/api/payslips/render-status/', {'id': job['id']}).json()['data']
+        self.assertEqual(data['status'], 'completed')
+        self.assertEqual(data['attempts'], 1)
+        self.assertEqual(data['pdf_url'], f"http://testserver/api/payslips/download-payslip/?id={self.payslips[0].id}")
+        signed_url = re.search(r'href="([^"]+&amp;token=[^"]+)"', mail.outbox[0].alternatives[0][0]).group(1)
+        signed_url = signed_url.replace('&amp;', '&')
+        self.assertTrue(signed_url.startswith(data['pdf_url'] + '&token='))
+        self.assertEqual(APIClient().get(signed_url).status_code, 200)
+
+        self.assertEqual(self.client.get(data['pdf_url']).status_code, 200)
+        self.assertEqual(self.client.get('/media/' + reference.pdf_file.name).status_code, 404)
+        self.assertTrue({'query', 'render', 'store', 'qr', 'email', 'total'} <= set(data['timings']))
+
+    def test_unchanged_payslip_reuses_the_stored_pdf(self):
+        self.enqueue()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+        reference = Payslip.objects.exclude(pdf_file='').get()
+        storage = reference.pdf_file.storage
+
+        response = self.client.get('/api/payslips/generate-payslip/', {'id': str(self.payslips[2].id)})
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+        data = self.client.get('/api/payslips/render-status/', {'id': response.json()['data']['id']}).json()['data']
+        self.assertTrue(data['cached'])
+        self.assertNotIn('render', data['timings'])
+        self.assertEqual(data['payslip_id'], str(self.payslips[2].id))
+        self.assertEqual(data['reference_payslip_id'], str(reference.id))
+        self.assertIsNotNone(data['pdf_url'])
+        self.assertEqual(len(mail.outbox), 2)
+
+        download = self.client.get('/api/payslips/download-payslip/', {'id': data['payslip_id']})
+        self.assertEqual(download.status_code, 200)
+
+        Payslip.objects.filter(data_source='BASICO').update(amount=Decimal('1600.00'))
+        self.enqueue()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+        updated = Payslip.objects.exclude(pdf_file='').get()
+        self.assertEqual(updated.pdf_file.name, reference.pdf_file.name)
+        self.assertNotEqual(updated.pdf_hash, reference.pdf_hash)
+        self.assertEqual(storage.listdir('payslips')[1], [reference.pdf_file.name.split('/')[-1]])
+
+    def test_render_job_abandoned_by_a_crashed_worker_is_retried(self):
+        job = self.enqueue()
+        claim_next_render_job()
+        self.assertIsNone(claim_next_render_job())
+
+        PayslipRenderJob.objects.filter(id=job['id']).update(updated_at=timezone.now() - timedelta(minutes=30))
+        with self.captureOnCommitCallbacks(execute=True), \
+                self.assertLogs('apps.payslips.services.render_jobs', 'WARNING'):
+            run_render_worker(once=True)
+
+        data = self.client.get('/api/payslips/render-status/', {'id': job['id']}).json()['data']
+        self.assertEqual((data['status'], data['attempts']), ('completed', 2))
+        self.assertTrue(Payslip.objects.get(id=self.payslips[0].id).pdf_file)
+
+    def test_stale_render_job_without_attempts_left_fails(self):
+        job = self.enqueue()
+        PayslipRenderJob.objects.filter(id=job['id']).update(
+            status='running', attempts=2, updated_at=timezone.now() - timedelta(minutes=30)
+        )
+
+        with self.assertLogs('apps.payslips.services.render_jobs', 'WARNING'):
+            self.assertIsNone(claim_next_render_job())
+
+        data = self.client.get('/api/payslips/render-status/', {'id': job['id']}).json()['data']
+        self.assertEqual(data['status'], 'failed')
+        self.assertIsNotNone(data['finished_at'])
+        self.assertFalse(Payslip.objects.exclude(pdf_file='').exists())
+
+    @override_settings(PAYSLIP_RENDER_IN_BACKGROUND=False)
+    def test_inline_render_returns_the_requested_and_reference_ids(self):
+        self.client.get('/api/payslips/generate-payslip/', {'id': str(self.payslips[0].id)})
+        response = self.client.get('/api/payslips/generate-payslip/', {'id': str(self.payslips[2].id)})
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()['data']
+        self.assertEqual(data['id'], str(self.payslips[2].id))
+        self.assertEqual(data['reference_payslip_id'], str(self.payslips[0].id))
+        self.assertTrue(data['cached'])
+        self.assertTrue(Payslip.objects.get(id=data['reference_payslip_id']).pdf_file)
+
+    def test_payload_hash_ignores_print_date(self):
+        payload = {'dni': '40001234', 'total_liquido': Decimal('1300.00'), 'print_date': '01/03/2025'}
+        self.assertEqual(payload_hash(payload), payload_hash({**payload, 'print_date': '02/03/2025'}))
+        self.assertNotEqual(payload_hash(payload), payload_hash({**payload, 'total_liquido': Decimal('1300.01')}))
+
+    def test_renderers_produce_the_same_boleta(self):
+        reference = Payslip.objects.select_related('profile__user').get(id=self.payslips[0].id)
+        payload = build_payslip_payload(reference, list(period_concepts(reference)))
+
+        texts = {}
+        for renderer in ('pisa', 'reportlab'):
+            reader = PdfReader(BytesIO(render_payslip_pdf(payload, renderer=renderer)))
+            self.assertEqual(len(reader.pages), 1)
+            texts[renderer] = ' '.join(reader.pages[0].extract_text().split())
+
+        for expected in ('BOLETA DE PAGOS DE REMUNERACIONES', 'MARZO 2025', 'PEREZ, ANA', 'BASICO', '1300,00', 'Condición: None'):
+            for renderer, text in texts.items():
+                self.assertIn(expected, text, renderer)
+        self.assertNotEqual(payload_hash(payload, renderer='pisa'), payload_hash(payload, renderer='reportlab'))
+
+    @override_settings(PAYSLIP_PDF_RENDERER='reportlab')
+    def test_render_job_uses_the_configured_renderer(self):
+        self.enqueue()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+        reference = Payslip.objects.exclude(pdf_file='').get()
+        with reference.pdf_file.open('rb') as pdf:
+            self.assertEqual(PdfReader(pdf).metadata.producer.split()[0], 'ReportLab')
+
+    def test_failed_render_is_retried_until_attempts_run_out(self):
+        self.enqueue()
+        with mock.patch('apps.payslips.services.render_jobs.render_payslip_pdf', side_effect=RuntimeError('pisa')), \
+                self.assertLogs('apps.payslips.services.render_jobs', 'ERROR'):
+            job = run_render_job(claim_next_render_job())
+            self.assertEqual((job.status, job.attempts, job.error_message), ('pending', 1, 'pisa'))
+            self.assertIsNone(claim_next_render_job())
+
+            PayslipRenderJob.objects.update(available_at=job.created_at)
+            job = run_render_job(claim_next_render_job())
+            self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(Payslip.objects.exclude(pdf_file='').exists())
+
+    def test_render_status_is_limited_to_the_payslip_owner(self):
+        job = self.enqueue()
+        other, _ = create_profile('40009999', '40009999')
+        self.client.force_authenticate(other)
+        response = self.client.get('/api/payslips/render-status/', {'id': job['id']})
+        self.assertEqual(response.status_code, 404)
+
+    def test_generate_period_renders_every_profile_in_bulk(self):
+        _, other = create_profile('40005678', '40005678')
+        create_period(other, date(2025, 3, 1))
+        create_period(other, date(2025, 4, 1))
+        Payslip.objects.filter(profile=self.profile).update(view_status='seen')
+
+        admin, _ = create_profile('admin', 'ADMIN', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.post('/api/payslips/generate-period/', {'year': 2025, 'month': 3}, format='json')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['data']['id']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+
+        data = self.client.get('/api/payslips/render-status/', {'id': job_id}).json()['data']
+        self.assertEqual((data['status'], data['kind'], data['period']), ('completed', 'period', '2025-03'))
+        self.assertEqual((data['total_count'], data['generated_count'], data['failed_count']), (2, 2, 0))
+        self.assertGreater(data['pdfs_per_second'], 0)
+
+        response = self.client.post('/api/payslips/generate-period/', {'year': 2025, 'month': 3}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+        data = self.client.get('/api/payslips/render-status/', {'id': response.json()['data']['id']}).json()['data']
+        self.assertEqual((data['generated_count'], data['cached_count']), (0, 2))
+
+        march = Payslip.objects.filter(period=date(2025, 3, 1))
+        self.assertEqual(set(march.values_list('view_status', flat=True)), {'generated'})
+        self.assertEqual(march.exclude(pdf_file='').count(), 2)
+        self.assertFalse(Payslip.objects.filter(period=date(2025, 4, 1)).exclude(pdf_file='').exists())
+        self.assertFalse(PayslipPeriodSummary.objects.filter(issue_date=date(2025, 3, 1), pdf_path='').exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+
+    def enable_signing(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        signing = override_settings(PAYSLIP_SIGNING_PKCS12=write_signing_pkcs12(directory.name), PAYSLIP_SIGNING_PASSWORD='secreto')
+        signing.enable()
+        self.addCleanup(signing.disable)
+        load_signer.cache_clear()
+        self.addCleanup(load_signer.cache_clear)
+
+    def assert_signed(self, payslip):
+        with payslip.pdf_file.open('rb') as pdf:
+            signatures = PdfFileReader(BytesIO(pdf.read())).embedded_signatures
+        self.assertEqual([signature.field_name for signature in signatures], ['FirmaBoleta'])
+        trusted = ValidationContext(trust_roots=[get_signer().signing_cert])
+        status = validate_pdf_signature(signatures[0], signer_validation_context=trusted)
+        self.assertTrue(status.intact and status.valid and status.trusted)
+
+    def test_render_job_signs_the_pdf_with_the_cached_certificate(self):
+        self.enable_signing()
+        unsigned_hash = Payslip.objects.get(id=self.payslips[0].id).pdf_hash
+        job = self.enqueue()
+        with mock.patch('pyhanko.sign.signers.SimpleSigner.load_pkcs12', wraps=signers.SimpleSigner.load_pkcs12) as load, \
+                self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+            Payslip.objects.filter(data_source='BASICO').update(amount=Decimal('1600.00'))
+            self.enqueue()
+            run_render_worker(once=True)
+        self.assertEqual(load.call_count, 1)
+
+        reference = Payslip.objects.exclude(pdf_file='').get()
+        self.assert_signed(reference)
+        self.assertNotEqual(reference.pdf_hash, unsigned_hash)
+        data = self.client.get('/api/payslips/render-status/', {'id': job['id']}).json()['data']
+        self.assertGreater(data['timings']['sign'], 0)
+
+    def test_period_bulk_render_signs_every_pdf(self):
+        self.enable_signing()
+        _, other = create_profile('40005678', '40005678')
+        create_period(other, date(2025, 3, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = generate_period_pdfs(date(2025, 3, 1), workers=1)
+
+        self.assertEqual((result['generated'], result['failed']), (2, 0))
+        self.assertGreater(result['timings']['sign_per_pdf'], 0)
+        references = Payslip.objects.exclude(pdf_file='')
+        self.assertEqual(set(result['sign_ms']), {str(reference.id) for reference in references})
+        self.assertTrue(all(ms > 0 for ms in result['sign_ms'].values()))
+        self.assertEqual(result['timings']['sign_max'], max(result['sign_ms'].values()))
+        for reference in references:
+            self.assert_signed(reference)
+
+    def test_sign_pdfs_without_signing_returns_the_documents_unchanged(self):
+        documents = [b'%PDF-1.4 uno', b'%PDF-1.4 dos']
+        self.assertEqual(sign_pdfs(documents), [(b'%PDF-1.4 uno', None), (b'%PDF-1.4 dos', None)])
+
+        result = generate_period_pdfs(date(2025, 3, 1), workers=1)
+        self.assertEqual(result['sign_ms'], {})
+        self.assertNotIn('sign_per_pdf', result['timings'])
+
+    def test_period_bulk_render_refreshes_updated_at(self):
+        stale = timezone.now() - timedelta(days=1)
+        Payslip.objects.update(updated_at=stale)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            generate_period_pdfs(date(2025, 3, 1), workers=1)
+
+        for payslip in Payslip.objects.all():
+            self.assertEqual(payslip.view_status, 'generated')
+            self.assertGreater(payslip.updated_at, stale)
+
+    @override_settings(PAYSLIP_PDF_OPTIMIZE=True)
+    def test_optimized_pdf_is_smaller_and_records_sizes(self):
+        unoptimized_hash = payload_hash({'dni': '40001234'})
+        with override_settings(PAYSLIP_PDF_OPTIMIZE=False):
+            self.assertNotEqual(payload_hash({'dni': '40001234'}), unoptimized_hash)
+
+        job = self.enqueue()
+        with self.captureOnCommitCallbacks(execute=True):
+            run_render_worker(once=True)
+
+        data = self.client.get('/api/payslips/render-status/', {'id': job['id']}).json()['data']
+        self.assertLess(data['pdf_bytes_after'], data['pdf_bytes_before'])
+        self.assertIn('optimize', data['timings'])
+        reference = Payslip.objects.exclude(pdf_file='').get()
+        self.assertEqual(reference.pdf_file.size, data['pdf_bytes_after'])
+        with reference.pdf_file.open('rb') as pdf:
+            self.assertIn('MARZO 2025', PdfReader(pdf).pages[0].extract_text())
+
+    @override_settings(PAYSLIP_PDF_OPTIMIZE=True)
+    def test_period_bulk_render_optimizes_before_signing(self):
+        self.enable_signing()
+        with self.captureOnCommitCallbacks(execute=True):
+            result = generate_period_pdfs(date(2025, 3, 1), workers=1)
+
+        self.assertEqual(result['generated'], 1)
+        self.assertLess(result['pdf_bytes_after'], result['pdf_bytes_before'])
+        self.assertIn('optimize_per_pdf', result['timings'])
+        self.assert_signed(Payslip.objects.exclude(pdf_file='').get())
+
+    def test_period_emails_are_sent_as_one_batch(self):
+        _, other = create_profile('40005678', '40005678')
+        other.user.email = 'luis@example.com'
+        other.user.save()
+        create_period(other, date(2025, 3, 1))
+
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('apps.notifications.services.email_service.get_connection', wraps=get_connection) as connect:
+            result = generate_period_pdfs(date(2025, 3, 1), workers=1, send_email=True, base_url='http://testserver')
+
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual((result['emails_sent'], result['emails_failed']), (2, 0))
+        self.assertGreater(result['emails_per_second'], 0)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), ['ana@example.com', 'luis@example.com'])
+
+class PayslipDownloadTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user, self.profile = create_profile('40001234', '40001234')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.payslips = create_period(self.profile, date(2025, 3, 1))
+        self.content = b'%PDF-1.4 ' + bytes(range(256)) * 4
+        reference = self.payslips[0]
+        reference.pdf_hash = 'abc123'
+        reference.pdf_file.save('boleta.pdf', ContentFile(self.content))
+
+    def download(self, payslip=None, **headers):
+        payslip = payslip or self.payslips[2]
+        return self.client.get('/api/payslips/download-payslip/', {'id': str(payslip.id)}, **headers)
+
+    def test_owner_downloads_the_period_pdf_with_validators(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], '"abc123"')
+        self.assertIn('boleta_40001234_2025-03.pdf', response['Content-Disposition'])
+
+        response = self.download(HTTP_IF_NONE_MATCH='"abc123"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        response = self.download(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 0-9/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[:10])
+
+        response = self.download(HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-5:])
+
+        response = self.download(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.download(HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    @override_settings(FILE_DOWNLOAD_SENDFILE='x-accel-redirect')
+    def test_proxy_serves_the_bytes(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.payslips[0].pdf_file.name}')
+
+    def test_other_users_cannot_download(self):
+        other, _ = create_profile('40009999', '40009999')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.download().status_code, 403)
+
+    def test_anonymous_requests_are_rejected(self):
+        anonymous = APIClient()
+        response = anonymous.get('/api/payslips/download-payslip/', {'id': str(self.payslips[2].id)})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(anonymous.get('/api/payslips/my-payslips/').status_code, 401)
+
+    def test_signed_link_downloads_without_a_session(self):
+        anonymous = APIClient()
+        url = signed_pdf_download_path(self.payslips[2].id)
+        response = anonymous.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        other = signed_pdf_download_path(self.payslips[1].id).split('&token=')[1]
+        forged = anonymous.get('/api/payslips/download-payslip/', {'id': str(self.payslips[2].id), 'token': other})
+        self.assertEqual(forged.status_code, 403)
+
+        signed_at = time.time()
+        with mock.patch('django.core.signing.time.time', return_value=signed_at - 31 * 24 * 60 * 60):
+            expired = signed_pdf_download_path(self.payslips[2].id)
+        self.assertEqual(anonymous.get(expired).status_code, 403)
+
+
+class PayslipPeriodExportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.admin, _ = create_profile('admin', '00000001', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.period = date(2025, 3, 1)
+        self.contents = {}
+        for dni, last_name, establishment in (('40001234', 'PEREZ', 'SEDE CENTRAL'), ('40005678', 'QUISPE', 'FILIAL SUR')):
+            _, profile = create_profile(dni, dni, first_name='ANA', last_name=last_name)
+            profile.establishment = establishment
+            profile.save()
+            reference = create_period(profile, self.period)[0]
+            self.contents[dni] = f'%PDF-1.4 {dni} '.encode() * 2000
+            reference.pdf_file.save('boleta.pdf', ContentFile(self.contents[dni]))
+            refresh_period_summaries([(profile.id, self.period)])
+
+    def export(self, **params):
+        return self.client.get('/api/payslips/export-period/', {'year': 2025, 'month': 3, **params})
+
+    def read_zip(self, response):
+        return zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+
+    def test_admin_streams_every_generated_pdf(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('boletas_2025-03.zip', response['Content-Disposition'])
+
+        archive = self.read_zip(response)
+        self.assertEqual(archive.namelist(), ['40001234_PEREZ_ANA.pdf', '40005678_QUISPE_ANA.pdf'])
+        self.assertEqual(archive.read('40005678_QUISPE_ANA.pdf'), self.contents['40005678'])
+        self.assertIsNone(archive.testzip())
+
+    def test_filters_by_establishment(self):
+        archive = self.read_zip(self.export(establishment='FILIAL SUR'))
+        self.assertEqual(archive.namelist(), ['40005678_QUISPE_ANA.pdf'])
+        self.assertEqual(self.export(regimen='728').status_code, 404)
+
+    def test_only_admins_can_export(self):
+        user = User.objects.get(username='40001234')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.export().status_code, 403)
@@ -1,51 +1,49 @@
 import time
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from uuid import UUID
-from openpyxl import load_workbook
-from apps.profiles.models import Profile
-from .models import Payslip
-import unicodedata
+from apps.profiles.services.search import dni_search_filter, name_search_filter
+from .models import Payslip, PayslipPeriodSummary, PayslipRenderJob
 from common.response_handler import APIResponse
+from common.excel_reader import ExcelSheetReader, missing_columns
+from common.cache import (
+    bump_cache_version,
+    cache_version,
+    cached_for_profile,
+    invalidate_all_profile_caches,
+    invalidate_profile_cache,
+    profile_cache_key,
+    profile_cache_state,
+)
+from common.conditional import make_etag, not_modified_response, set_validators, version_timestamp
+from common.file_responses import stored_file_response
+from common.pagination import InvalidCursor, paginate_by_cursor, wants_cursor_pagination
 from apps.audit_logs.models import AuditLog
-from datetime import datetime
-from decimal import Decimal
-from django.template.loader import render_to_string
-from django.core.files.base import ContentFile
-from xhtml2pdf import pisa
-from io import BytesIO
-from django.utils import timezone
+from datetime import date, datetime
+from django.conf import settings
+from django.urls import reverse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from apps.notifications.services.email_service import send_payslip_email
-from apps.notifications.services.qr_service import generate_qr_code
-from django.db.models import Max, Q, Subquery, OuterRef, F, Value, CharField
-from django.db.models.functions import Concat, ExtractMonth, ExtractYear
+from django.utils.http import content_disposition_header
+from django.utils.text import get_valid_filename
+from .services.payslip_import import PAYSLIP_COLUMN_LOOKUP, REQUIRED_PAYSLIP_COLUMNS, import_payslip_rows
+from .services.payslip_pdf import MONTHS_ES, download_token_is_valid, pdf_download_path
+from .services.period_export import iter_period_zip, period_pdf_files
+from .services.period_summary import refresh_period_summaries
+from .services.render_jobs import (
+    enqueue_period_render_job,
+    enqueue_render_job,
+    pdf_absolute_url,
+    run_render_job,
+    start_render_job,
+)
+from apps.import_jobs.services.job_runner import enqueue_import_job
+from apps.import_jobs.views import import_job_accepted, wants_background
+from django.db.models import Q
 from django.db import transaction
 
-MONTHS_ES = [
-    "ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO",
-    "JULIO", "AGOSTO", "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE"
-]
-
-REQUIRED_PAYSLIP_COLUMNS = {
-    "dni": ["DNI"],
-    "concept": ["Concepto"],
-    "amount": ["Monto"],
-    "data_source": ["OrigenDato"],
-    "payroll_type": ["TipoPlanilla"],
-    "data_type": ["TipoDato"],
-    "position_order": ["Posicion"],
-    "issue_date": ["Periodo"],
-}
-
-def normalize(s):
-    """Quita acentos, espacios y pasa a minúsculas"""
-    if not s:
-        return ''
-    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-    return s.replace(' ', '').lower()
-
 def to_upper(val):
     return str(val).upper() if val else None
 
@@ -59,25 +57,114 @@ def parse_date(val):
     except Exception:
         return None 
 
-def parse_period(period_text):
-    try:
-        months = {
-            "ENERO": 1, "FEBRERO": 2, "MARZO": 3, "ABRIL": 4,
-            "MAYO": 5, "JUNIO": 6, "JULIO": 7, "AGOSTO": 8,
-            "SEPTIEMBRE": 9, "OCTUBRE": 10, "NOVIEMBRE": 11, "DICIEMBRE": 12
-        }
-        parts = period_text.upper().split()
-        month = months.get(parts[0], 1)
-        year = int(parts[1])
-        return datetime(year, month, 1).date()
-    except Exception:
+def period_filter(year=None, month=None, field='issue_date'):
+    """
+    Filtro por año/mes sobre una columna de periodo (primer día del mes) expresado como
+    igualdad o rango, para que use índices. Solo el mes sin año requiere extraer el mes.
+    """
+    year = int(year) if year else None
+    month = int(month) if month else None
+    if year and month:
+        return Q(**{field: date(year, month, 1)})
+    if year:
+        return Q(**{f"{field}__gte": date(year, 1, 1), f"{field}__lt": date(year + 1, 1, 1)})
+    if month:
+        return Q(**{f"{field}__month": month})
+    return Q()
+
+def build_pdf_url(request, payslip_id, pdf_path):
+    """URL absoluta de descarga del PDF del periodo, o None si aún no se ha generado."""
+    if not pdf_path:
         return None
-     
+    return request.build_absolute_uri(pdf_download_path(payslip_id))
+
+def serialize_render_job(job, request):
+    payslip = job.reference_payslip or job.payslip
+    data = {
+        "id": str(job.id),
+        "kind": job.kind,
+        "payslip_id": str(job.payslip_id) if job.payslip_id else None,
+        "reference_payslip_id": str(job.reference_payslip_id) if job.reference_payslip_id else None,
+        "period": job.period.strftime("%Y-%m") if job.period else None,
+        "status": job.status,
+        "attempts": job.attempts,
+        "pdf_url": pdf_absolute_url(job, payslip) if job.status == 'completed' and payslip and payslip.pdf_file else None,
+        "timings": job.timings,
+        "pdf_bytes_before": job.pdf_bytes_before,
+        "pdf_bytes_after": job.pdf_bytes_after,
+        "error_message": job.error_message or None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": request.build_absolute_uri(
+            f"{reverse('payslips-render-status')}?id={job.id}"
+        ),
+    }
+    if job.kind == 'period':
+        data.update({
+            "total_count": job.total_count,
+            "generated_count": job.generated_count,
+            "cached_count": job.cached_count,
+            "failed_count": job.failed_count,
+            "pdfs_per_second": job.pdfs_per_second,
+        })
+    else:
+        data["cached"] = bool(job.cached_count)
+    return data
+
+def build_my_payslips_page(request, profile, year, month, page, page_size=20):
+    """Página de resúmenes mensuales de un perfil para my-payslips (se guarda en caché por perfil)."""
+    grouped_qs = PayslipPeriodSummary.objects.filter(profile=profile).filter(period_filter(year, month)).values(
+        'issue_date',
+        'total_ingresos',
+        'total_descuentos',
+        'liquido_pagar',
+        'reference_payslip_id',
+        'pdf_path',
+        'view_status',
+    ).order_by('-issue_date')
+
+    offset = (page - 1) * page_size
+    limit = offset + page_size
+
+    total = grouped_qs.count()
+    paginated_groups = grouped_qs[offset:limit]
+
+    results = []
+    for g in paginated_groups:
+        month_idx = g['issue_date'].month
+        month_name = MONTHS_ES[month_idx - 1]
+
+        results.append({
+            "id": str(g['reference_payslip_id']), 
+            "profile_id": str(profile.id),
+            "profile_dni": profile.dni,
+            "issue_date": g['issue_date'].isoformat(),
+            "period_es": f"{month_name} {g['issue_date'].year}",
+            "view_status": g['view_status'],
+            "concept": "BOLETA DE PAGO MENSUAL",
+            "total_ingresos": float(g['total_ingresos'] or 0.00),
+            "total_descuentos": float(g['total_descuentos'] or 0.00),
+            "amount": float(g['liquido_pagar'] or 0.00), 
+            "pdf_url": build_pdf_url(request, g['reference_payslip_id'], g['pdf_path']),
+        })
+
+    pagination = {
+        "current_page": page,
+        "page_size": page_size,
+        "total_items": total,
+        "total_pages": (total + page_size - 1) // page_size,
+        "has_next": limit < total,
+        "has_previous": page > 1
+    }
+
+    return {"results": results, "pagination": pagination}
+
 class PayslipUploadViewSet(viewsets.ViewSet):
     """
     Upload payslips from Excel file.
     """
-    permission_classes = []
+    permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['post'], url_path='upload-payslips')
     def upload_payslips(self, request):
@@ -112,8 +199,7 @@ class PayslipUploadViewSet(viewsets.ViewSet):
             )
 
         try:
-            workbook = load_workbook(filename=file)
-            ws = workbook.active
+            reader = ExcelSheetReader(file)
         except Exception as e:
             return Response(
                 APIResponse.error(
@@ -122,105 +208,39 @@ class PayslipUploadViewSet(viewsets.ViewSet):
                 ),
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        headers = [str(cell.value).strip() if cell.value else '' for cell in ws[1]]
-        normalized_headers = [normalize(h) for h in headers]
-
-        column_map = {}
-        for idx, nh in enumerate(normalized_headers):
-            for field, variants in REQUIRED_PAYSLIP_COLUMNS.items():
-                if nh in [normalize(v) for v in variants]:
-                    column_map[idx] = field
-
-        missing = [field for field in REQUIRED_PAYSLIP_COLUMNS.keys() if field not in column_map.values()]
-        if missing:
-            return Response(
-                APIResponse.error(
-                    message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
-                    code=status.HTTP_400_BAD_REQUEST
-                ),
-                status=status.HTTP_400_BAD_REQUEST
-            )
 
-        created_count = 0
-        skipped_count = 0
-        error_messages = [] 
+        with reader:
+            column_map = reader.map_columns(PAYSLIP_COLUMN_LOOKUP)
 
-        profiles_map = {p.dni: p for p in Profile.objects.all()}
+            missing = missing_columns(column_map, REQUIRED_PAYSLIP_COLUMNS)
+            if missing:
+                return Response(
+                    APIResponse.error(
+                        message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
+                        code=status.HTTP_400_BAD_REQUEST
+                    ),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        try:
-            with transaction.atomic():
-                for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-                    row_data = {column_map[idx]: cell.value for idx, cell in enumerate(row) if idx in column_map}
-
-                    dni = str(row_data.get('dni')).strip() if row_data.get('dni') else None
-                
-                    if not dni:
-                        skipped_count += 1
-                        error_messages.append(f"Fila {row_idx}: DNI no encontrado. Se saltó la fila.")
-                        continue
-
-                    profile = profiles_map.get(dni)
-                    if not profile:
-                        skipped_count += 1
-                        error_messages.append(f"Fila {row_idx}: Usuario con DNI {dni} no existe. Se saltó la fila.")
-                        continue
-
-                    period_text = str(row_data.get('issue_date'))
-                    issue_date = parse_period(period_text)
-                    if not issue_date:
-                        skipped_count += 1
-                        error_messages.append(f"Fila {row_idx}: Periodo '{period_text}' inválido. Se saltó la fila.")
-                        continue
-                    
-                    try:
-                        amount = Decimal(str(row_data.get('amount')))
-                    except Exception:
-                        skipped_count += 1
-                        error_messages.append(f"Fila {row_idx}: Monto inválido '{row_data.get('amount')}'. Se saltó la fila.")
-                        continue
-                    
-                    concept = str(row_data.get('concept')).upper()
-
-                    if Payslip.objects.filter(
-                        profile=profile,
-                        concept=concept,
-                        issue_date__year=issue_date.year,
-                        issue_date__month=issue_date.month
-                    ).exists():
-                        skipped_count += 1
-                        error_messages.append(
-                            f"Fila {row_idx}: Ya existe una boleta con el concepto '{concept}' "
-                            f"para el periodo {issue_date.strftime('%Y-%m')}. Se saltó la fila."
-                        )
-                        continue
-                    
-                    try:
-                        Payslip.objects.create(
-                            profile=profile,
-                            concept=concept,
-                            amount=amount,
-                            data_source=str(row_data.get('data_source')).upper(),
-                            payroll_type=str(row_data.get('payroll_type')).upper(),
-                            data_type=str(row_data.get('data_type')).upper(),
-                            position_order=int(row_data.get('position_order')),
-                            issue_date=issue_date,
-                            pdf_file='',
-                            view_status='unseen'
-                        )
-                        created_count += 1
-                    except Exception as e:
-                        skipped_count += 1
-                        error_messages.append(f"Fila {row_idx}: Error al crear la boleta para DNI {dni}: {str(e)}. Se saltó la fila.")
+            if wants_background(request):
+                job = enqueue_import_job('payslips', file, request.user.profile)
+                return import_job_accepted(job, request)
 
-        except Exception as e:
-            return Response(
-                APIResponse.error(
-                    message=f"Error crítico en la transacción de la base de datos: {str(e)}",
-                    code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                ),
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            try:
+                with transaction.atomic():
+                    result = import_payslip_rows(reader.iter_row_data(column_map))
+            except Exception as e:
+                return Response(
+                    APIResponse.error(
+                        message=f"Error crítico en la transacción de la base de datos: {str(e)}",
+                        code=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    ),
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        created_count = result['created_count']
+        skipped_count = result['skipped_count']
+        error_messages = [message for _, message in result['errors']]
 
         final_messages = []
         if created_count > 0:
@@ -276,7 +296,11 @@ class PayslipUploadViewSet(viewsets.ViewSet):
             if ps.pdf_file:
                 ps.pdf_file.delete(save=False)
 
-        payslips.delete()
+        with transaction.atomic():
+            PayslipPeriodSummary.objects.all().delete()
+            payslips.delete()
+            invalidate_all_profile_caches()
+            bump_cache_version('payslip-summaries')
 
         AuditLog.objects.create(
             profile=request.user.profile,
@@ -335,7 +359,10 @@ class PayslipUploadViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        payslip.delete()
+        with transaction.atomic():
+            payslip.delete()
+            refresh_period_summaries([(payslip.profile_id, payslip.issue_date)])
+            invalidate_profile_cache([payslip.profile_id])
 
         AuditLog.objects.create(
             profile=request.user.profile,
@@ -355,6 +382,8 @@ class PayslipUploadViewSet(viewsets.ViewSet):
         """
         Vista para el Administrador: Lista una única fila por usuario y periodo (mes/año),
         mostrando los montos totales agregados de Ingresos, Descuentos y el Neto Líquido.
+        Se lee directamente de PayslipPeriodSummary. Con ?pagination=cursor se pagina por
+        llave (issue_date, id) en lugar de OFFSET.
         """
         if not request.user.profile.role == 'admin':
             return Response(
@@ -362,6 +391,13 @@ class PayslipUploadViewSet(viewsets.ViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        versions = (cache_version('payslip-summaries'), cache_version('profiles'))
+        etag = make_etag('list-payslips', versions, request.build_absolute_uri())
+        last_modified = version_timestamp(*versions)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+
         try:
             page = int(request.query_params.get('page', 1))
             page_size = int(request.query_params.get('page_size', 20))
@@ -377,96 +413,89 @@ class PayslipUploadViewSet(viewsets.ViewSet):
         status_view = request.query_params.get('status')
         month = request.query_params.get('month')
         year = request.query_params.get('year')
-        base_queryset = Payslip.objects.select_related('profile', 'profile__user')
+        base_queryset = PayslipPeriodSummary.objects.all()
 
         if dni:
-            base_queryset = base_queryset.filter(profile__dni__icontains=dni)
-
-        base_queryset = base_queryset.annotate(
-            full_name_concat=Concat(
-                F('profile__user__first_name'),
-                Value(' '),
-                F('profile__user__last_name'),
-                output_field=CharField()
-            )
-        )
+            base_queryset = base_queryset.filter(dni_search_filter(dni, prefix='profile__'))
 
         if name:
-            tokens = [t.strip() for t in name.split() if t.strip()]
-            for token in tokens: 
-                base_queryset = base_queryset.filter(full_name_concat__icontains=token)
+            base_queryset = base_queryset.filter(name_search_filter(name, prefix='profile__'))
 
         if status_view:
             base_queryset = base_queryset.filter(view_status=status_view)
 
-        if month:
-            try: base_queryset = base_queryset.filter(issue_date__month=int(month))
-            except: pass
-
-        if year:
-            try: base_queryset = base_queryset.filter(issue_date__year=int(year))
-            except: pass
-
-        grouped_qs = base_queryset.values('profile', 'issue_date').annotate(
-            total_ingresos=Max('amount', filter=Q(data_source='TOTALINGRESOS')),
-            total_descuentos=Max('amount', filter=Q(data_source='TOTALDSCTO')),
-            liquido_pagar=Max('amount', filter=Q(data_source='LIQUIDOPAGAR')),
-            reference_id=Max('id'),
-            has_pdf=Max('pdf_file', filter=Q(pdf_file__isnull=False) & ~Q(pdf_file=''))
-        ).order_by('-issue_date')
-
-        total = grouped_qs.count()
-        offset = (page - 1) * page_size
-        paginated_groups = grouped_qs[offset: offset + page_size]
+        try:
+            base_queryset = base_queryset.filter(period_filter(year, month))
+        except ValueError:
+            pass
+
+        grouped_qs = base_queryset.values(
+            'id',
+            'profile',
+            'issue_date',
+            'profile__dni',
+            'profile__user__first_name',
+            'profile__user__last_name',
+            'total_ingresos',
+            'total_descuentos',
+            'liquido_pagar',
+            'reference_payslip_id',
+            'pdf_path',
+            'view_status',
+        ).order_by('-issue_date', 'profile__dni')
+
+        if wants_cursor_pagination(request):
+            try:
+                paginated_groups, pagination = paginate_by_cursor(grouped_qs, request, ('issue_date', 'id'), page_size)
+            except InvalidCursor:
+                return Response(
+                    APIResponse.error(message="Cursor de paginación inválido.", code=status.HTTP_400_BAD_REQUEST),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            total = grouped_qs.count()
+            offset = (page - 1) * page_size
+            paginated_groups = grouped_qs[offset: offset + page_size]
+            pagination = {
+                "current_page": page,
+                "page_size": page_size,
+                "total_items": total,
+                "total_pages": (total + page_size - 1) // page_size,
+                "has_next": offset + page_size < total,
+                "has_previous": page > 1
+            }
 
         results = []
         for g in paginated_groups:
-            ref_payslip = Payslip.objects.select_related('profile', 'profile__user').filter(
-                profile_id=g['profile'], 
-                issue_date=g['issue_date']
-            ).first()
-            
-            if not ref_payslip:
-                continue
-
-            user = ref_payslip.profile.user
-            full_name = f"{user.first_name} {user.last_name}".strip() if user else None
-            
-            try:
-                pdf_url = request.build_absolute_uri(ref_payslip.pdf_file.url) if ref_payslip.pdf_file else None
-            except Exception:
-                pdf_url = None
+            first_name = g['profile__user__first_name']
+            last_name = g['profile__user__last_name']
+            full_name = f"{first_name} {last_name}".strip() if first_name is not None else None
 
             month_idx = g['issue_date'].month
             month_name = MONTHS_ES[month_idx - 1]
 
             results.append({
-                "id": str(g['reference_id']), 
-                "profile_id": str(ref_payslip.profile.id),
-                "profile_dni": ref_payslip.profile.dni,
+                "id": str(g['reference_payslip_id']), 
+                "profile_id": str(g['profile']),
+                "profile_dni": g['profile__dni'],
                 "full_name": full_name,
                 "issue_date": g['issue_date'].isoformat(),
                 "period_es": f"{month_name} {g['issue_date'].year}",
-                "view_status": 'generated' if g['has_pdf'] else 'unseen',
+                "view_status": g['view_status'],
                 "concept": "BOLETA RESUMEN MENSUAL",
                 "total_ingresos": float(g['total_ingresos'] or 0.00),
                 "total_descuentos": float(g['total_descuentos'] or 0.00),
                 "amount": float(g['liquido_pagar'] or 0.00),
-                "pdf_url": pdf_url,
+                "pdf_url": build_pdf_url(request, g['reference_payslip_id'], g['pdf_path']),
             })
 
-        pagination = {
-            "current_page": page,
-            "page_size": page_size,
-            "total_items": total,
-            "total_pages": (total + page_size - 1) // page_size,
-            "has_next": offset + page_size < total,
-            "has_previous": page > 1
-        }
-
-        return Response(
-            APIResponse.success(data=results, message=f"{len(results)} periodos de boletas obtenidos.", meta={"pagination": pagination}),
-            status=status.HTTP_200_OK
+        return set_validators(
+            Response(
+                APIResponse.success(data=results, message=f"{len(results)} periodos de boletas obtenidos.", meta={"pagination": pagination}),
+                status=status.HTTP_200_OK
+            ),
+            etag,
+            last_modified
         )
 
     @action(detail=False, methods=['get'], url_path='my-payslips')
@@ -485,75 +514,44 @@ class PayslipUploadViewSet(viewsets.ViewSet):
         profile = user.profile
         month = request.query_params.get('month') 
         year = request.query_params.get('year') 
-        payslips_qs = Payslip.objects.filter(profile=profile)
 
         if year:
-            try: payslips_qs = payslips_qs.filter(issue_date__year=int(year))
+            try: int(year)
             except ValueError: return Response(APIResponse.error(message="Año inválido"), status=400)
 
         if month:
             try:
                 m_int = int(month)
                 if not 1 <= m_int <= 12: raise ValueError
-                payslips_qs = payslips_qs.filter(issue_date__month=m_int)
             except ValueError: return Response(APIResponse.error(message="Mes inválido"), status=400)
 
-        grouped_qs = payslips_qs.values('issue_date').annotate(
-            total_ingresos=Max('amount', filter=Q(data_source='TOTALINGRESOS')),
-            total_descuentos=Max('amount', filter=Q(data_source='TOTALDSCTO')),
-            liquido_pagar=Max('amount', filter=Q(data_source='LIQUIDOPAGAR')),
-            reference_id=Max('id'),
-            has_pdf=Max('pdf_file', filter=Q(pdf_file__isnull=False) & ~Q(pdf_file=''))
-        ).order_by('-issue_date')
-
         page = int(request.query_params.get('page', 1))
-        page_size = 20
-        offset = (page - 1) * page_size
-        limit = offset + page_size
-
-        total = grouped_qs.count()
-        paginated_groups = grouped_qs[offset:limit]
-
-        results = []
-        for g in paginated_groups:
-            ref_payslip = Payslip.objects.filter(id=g['reference_id']).first()
-            if not ref_payslip:
-                continue
-
-            try:
-                pdf_url = request.build_absolute_uri(ref_payslip.pdf_file.url) if ref_payslip.pdf_file else None
-            except Exception:
-                pdf_url = None
-
-            month_idx = g['issue_date'].month
-            month_name = MONTHS_ES[month_idx - 1]
-
-            results.append({
-                "id": str(g['reference_id']), 
-                "profile_id": str(profile.id),
-                "profile_dni": profile.dni,
-                "issue_date": g['issue_date'].isoformat(),
-                "period_es": f"{month_name} {g['issue_date'].year}",
-                "view_status": 'generated' if g['has_pdf'] else 'unseen',
-                "concept": "BOLETA DE PAGO MENSUAL",
-                "total_ingresos": float(g['total_ingresos'] or 0.00),
-                "total_descuentos": float(g['total_descuentos'] or 0.00),
-                "amount": float(g['liquido_pagar'] or 0.00), 
-                "pdf_url": pdf_url,
-            })
-
-        pagination = {
-            "current_page": page,
-            "page_size": page_size,
-            "total_items": total,
-            "total_pages": (total + page_size - 1) // page_size,
-            "has_next": limit < total,
-            "has_previous": page > 1
-        }
+        cache_params = [('base_url', request.build_absolute_uri('/')), ('year', year), ('month', month), ('page', page)]
+
+        etag = make_etag(profile_cache_key('my-payslips', profile.id, cache_params))
+        last_modified = version_timestamp(*profile_cache_state(profile.id))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+
+        page_data, cache_hit = cached_for_profile(
+            'my-payslips',
+            profile.id,
+            cache_params,
+            lambda: build_my_payslips_page(request, profile, year, month, page),
+        )
 
-        return Response(
-            APIResponse.success(data=results, message=f"{len(results)} boletas mensuales obtenidas.", meta={"pagination": pagination}),
-            status=status.HTTP_200_OK
+        return set_validators(
+            Response(
+                APIResponse.success(
+                    data=page_data['results'],
+                    message=f"{len(page_data['results'])} boletas mensuales obtenidas.",
+                    meta={"pagination": page_data['pagination'], "cacheHit": cache_hit}
+                ),
+                status=status.HTTP_200_OK
+            ),
+            etag,
+            last_modified
         )
     
     @action(detail=False, methods=['get'], url_path='view-payslip')
@@ -604,6 +602,8 @@ class PayslipUploadViewSet(viewsets.ViewSet):
         if payslip.view_status != 'seen':
             payslip.view_status = 'seen'
             payslip.save()
+            refresh_period_summaries([(payslip.profile_id, payslip.issue_date)])
+            invalidate_profile_cache([payslip.profile_id])
 
         if is_admin and not is_owner:
             description = (
@@ -628,7 +628,8 @@ class PayslipUploadViewSet(viewsets.ViewSet):
                 message="Boleta visualizada correctamente.",
                 data={
                     "payslip_id": str(payslip.id),
-                    "pdf_url": request.build_absolute_uri(payslip.pdf_file.url),
+                    "pdf_url": request.build_absolute_uri(pdf_download_path(payslip.id)),
+                    "download_url": request.build_absolute_uri(pdf_download_path(payslip.id)),
                     "status": payslip.view_status,
                     "issue_date": payslip.issue_date,
                     "concept": payslip.concept,
@@ -638,6 +639,130 @@ class PayslipUploadViewSet(viewsets.ViewSet):
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=['get'], url_path='download-payslip', permission_classes=[AllowAny])
+    def download_payslip(self, request):
+        """
+        Descarga el PDF del periodo de una boleta (cualquier concepto del mes sirve como `id`)
+        si pertenece al usuario o si es administrador, o sin sesión con el `token` firmado de
+        los enlaces de correo y QR. El archivo lo sirve el proxy (X-Accel-Redirect / X-Sendfile)
+        o Django con soporte de Range y validadores de caché.
+        """
+        try:
+            UUID(str(request.query_params.get('id')))
+        except ValueError:
+            return Response(
+                APIResponse.error(message="Debe proporcionar un ID de boleta válido."),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        token = request.query_params.get('token')
+        if token and not download_token_is_valid(request.query_params['id'], token):
+            return Response(
+                APIResponse.error(
+                    message="El enlace de descarga no es válido o ha expirado.",
+                    code=status.HTTP_403_FORBIDDEN
+                ),
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not token and not request.user.is_authenticated:
+            return Response(
+                APIResponse.error(
+                    message="Debe iniciar sesión para descargar la boleta.",
+                    code=status.HTTP_401_UNAUTHORIZED
+                ),
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        payslip = Payslip.objects.select_related('profile').filter(id=request.query_params['id']).first()
+        if not payslip:
+            return Response(
+                APIResponse.error(message="Boleta no encontrada.", code=status.HTTP_404_NOT_FOUND),
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not token and request.user.profile.role != 'admin' and payslip.profile.user_id != request.user.id:
+            return Response(
+                APIResponse.error(
+                    message="No tiene permiso para acceder a esta boleta.",
+                    code=status.HTTP_403_FORBIDDEN
+                ),
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not payslip.pdf_file:
+            payslip = (
+                Payslip.objects
+                .filter(profile_id=payslip.profile_id, period=payslip.period)
+                .exclude(pdf_file='')
+                .exclude(pdf_file__isnull=True)
+                .order_by('-updated_at')
+                .first()
+            ) or payslip
+        if not payslip.pdf_file or not payslip.pdf_file.storage.exists(payslip.pdf_file.name):
+            return Response(
+                APIResponse.error(message="La boleta no tiene un archivo PDF generado.", code=status.HTTP_404_NOT_FOUND),
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        filename = f"boleta_{payslip.profile.dni or payslip.profile_id}_{payslip.period.strftime('%Y-%m')}.pdf"
+        return stored_file_response(
+            request,
+            payslip.pdf_file,
+            filename,
+            etag=f'"{payslip.pdf_hash}"' if payslip.pdf_hash else None,
+            as_attachment=request.query_params.get('attachment') in ('1', 'true'),
+        )
+
+    @action(detail=False, methods=['get'], url_path='export-period')
+    def export_period(self, request):
+        """
+        Descarga en un ZIP todos los PDF generados de un mes (`year`, `month`), con filtros
+        opcionales `establishment` y `regimen`. El ZIP se arma mientras se envía: no se guarda
+        en memoria ni en disco y los primeros bytes salen de inmediato.
+        """
+        if request.user.profile.role != 'admin':
+            return Response(
+                APIResponse.error(
+                    message="No tiene permisos para realizar esta acción.",
+                    code=status.HTTP_403_FORBIDDEN
+                ),
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            period = date(int(request.query_params.get('year')), int(request.query_params.get('month')), 1)
+        except (TypeError, ValueError):
+            return Response(
+                APIResponse.error(message="Debe proporcionar un año y mes válidos."),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        establishment = request.query_params.get('establishment') or None
+        regimen = request.query_params.get('regimen') or None
+        files = period_pdf_files(period, establishment=establishment, regimen=regimen)
+        if not files:
+            return Response(
+                APIResponse.error(message="No hay boletas generadas para los filtros indicados.", code=status.HTTP_404_NOT_FOUND),
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        filters = ", ".join(f"{label}: {value}" for label, value in (("establecimiento", establishment), ("régimen", regimen)) if value)
+        AuditLog.objects.create(
+            profile=request.user.profile,
+            action="EXPORTAR BOLETAS",
+            description=(
+                f"Se exportaron {len(files)} boletas del periodo {MONTHS_ES[period.month - 1]} {period.year}"
+                f"{f' ({filters})' if filters else ''}."
+            )
+        )
+
+        suffix = "_".join(get_valid_filename(value) for value in (establishment, regimen) if value)
+        filename = f"boletas_{period.strftime('%Y-%m')}{f'_{suffix}' if suffix else ''}.zip"
+        response = StreamingHttpResponse(iter_period_zip(files), content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        response['Cache-Control'] = 'no-store'
+        return response
+
     @action(detail=False, methods=['get'], url_path='generate-payslip')
     def generate_payslip(self, request):
         user = request.user
@@ -670,109 +795,115 @@ class PayslipUploadViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
             
-        payslip_owner_profile = reference_payslip.profile
-        payslip_owner_user = payslip_owner_profile.user
-        target_date = reference_payslip.issue_date
-
-        all_concepts = Payslip.objects.filter(
-            profile=payslip_owner_profile,
-            issue_date__year=target_date.year,
-            issue_date__month=target_date.month
-        ).order_by('position_order')
-
-        ingresos_list = []
-        descuentos_list = []
-        
-        total_ingresos = Decimal("0.00")
-        total_descuentos = Decimal("0.00")
-        liquido_pagar = Decimal("0.00")
-
-        for item in all_concepts:
-            if item.data_source in ['TOTALINGRESOS', 'TOTALDSCTO', 'LIQUIDOPAGAR']:
-                if item.data_source == 'TOTALINGRESOS': total_ingresos = item.amount
-                if item.data_source == 'TOTALDSCTO': total_descuentos = item.amount
-                if item.data_source == 'LIQUIDOPAGAR': liquido_pagar = item.amount
-                continue
-            
-            concept_data = {
-                "code": item.position_order,
-                "name": item.concept,
-                "amount": item.amount
-            }
+        job = enqueue_render_job(reference_payslip, profile, base_url=request.build_absolute_uri('/'))
 
-            if item.payroll_type == 'INGRESOS':
-                ingresos_list.append(concept_data)
-            elif item.payroll_type == 'DESCUENTOS':
-                descuentos_list.append(concept_data)
-                
-        work_details = getattr(payslip_owner_profile, 'work_details', None)
-        issue_month_name = MONTHS_ES[target_date.month - 1]
-        issue_date_es = f"{issue_month_name} {target_date.year}"
-        print_date = timezone.now().strftime("%d/%m/%Y")
-        aporte_patronal = round(total_ingresos * Decimal("0.09"), 2)
-
-        payload = {
-            "issue_date_es": issue_date_es,
-            "print_date": print_date,
-            "dni": payslip_owner_profile.dni,
-            "first_name": payslip_owner_user.first_name,
-            "last_name": payslip_owner_user.last_name,
-            "position": payslip_owner_profile.position,
-            "description": payslip_owner_profile.description,
-            "condition": payslip_owner_profile.condition,
-            "regimen": payslip_owner_profile.regimen,
-            "category": payslip_owner_profile.category,
-            "worked_days": work_details.worked_days if work_details else 0,
-            "worked_hours": work_details.worked_hours if work_details else 0,
-            "discount_lateness": ((work_details.discount_lateness or 0) + (work_details.personal_leave_hours or 0)) if work_details else 0,
-            "start_date": payslip_owner_profile.start_date.strftime("%d/%m/%Y") if payslip_owner_profile.start_date else "—",
-            "end_date": payslip_owner_profile.end_date.strftime("%d/%m/%Y") if payslip_owner_profile.end_date else "VIGENTE",
-            "sistema_pension": payslip_owner_profile.descriptionSP or "—",
-            "codigo_afiliado": payslip_owner_profile.identification_code or "—",
-            "ingresos": ingresos_list,
-            "descuentos": descuentos_list,
-            "total_bruto": total_ingresos,
-            "total_descuento": total_descuentos,
-            "total_liquido": liquido_pagar,
-            "aporte_patronal": aporte_patronal,
-        }
-
-        html = render_to_string('boleta.html', payload)
-        pdf_buffer = BytesIO()
-        pisa_status = pisa.CreatePDF(html, dest=pdf_buffer)
-
-        if pisa_status.err:
+        if settings.PAYSLIP_RENDER_IN_BACKGROUND:
+            return Response(
+                APIResponse.success(
+                    data=serialize_render_job(job, request),
+                    message="La boleta se generará en segundo plano.",
+                    code=status.HTTP_202_ACCEPTED
+                ),
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        run_render_job(start_render_job(job), retry=False)
+        if job.status != 'completed':
             return Response(
                 APIResponse.error(message="Error al generar el PDF."),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        pdf_filename = f"boleta_{reference_payslip.id}.pdf"
-        reference_payslip.pdf_file.save(pdf_filename, ContentFile(pdf_buffer.getvalue()))
-        
-        all_concepts.update(view_status='generated')
+        return Response(
+            APIResponse.success(
+                data={
+                    "id": str(job.payslip_id),
+                    "reference_payslip_id": str(job.reference_payslip_id),
+                    "pdf_url": pdf_absolute_url(job, job.reference_payslip),
+                    "view_status": 'generated',
+                    "job_id": str(job.id),
+                    "cached": bool(job.cached_count),
+                    "timings": job.timings,
+                },
+                message="Boleta generada exitosamente."
+            ),
+            status=status.HTTP_200_OK
+        )
 
-        pdf_url = request.build_absolute_uri(reference_payslip.pdf_file.url)
-        qr_bytes = generate_qr_code(pdf_url)
+    @action(detail=False, methods=['get'], url_path='render-status')
+    def render_status(self, request):
+        """
+        Estado de un trabajo de generación de boleta: intentos, error y milisegundos por
+        etapa. Lo ve el administrador o el dueño de la boleta.
+        """
+        profile = request.user.profile
+        job_id = request.query_params.get('id')
+        try:
+            UUID(str(job_id))
+        except ValueError:
+            return Response(
+                APIResponse.error(message="Debe proporcionar un ID de trabajo válido."),
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        send_payslip_email(
-            user=payslip_owner_user,
-            secure_url=pdf_url,
-            qr_bytes=qr_bytes,
-            issue_date=reference_payslip.issue_date
-        )
+        jobs = PayslipRenderJob.objects.select_related('payslip', 'reference_payslip')
+        if profile.role != 'admin':
+            jobs = jobs.filter(payslip__profile=profile)
 
-        description = f"Boleta generada del periodo {issue_date_es} para {payslip_owner_user.first_name}."
-        AuditLog.objects.create(profile=user.profile, action="GENERAR BOLETA", description=description)
+        job = jobs.filter(id=job_id).first()
+        if not job:
+            return Response(
+                APIResponse.error(message="Trabajo no encontrado o no tiene permiso.", code=status.HTTP_404_NOT_FOUND),
+                status=status.HTTP_404_NOT_FOUND
+            )
 
         return Response(
             APIResponse.success(
-                data={
-                    "id": str(reference_payslip.id),
-                    "pdf_url": reference_payslip.pdf_file.url,
-                    "view_status": 'generated'
-                },
-                message="Boleta generada exitosamente."
+                data=serialize_render_job(job, request),
+                message="Estado de la generación de la boleta obtenido correctamente."
             ),
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    @action(detail=False, methods=['post'], url_path='generate-period')
+    def generate_period(self, request):
+        """
+        Encola la generación de los PDF de todas las boletas de un mes (`year`, `month`).
+        La procesa el worker de render en un pool de procesos; el avance y los PDF por
+        segundo se consultan en render-status.
+        """
+        profile = request.user.profile
+        if profile.role != 'admin':
+            return Response(
+                APIResponse.error(
+                    message="No tiene permisos para realizar esta acción.",
+                    code=status.HTTP_403_FORBIDDEN
+                ),
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            period = date(int(request.data.get('year')), int(request.data.get('month')), 1)
+        except (TypeError, ValueError):
+            return Response(
+                APIResponse.error(message="Debe proporcionar un año y mes válidos."),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not Payslip.objects.filter(period=period).exists():
+            return Response(
+                APIResponse.error(message="No hay boletas para el periodo indicado.", code=status.HTTP_404_NOT_FOUND),
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        send_email = str(request.data.get('send_email', '')).lower() in ('1', 'true')
+        job = enqueue_period_render_job(period, profile, base_url=request.build_absolute_uri('/'), send_email=send_email)
+
+        return Response(
+            APIResponse.success(
+                data=serialize_render_job(job, request),
+                message="Las boletas del periodo se generarán en segundo plano.",
+                code=status.HTTP_202_ACCEPTED
+            ),
+            status=status.HTTP_202_ACCEPTED
+        )
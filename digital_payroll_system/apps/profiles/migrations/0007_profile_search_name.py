@@ -0,0 +1,67 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:43
+
+import unicodedata
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = {
+    'profiles_profile_search_name_trgm': 'search_name',
+    'profiles_profile_dni_trgm': 'dni',
+}
+
+
+def build_search_name(first_name, last_name):
+    # Copia fija de apps.profiles.services.search.build_search_name al crear esta migración.
+    decomposed = unicodedata.normalize('NFKD', f"{first_name or ''} {last_name or ''}")
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def backfill_search_name(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+
+    profiles = []
+    for profile in Profile.objects.select_related('user').only('id', 'user__first_name', 'user__last_name').iterator():
+        if profile.user_id is None:
+            continue
+        profile.search_name = build_search_name(profile.user.first_name, profile.user.last_name)
+        profiles.append(profile)
+
+    Profile.objects.bulk_update(profiles, ['search_name'], batch_size=1000)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm solo existe en PostgreSQL; en SQLite (pruebas) las búsquedas usan LIKE sin índice.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON profiles_profile USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_profile_last_login'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Nombre completo normalizado (minúsculas, sin tildes) para búsquedas indexadas.', max_length=300),
+        ),
+        migrations.RunPython(backfill_search_name, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_profile_search_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['role', '-created_at', '-id'], name='profile_role_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['created_at'], name='profile_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('resigned', False)), fields=['last_login'], name='profile_active_login_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_login'], name='profile_enabled_login_idx'),
+        ),
+    ]
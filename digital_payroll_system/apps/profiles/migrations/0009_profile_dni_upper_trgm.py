@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_dni_upper_index(apps, schema_editor):
+    # La búsqueda por DNI usa icontains, que en PostgreSQL es UPPER(dni) LIKE UPPER('%texto%'):
+    # el índice de trigramas debe estar sobre la misma expresión para que el planificador lo use.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS profiles_profile_dni_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS profiles_profile_dni_upper_trgm "
+        "ON profiles_profile USING gin (UPPER(dni) gin_trgm_ops)"
+    )
+
+
+def drop_dni_upper_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS profiles_profile_dni_upper_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS profiles_profile_dni_trgm ON profiles_profile USING gin (dni gin_trgm_ops)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_profile_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_dni_upper_index, drop_dni_upper_index),
+    ]
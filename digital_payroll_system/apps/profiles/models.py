@@ -36,6 +36,22 @@ class Profile(BaseModel):
 
     is_active = models.BooleanField(default=True)
 
+    search_name = models.CharField(
+        max_length=300,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Nombre completo normalizado (minúsculas, sin tildes) para búsquedas indexadas."
+    )
+
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=['role', '-created_at', '-id'], name='profile_role_created_idx'),
+            models.Index(fields=['created_at'], name='profile_created_idx'),
+            models.Index(fields=['last_login'], condition=models.Q(resigned=False), name='profile_active_login_idx'),
+            models.Index(fields=['last_login'], condition=models.Q(is_active=True), name='profile_enabled_login_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.get_full_name() if self.user else 'No User'} ({self.dni})"
 
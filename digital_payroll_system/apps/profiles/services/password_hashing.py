@@ -0,0 +1,26 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+def init_hashing_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+def hash_passwords(raw_passwords, workers=None):
+    """
+    Calcula los hashes de contraseñas repartiendo el trabajo (PBKDF2, limitado por CPU)
+    entre un pool de procesos. Con un solo worker o pocas contraseñas se calcula en línea.
+    """
+    raw_passwords = list(raw_passwords)
+    workers = settings.PASSWORD_HASH_WORKERS if workers is None else workers
+
+    if workers <= 1 or len(raw_passwords) < 2:
+        return [make_password(raw) for raw in raw_passwords]
+
+    workers = min(workers, len(raw_passwords))
+    chunksize = max(len(raw_passwords) // (workers * 4), 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_hashing_worker) as pool:
+        return list(pool.map(make_password, raw_passwords, chunksize=chunksize))
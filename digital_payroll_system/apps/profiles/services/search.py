@@ -0,0 +1,30 @@
+import unicodedata
+from django.db.models import Q
+
+def normalize_search_text(value):
+    """Minúsculas, sin tildes ni diéresis y con espacios colapsados: 'Peña  Núñez' -> 'pena nunez'."""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+def build_search_name(first_name, last_name):
+    return normalize_search_text(f"{first_name or ''} {last_name or ''}")
+
+def name_search_filter(text, prefix=''):
+    """
+    Un `contains` por palabra sobre `search_name`, ya normalizado. En PostgreSQL cada
+    LIKE '%palabra%' se resuelve con el índice GIN de trigramas.
+    """
+    condition = Q()
+    for token in normalize_search_text(text).split():
+        condition &= Q(**{f"{prefix}search_name__contains": token})
+    return condition
+
+def dni_search_filter(text, prefix=''):
+    """
+    `icontains` sobre el DNI: los carnés de extranjería pueden guardarse con minúsculas. En
+    PostgreSQL se resuelve con el índice de trigramas sobre UPPER(dni).
+    """
+    return Q(**{f"{prefix}dni__icontains": str(text).strip()})
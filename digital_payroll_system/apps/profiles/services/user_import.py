@@ -0,0 +1,202 @@
+import time
+from datetime import datetime
+from django.contrib.auth.models import User
+from common.bulk import bulk_create_rows
+from common.cache import bump_cache_version, invalidate_profile_cache
+from common.excel_reader import compile_columns
+from ..models import Profile
+from .password_hashing import hash_passwords
+from .search import build_search_name
+
+REQUIRED_COLUMNS = {
+    'dni': ['dni'],
+    'last_name': ['apellidos', 'apellido', 'last name'],
+    'first_name': ['nombres', 'nombre', 'first name'],
+    'start_date': ['fecha inicio', 'fechainicio'],
+    'position': ['nombre de cargo', 'cargo', 'position', 'NombreCargo'],
+    'description': ['descripcion', 'description'],
+    'condition': ['condicion', 'condition'],
+    'category': ['categoria', 'category'],
+    'regimen': ['regimen', 'regime'],
+    'identification_code': ['codigo de identificacion', 'codigo', 'identification code', 'CodigoIdentificacion'],
+    'role': ['tipo', 'rol', 'role'],
+    'descriptionSP': ['descripcionSP', 'descripcion sp', 'descripcionsistema'],
+    'end_date': ['fecha fin', 'end date'],
+    'resigned_date': ['fecha renuncia', 'fecha de renuncia', 'resigned date'],
+    'resigned': ['con renuncia', 'resigned'],
+    'establishment': ['establecimiento', 'establishment', 'nombreestablecimiento']
+}
+
+OPTIONAL_COLUMNS = {
+    'email': ['email', 'correo', 'correo electronico']
+}
+
+USER_COLUMN_LOOKUP = compile_columns(REQUIRED_COLUMNS, OPTIONAL_COLUMNS)
+
+def to_upper(val):
+    return str(val).upper() if val else None
+
+def parse_date(val):
+    if not val:
+        return None
+    if isinstance(val, datetime):
+        return val.date()
+    try:
+        return datetime.strptime(val, "%d/%m/%Y").date()
+    except Exception:
+        return None
+
+USER_BATCH_SIZE = 500
+
+PROFILE_UPSERT_FIELDS = [
+    'dni', 'role', 'position', 'description', 'descriptionSP', 'start_date', 'end_date',
+    'resigned_date', 'resigned', 'regimen', 'category', 'condition', 'identification_code',
+    'establishment', 'search_name', 'updated_at',
+]
+
+def import_user_rows(rows, hash_workers=None):
+    """
+    Crea o actualiza usuarios y perfiles a partir de filas (row_idx, row_data).
+
+    Los usuarios existentes se obtienen en una sola consulta; los nuevos se insertan por
+    lotes con sus contraseñas ya calculadas en paralelo (`hash_passwords`). Como
+    `bulk_create` no dispara `create_profile_for_user`, los perfiles se escriben una sola
+    vez con un upsert por lotes sobre `user`. Se reporta por separado el tiempo de cálculo
+    de hashes y el tiempo de base de datos.
+    """
+    results = {
+        'created_count': 0,
+        'updated_count': 0,
+        'skipped_count': 0
+    }
+    error_messages = []
+    hashing_seconds = 0.0
+    db_seconds = 0.0
+
+    entries = []
+    for row_idx, row_data in rows:
+        dni = to_upper(row_data.get('dni'))
+        last_name = to_upper(row_data.get('last_name'))
+        first_name = to_upper(row_data.get('first_name'))
+
+        if not dni or not last_name or not first_name:
+            results['skipped_count'] += 1
+            error_messages.append((row_idx, f"Fila {row_idx}: DNI, Apellido o Nombre faltantes. (DNI: {dni or 'N/A'})"))
+            continue
+
+        entries.append((row_idx, dni, first_name, last_name, row_data))
+
+    started = time.perf_counter()
+    dnis = {e[1] for e in entries}
+    users_by_dni = {u.username: u for u in User.objects.filter(username__in=dnis)}
+    profile_owners = dict(Profile.objects.filter(dni__in=dnis).values_list('dni', 'user_id'))
+    db_seconds += time.perf_counter() - started
+
+    # Un DNI que ya pertenece al perfil de otro usuario no crea un usuario nuevo: quedaría
+    # sin perfil (o con uno vacío), así que la fila se salta antes de insertar nada.
+    new_dnis = list(dict.fromkeys(
+        dni for _, dni, _, _, _ in entries if dni not in users_by_dni and dni not in profile_owners
+    ))
+    started = time.perf_counter()
+    hashed_passwords = dict(zip(new_dnis, hash_passwords(new_dnis, workers=hash_workers)))
+    hashing_seconds += time.perf_counter() - started
+
+    new_users = []
+    changed_users = {}
+    row_users = []
+    for row_idx, dni, first_name, last_name, row_data in entries:
+        user = users_by_dni.get(dni)
+        created = user is None
+        if created and dni in profile_owners:
+            results['skipped_count'] += 1
+            error_messages.append((row_idx, f"Fila {row_idx}: Error al crear usuario con DNI {dni}: el DNI ya está asignado a otro usuario."))
+            continue
+        if created:
+            user = User(username=dni, password=hashed_passwords[dni])
+            users_by_dni[dni] = user
+            new_users.append((row_idx, user))
+        elif user.pk is not None:
+            changed_users[user.pk] = user
+
+        user.first_name = first_name
+        user.last_name = last_name
+        email = row_data.get('email')
+        if email:
+            user.email = email
+        row_users.append((row_idx, dni, user, created, row_data))
+
+    started = time.perf_counter()
+    failed_rows = bulk_create_rows(User, new_users, batch_size=USER_BATCH_SIZE)
+    if changed_users:
+        User.objects.bulk_update(list(changed_users.values()), ['first_name', 'last_name', 'email'], batch_size=USER_BATCH_SIZE)
+    db_seconds += time.perf_counter() - started
+
+    profiles_by_user = {}
+    for row_idx, dni, user, created, row_data in row_users:
+        if row_idx in failed_rows:
+            results['skipped_count'] += 1
+            error_messages.append((row_idx, f"Fila {row_idx}: Error al crear/actualizar usuario con DNI {dni}: {str(failed_rows[row_idx])}"))
+            continue
+
+        if user.pk is None:
+            results['skipped_count'] += 1
+            error_messages.append((row_idx, f"Fila {row_idx}: Error al crear/actualizar usuario con DNI {dni}: no se pudo crear el usuario."))
+            continue
+
+        if created:
+            results['created_count'] += 1
+        else:
+            results['updated_count'] += 1
+
+        owner_id = profile_owners.get(dni)
+        if owner_id is not None and owner_id != user.pk:
+            error_messages.append((row_idx, f"Fila {row_idx}: Error al actualizar perfil con DNI {dni}: el DNI ya está asignado a otro usuario."))
+            continue
+
+        resigned_value = row_data.get('resigned')
+        resigned_bool = resigned_value in [1, "1", True, "TRUE", "True"]
+        profiles_by_user[user.pk] = (row_idx, Profile(
+            user=user,
+            dni=dni,
+            role='user',
+            position=to_upper(row_data.get('position')),
+            description=to_upper(row_data.get('description')),
+            descriptionSP=to_upper(row_data.get('descriptionSP')),
+            start_date=parse_date(row_data.get('start_date')),
+            end_date=parse_date(row_data.get('end_date')),
+            resigned_date=parse_date(row_data.get('resigned_date')),
+            resigned=resigned_bool,
+            regimen=to_upper(row_data.get('regimen')),
+            category=to_upper(row_data.get('category')),
+            condition=to_upper(row_data.get('condition')),
+            identification_code=to_upper(row_data.get('identification_code')),
+            establishment=to_upper(row_data.get('establishment')),
+            search_name=build_search_name(user.first_name, user.last_name),
+        ))
+
+    started = time.perf_counter()
+    profile_rows = sorted(profiles_by_user.values(), key=lambda p: p[0])
+    failed_profiles = bulk_create_rows(
+        Profile,
+        profile_rows,
+        batch_size=USER_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=PROFILE_UPSERT_FIELDS,
+    )
+    db_seconds += time.perf_counter() - started
+
+    for row_idx, profile in profile_rows:
+        if row_idx in failed_profiles:
+            error_messages.append((row_idx, f"Fila {row_idx}: Error al actualizar perfil con DNI {profile.dni}: {str(failed_profiles[row_idx])}"))
+
+    invalidate_profile_cache(Profile.objects.filter(user_id__in=profiles_by_user).values_list('id', flat=True))
+    bump_cache_version('profiles')
+    error_messages.sort(key=lambda e: e[0])
+
+    return {
+        **results,
+        'errors': error_messages,
+        'hashing_ms': int(hashing_seconds * 1000),
+        'db_ms': int(db_seconds * 1000),
+    }
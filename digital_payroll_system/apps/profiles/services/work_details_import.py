@@ -0,0 +1,128 @@
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from common.bulk import bulk_create_rows, bulk_update_rows
+from common.cache import invalidate_profile_cache
+from common.excel_reader import compile_columns
+from ..models import Profile, ProfileWorkDetails
+from .user_import import to_upper
+
+WORK_DETAILS_COLUMNS = {
+    "dni": ["DNI"],
+    "worked_days": ["DiasTrabajados"],
+    "non_worked_days": ["DiasNoTrabajados"],
+    "worked_hours": ["HorasTrabajados"],
+    "discount_academic_hours": ["DescuentoHorasAcademicas"],
+    "discount_lateness": ["DescuentoTardanzas"],
+    "personal_leave_hours": ["PermisoParticular"],
+    "sunday_discount": ["DescuentoDominical"],
+    "vacation_days": ["DiasVacaciones"],
+    "vacation_hours": ["HorasVacaciones"]
+}
+
+WORK_DETAILS_COLUMN_LOOKUP = compile_columns(WORK_DETAILS_COLUMNS)
+
+WORK_DETAILS_FIELDS = [field for field in WORK_DETAILS_COLUMNS if field != 'dni']
+
+WORK_DETAILS_BATCH_SIZE = 500
+
+def import_work_details_rows(rows, batch_size=WORK_DETAILS_BATCH_SIZE):
+    """
+    Crea o actualiza los ProfileWorkDetails a partir de filas (row_idx, row_data).
+
+    Los DNI se resuelven con una sola consulta `dni__in` y los WorkDetails existentes con
+    otra; las filas se separan en altas y actualizaciones que se aplican con
+    `bulk_create`/`bulk_update` por lotes.
+    """
+    created_count = 0
+    updated_count = 0
+    detailed_messages = []
+
+    rows = [(row_idx, row_data, to_upper(row_data.get('dni'))) for row_idx, row_data in rows]
+    profile_ids = dict(
+        Profile.objects.filter(dni__in={dni for _, _, dni in rows if dni}).values_list('dni', 'id')
+    )
+    existing = {
+        wd.profile_id: wd
+        for wd in ProfileWorkDetails.objects.filter(profile_id__in=profile_ids.values())
+    }
+
+    to_create = {}
+    to_update = {}
+    row_owners = []
+
+    for row_idx, row_data, dni in rows:
+        if not dni:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: DNI es obligatorio."))
+            continue
+
+        profile_id = profile_ids.get(dni)
+        if not profile_id:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: No existe Profile con DNI {dni}."))
+            continue
+
+        try:
+            work_data = {
+                'worked_days': int(row_data.get('worked_days') or 0),
+                'non_worked_days': int(row_data.get('non_worked_days') or 0),
+                'worked_hours': int(row_data.get('worked_hours') or 0),
+                'discount_academic_hours': int(row_data.get('discount_academic_hours') or 0),
+                'discount_lateness': int(row_data.get('discount_lateness') or 0),
+                'personal_leave_hours': int(row_data.get('personal_leave_hours') or 0),
+                'sunday_discount': int(row_data.get('sunday_discount') or 0),
+                'vacation_days': int(row_data.get('vacation_days') or 0),
+                'vacation_hours': int(row_data.get('vacation_hours') or 0),
+            }
+        except ValueError as e:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: Error de formato numérico en datos laborales: {str(e)}"))
+            continue
+        except Exception as e:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: Error al preparar datos laborales: {str(e)}"))
+            continue
+
+        candidate = ProfileWorkDetails(profile_id=profile_id, **work_data)
+        try:
+            candidate.clean_fields(exclude=['profile'])
+        except ValidationError as e:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: Error al crear/actualizar WorkDetails para DNI {dni}: {str(e)}"))
+            continue
+
+        work_details = existing.get(profile_id)
+        created = work_details is None
+        if created:
+            work_details = candidate
+            existing[profile_id] = work_details
+            to_create[profile_id] = (row_idx, work_details)
+        else:
+            for field, value in work_data.items():
+                setattr(work_details, field, value)
+            work_details.updated_at = timezone.now()
+            if profile_id not in to_create:
+                to_update[profile_id] = (row_idx, work_details)
+
+        row_owners.append((row_idx, dni, profile_id, created))
+
+    failures = bulk_create_rows(ProfileWorkDetails, list(to_create.values()), batch_size=batch_size)
+    failures.update(bulk_update_rows(ProfileWorkDetails, list(to_update.values()), WORK_DETAILS_FIELDS + ['updated_at'], batch_size=batch_size))
+    failed_profiles = {
+        profile_id: failures[row_idx]
+        for profile_id, (row_idx, _) in list(to_create.items()) + list(to_update.items())
+        if row_idx in failures
+    }
+
+    for row_idx, dni, profile_id, created in row_owners:
+        if profile_id in failed_profiles:
+            detailed_messages.append((row_idx, f"Fila {row_idx}: Error al crear/actualizar WorkDetails para DNI {dni}: {str(failed_profiles[profile_id])}"))
+        elif created:
+            created_count += 1
+        else:
+            updated_count += 1
+
+    invalidate_profile_cache(set(to_create) | set(to_update))
+    detailed_messages.sort(key=lambda e: e[0])
+
+    return {
+        'created_count': created_count,
+        'updated_count': updated_count,
+        'skipped_count': len(detailed_messages),
+        'errors': detailed_messages,
+    }
@@ -1,7 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from apps.profiles.models import Profile
+from apps.profiles.services.search import build_search_name
+from common.cache import bump_cache_version, invalidate_profile_cache
 
 
 @receiver(post_save, sender=User)
@@ -11,8 +13,37 @@ def create_profile_for_user(sender, instance, created, **kwargs):
 
         Profile.objects.create(
             user=instance,
-            dni="",            
+            dni=None,
             role=role,
             position="",
-            description=""
+            description="",
+            search_name=build_search_name(instance.first_name, instance.last_name)
         )
+
+
+@receiver(post_save, sender=User)
+def sync_profile_from_user(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    changed = {'first_name', 'last_name', 'email'} if update_fields is None else set(update_fields)
+
+    if {'first_name', 'last_name'} & changed:
+        Profile.objects.filter(user=instance).update(
+            search_name=build_search_name(instance.first_name, instance.last_name)
+        )
+    if {'first_name', 'last_name', 'email'} & changed:
+        bump_cache_version('profiles')
+        invalidate_profile_cache(Profile.objects.filter(user=instance).values_list('id', flat=True))
+
+
+# Campos que no muestran list-users, list-payslips ni profiles/me. El inicio de sesión solo guarda
+# last_login (y crea un AuditLog, que ya cambia la versión del dashboard), así que no invalida nada.
+UNCACHED_PROFILE_FIELDS = {'last_login', 'updated_at'}
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def profile_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= UNCACHED_PROFILE_FIELDS:
+        return
+    bump_cache_version('profiles')
+    invalidate_profile_cache([instance.id])
@@ -1,3 +1,330 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.payslips.models import Payslip
+from common.tests.query_plans import QueryPlanAssertionsMixin
+from .models import Profile, ProfileWorkDetails
+from .services import password_hashing
+from .services.password_hashing import hash_passwords
+from .services.search import name_search_filter
+from .services.user_import import import_user_rows
+from .services.work_details_import import import_work_details_rows
 
-# Create your tests here.
+
+class ProfileQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    """Las consultas de perfiles de list-users y del dashboard deben resolverse con índices."""
+
+    table = Profile._meta.db_table
+
+    def setUp(self):
+        admin = User.objects.create(username='admin')
+        admin.profile.role = 'admin'
+        admin.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        # Un alta por día hacia atrás; casi todos entraron en los últimos días y 1 de cada 100 es inactivo.
+        now = timezone.now()
+        users = User.objects.bulk_create([User(username=f'4100{i:04d}') for i in range(2000)])
+        clock = (now - timedelta(days=i) for i in range(2000) for _ in ('created_at', 'updated_at'))
+        with patch('django.db.models.fields.timezone.now', side_effect=clock):
+            profiles = Profile.objects.bulk_create([
+                Profile(
+                    user=user,
+                    dni=user.username,
+                    resigned=i % 5 == 0,
+                    last_login=now - timedelta(days=60 if i % 100 == 0 else i % 10),
+                )
+                for i, user in enumerate(users)
+            ])
+        Payslip.objects.bulk_create([
+            Payslip(profile=profile, concept='LIQUIDO', amount=100, issue_date=date(2025, 1, 1),
+                    period=date(2025, 1, 1), position_order=0,
+                    view_status='seen' if i % 50 == 0 else 'unseen')
+            for i, profile in enumerate(profiles)
+        ])
+
+    def get(self, url, **params):
+        return lambda: self.assertEqual(self.client.get(url, params).status_code, 200)
+
+    def test_list_users_page(self):
+        # El total (count de todos los usuarios) recorre la tabla por naturaleza; se revisa la página.
+        self.assertQueriesUseIndex(
+            self.get('/api/profiles/list-users/'),
+            self.table,
+            contains='LIMIT'
+        )
+
+    def test_list_users_cursor_page(self):
+        first = self.client.get('/api/profiles/list-users/', {'pagination': 'cursor'}).json()
+        self.assertQueriesUseIndex(
+            self.get('/api/profiles/list-users/', pagination='cursor', cursor=first['meta']['pagination']['next_cursor']),
+            self.table,
+            index='profile_role_created_idx'
+        )
+
+    def test_registered_today(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/dashboard-stats/'),
+            self.table,
+            contains='"created_at" >='
+        )
+
+    def test_inactive_users(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/dashboard-stats/'),
+            self.table,
+            index='profile_active_login_idx',
+            contains='"last_login" <'
+        )
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/top-engagement/'),
+            self.table,
+            index='profile_enabled_login_idx',
+            contains='"last_login" <'
+        )
+
+    def test_users_never_seen_payslips(self):
+        self.assertQueriesUseIndex(
+            self.get('/api/audit-logs/dashboard-stats/'),
+            Payslip._meta.db_table,
+            contains='EXISTS'
+        )
+
+
+class ProfileSearchNameTests(TestCase):
+    def test_search_name_is_kept_normalized(self):
+        user = User.objects.create(username='peña', first_name='José', last_name='Peña')
+        self.assertEqual(user.profile.search_name, 'jose pena')
+        self.assertTrue(Profile.objects.filter(name_search_filter('PENA jose')).filter(user=user).exists())
+
+
+class MeCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='41009999', first_name='ANA', last_name='TORRES', email='ana@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_me(self):
+        body = self.client.get('/api/profiles/me/').json()
+        return body['data'], body['meta']['cacheHit']
+
+    def test_me_is_cached_until_the_email_changes(self):
+        data, hit = self.get_me()
+        self.assertFalse(hit)
+        data, hit = self.get_me()
+        self.assertTrue(hit)
+        self.assertEqual(data['email'], 'ana@example.com')
+
+        with patch('apps.profiles.views.send_email_updated_notification'), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/api/profiles/update-email/', {'email': 'ana.torres@example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        data, hit = self.get_me()
+        self.assertFalse(hit)
+        self.assertEqual(data['email'], 'ana.torres@example.com')
+
+    def test_me_is_invalidated_by_profile_and_user_saves(self):
+        self.get_me()
+        profile = self.user.profile
+        profile.position = 'DIRECTORA'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+        data, hit = self.get_me()
+        self.assertFalse(hit)
+        self.assertEqual(data['position'], 'DIRECTORA')
+
+        self.user.first_name = 'ANITA'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save(update_fields=['first_name'])
+
+        data, hit = self.get_me()
+        self.assertFalse(hit)
+        self.assertEqual(data['first_name'], 'ANITA')
+
+
+class PasswordHashingTests(TestCase):
+    def test_pool_hashes_verify_against_their_passwords(self):
+        passwords = ['40001234', '40005678', '40009012']
+
+        with patch.object(password_hashing, 'ProcessPoolExecutor', wraps=password_hashing.ProcessPoolExecutor) as pool:
+            hashes = hash_passwords(passwords, workers=2)
+
+        pool.assert_called_once()
+        self.assertEqual(len(hashes), 3)
+        for raw, encoded in zip(passwords, hashes):
+            self.assertTrue(check_password(raw, encoded))
+        self.assertFalse(check_password('40005678', hashes[0]))
+
+    def test_single_worker_hashes_inline(self):
+        with patch.object(password_hashing, 'ProcessPoolExecutor') as pool:
+            hashes = hash_passwords(['40001234', '40001234'], workers=1)
+            single = hash_passwords(['40005678'], workers=4)
+
+        pool.assert_not_called()
+        self.assertTrue(all(check_password('40001234', encoded) for encoded in hashes))
+        self.assertNotEqual(hashes[0], hashes[1])
+        self.assertTrue(check_password('40005678', single[0]))
+
+
+class UserImportTests(TestCase):
+    def setUp(self):
+        self.existing = User.objects.create(username='40001234', first_name='ANA', last_name='TORRES', email='ana@example.com')
+        Profile.objects.filter(user=self.existing).update(dni='40001234', position='DOCENTE')
+        self.owner = User.objects.create(username='admin-dni')
+        Profile.objects.filter(user=self.owner).update(dni='40007777')
+
+    def row(self, dni, first_name='LUIS', last_name='QUISPE', **extra):
+        return {'dni': dni, 'first_name': first_name, 'last_name': last_name, 'position': 'auxiliar',
+                'start_date': '01/03/2025', 'resigned': 0, **extra}
+
+    def test_new_users_get_their_profile_in_one_write(self):
+        result = import_user_rows([
+            (2, self.row('40005678', email='luis@example.com')),
+            (3, self.row('40009012', first_name='Rosa', last_name='Huamán')),
+        ], hash_workers=1)
+
+        self.assertEqual((result['created_count'], result['updated_count'], result['skipped_count']), (2, 0, 0))
+        self.assertEqual(result['errors'], [])
+        user = User.objects.get(username='40005678')
+        self.assertTrue(user.check_password('40005678'))
+        self.assertEqual(user.email, 'luis@example.com')
+        self.assertEqual(user.profile.dni, '40005678')
+        self.assertEqual(user.profile.position, 'AUXILIAR')
+        self.assertEqual(user.profile.start_date, date(2025, 3, 1))
+        self.assertEqual(User.objects.get(username='40009012').profile.search_name, 'rosa huaman')
+        self.assertFalse(Profile.objects.filter(dni__isnull=True).exists())
+
+    def test_existing_users_are_updated(self):
+        result = import_user_rows([(2, self.row('40001234', first_name='ana maria', position='director'))], hash_workers=1)
+
+        self.assertEqual((result['created_count'], result['updated_count']), (0, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.first_name, self.existing.last_name), ('ANA MARIA', 'QUISPE'))
+        self.assertEqual(self.existing.email, 'ana@example.com')
+        profile = Profile.objects.get(user=self.existing)
+        self.assertEqual(profile.position, 'DIRECTOR')
+        self.assertEqual(profile.search_name, 'ana maria quispe')
+        self.assertEqual(Profile.objects.filter(user=self.existing).count(), 1)
+
+    def test_duplicate_dni_in_one_file_keeps_the_last_row(self):
+        result = import_user_rows([
+            (2, self.row('40005678', position='auxiliar')),
+            (3, self.row('40005678', position='secretario')),
+        ], hash_workers=1)
+
+        self.assertEqual((result['created_count'], result['updated_count'], result['skipped_count']), (1, 1, 0))
+        self.assertEqual(User.objects.filter(username='40005678').count(), 1)
+        self.assertEqual(Profile.objects.get(dni='40005678').position, 'SECRETARIO')
+
+    def test_dni_owned_by_another_user_is_reported(self):
+        result = import_user_rows([
+            (2, self.row('40007777')),
+            (3, self.row(None)),
+        ], hash_workers=1)
+
+        self.assertEqual((result['created_count'], result['updated_count'], result['skipped_count']), (0, 0, 2))
+        self.assertEqual(result['errors'], [
+            (2, "Fila 2: Error al crear usuario con DNI 40007777: el DNI ya está asignado a otro usuario."),
+            (3, "Fila 3: DNI, Apellido o Nombre faltantes. (DNI: N/A)"),
+        ])
+        self.assertFalse(User.objects.filter(username='40007777').exists())
+        self.assertEqual(Profile.objects.get(dni='40007777').user, self.owner)
+        self.assertEqual(Profile.objects.filter(dni__isnull=True).count(), 0)
+
+    def test_existing_user_cannot_take_another_users_dni(self):
+        Profile.objects.filter(user=self.existing).update(dni=None)
+        self.existing.username = '40007777'
+        self.existing.save()
+
+        result = import_user_rows([(2, self.row('40007777', first_name='ANITA'))], hash_workers=1)
+
+        self.assertEqual(result['updated_count'], 1)
+        self.assertEqual(result['errors'], [
+            (2, "Fila 2: Error al actualizar perfil con DNI 40007777: el DNI ya está asignado a otro usuario."),
+        ])
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.first_name, 'ANITA')
+        self.assertEqual(Profile.objects.get(dni='40007777').user, self.owner)
+
+
+class WorkDetailsImportTests(TestCase):
+    def setUp(self):
+        self.profiles = {}
+        for i in range(25):
+            dni = f'4200{i:04d}'
+            user = User.objects.create(username=dni)
+            Profile.objects.filter(user=user).update(dni=dni)
+            self.profiles[dni] = Profile.objects.get(user=user)
+
+    def row(self, dni, worked_days=30, **extra):
+        return {'dni': dni, 'worked_days': worked_days, 'worked_hours': 120, 'vacation_days': None, **extra}
+
+    def test_creates_and_updates_work_details(self):
+        ProfileWorkDetails.objects.create(profile=self.profiles['42000001'], worked_days=10, vacation_days=5)
+
+        result = import_work_details_rows([
+            (2, self.row('42000000')),
+            (3, self.row('42000001', worked_days='28')),
+        ])
+
+        self.assertEqual(result, {'created_count': 1, 'updated_count': 1, 'skipped_count': 0, 'errors': []})
+        created = ProfileWorkDetails.objects.get(profile=self.profiles['42000000'])
+        self.assertEqual((created.worked_days, created.worked_hours, created.vacation_days), (30, 120, 0))
+        updated = ProfileWorkDetails.objects.get(profile=self.profiles['42000001'])
+        self.assertEqual((updated.worked_days, updated.vacation_days), (28, 0))
+        self.assertEqual(ProfileWorkDetails.objects.count(), 2)
+
+    def test_unknown_dnis_and_invalid_rows_are_reported(self):
+        result = import_work_details_rows([
+            (2, self.row(None)),
+            (3, self.row('49999999')),
+            (4, self.row('42000002', worked_days='treinta')),
+            (5, self.row('42000003', worked_hours=-4)),
+            (6, self.row('42000004')),
+        ])
+
+        self.assertEqual((result['created_count'], result['updated_count'], result['skipped_count']), (1, 0, 4))
+        messages = dict(result['errors'])
+        self.assertEqual(messages[2], "Fila 2: DNI es obligatorio.")
+        self.assertEqual(messages[3], "Fila 3: No existe Profile con DNI 49999999.")
+        self.assertTrue(messages[4].startswith("Fila 4: Error de formato numérico en datos laborales:"))
+        self.assertTrue(messages[5].startswith("Fila 5: Error al crear/actualizar WorkDetails para DNI 42000003:"))
+        self.assertEqual(list(ProfileWorkDetails.objects.values_list('profile__dni', flat=True)), ['42000004'])
+
+    def test_failed_batch_is_retried_row_by_row(self):
+        real_bulk_update = ProfileWorkDetails.objects.bulk_update
+        for dni in ('42000000', '42000001'):
+            ProfileWorkDetails.objects.create(profile=self.profiles[dni])
+
+        def bulk_update(objs, fields, **kwargs):
+            if any(obj.worked_days == 99 for obj in objs):
+                raise ValueError('fila rechazada')
+            return real_bulk_update(objs, fields, **kwargs)
+
+        with patch.object(ProfileWorkDetails.objects, 'bulk_update', bulk_update):
+            result = import_work_details_rows([(2, self.row('42000000', worked_days=99)), (3, self.row('42000001'))])
+
+        self.assertEqual(result['updated_count'], 1)
+        self.assertEqual(result['errors'], [
+            (2, "Fila 2: Error al crear/actualizar WorkDetails para DNI 42000000: fila rechazada"),
+        ])
+        self.assertEqual(ProfileWorkDetails.objects.get(profile=self.profiles['42000001']).worked_days, 30)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def count_queries(dnis):
+            with CaptureQueriesContext(connection) as queries:
+                import_work_details_rows([(idx, self.row(dni)) for idx, dni in enumerate(dnis, start=2)])
+            return len(queries)
+
+        dnis = sorted(self.profiles)
+        few = count_queries(dnis[:2])
+        many = count_queries(dnis[2:])
+        self.assertEqual(few, many)
@@ -3,10 +3,6 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from datetime import datetime
-from openpyxl import load_workbook
-import unicodedata
-from django.db.models import Q
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 
@@ -14,68 +10,61 @@ from .serializers import *
 from .models import *
 from apps.audit_logs.models import AuditLog
 from common.response_handler import APIResponse
+from common.excel_reader import ExcelSheetReader, missing_columns
+from common.cache import cache_version, cached_for_profile, invalidate_profile_cache
+from common.conditional import make_etag, not_modified_response, set_validators, version_timestamp
+from common.pagination import InvalidCursor, paginate_by_cursor, wants_cursor_pagination
+from .services.user_import import REQUIRED_COLUMNS, USER_COLUMN_LOOKUP, import_user_rows
+from .services.search import name_search_filter
+from .services.work_details_import import WORK_DETAILS_COLUMN_LOOKUP, WORK_DETAILS_COLUMNS, import_work_details_rows
+from apps.import_jobs.services.job_runner import enqueue_import_job
+from apps.import_jobs.views import import_job_accepted, wants_background
 from apps.audit_logs.utils.audit import create_audit_log
 from apps.notifications.services.email_service import (
     send_email_updated_notification,
     send_password_changed_notification
 )
 
-REQUIRED_COLUMNS = {
-    'dni': ['dni'],
-    'last_name': ['apellidos', 'apellido', 'last name'],
-    'first_name': ['nombres', 'nombre', 'first name'],
-    'start_date': ['fecha inicio', 'fechainicio'],
-    'position': ['nombre de cargo', 'cargo', 'position', 'NombreCargo'],
-    'description': ['descripcion', 'description'],
-    'condition': ['condicion', 'condition'],
-    'category': ['categoria', 'category'],
-    'regimen': ['regimen', 'regime'],
-    'identification_code': ['codigo de identificacion', 'codigo', 'identification code', 'CodigoIdentificacion'],
-    'role': ['tipo', 'rol', 'role'],
-    'descriptionSP': ['descripcionSP', 'descripcion sp', 'descripcionsistema'],
-    'end_date': ['fecha fin', 'end date'],
-    'resigned_date': ['fecha renuncia', 'fecha de renuncia', 'resigned date'],
-    'resigned': ['con renuncia', 'resigned'],
-    'establishment': ['establecimiento', 'establishment', 'nombreestablecimiento']
-}
-
-OPTIONAL_COLUMNS = {
-    'email': ['email', 'correo', 'correo electronico']
-}
-
-WORK_DETAILS_COLUMNS = {
-    "dni": ["DNI"],
-    "worked_days": ["DiasTrabajados"],
-    "non_worked_days": ["DiasNoTrabajados"],
-    "worked_hours": ["HorasTrabajados"],
-    "discount_academic_hours": ["DescuentoHorasAcademicas"],
-    "discount_lateness": ["DescuentoTardanzas"],
-    "personal_leave_hours": ["PermisoParticular"],
-    "sunday_discount": ["DescuentoDominical"],
-    "vacation_days": ["DiasVacaciones"],
-    "vacation_hours": ["HorasVacaciones"]
-}
-
-def normalize(s):
-    """Quita acentos, espacios y pasa a minúsculas"""
-    if not s:
-        return ''
-    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-    return s.replace(' ', '').lower()
-
-def to_upper(val):
-    return str(val).upper() if val else None
-
-def parse_date(val):
-    if not val:
-        return None
-    if isinstance(val, datetime):
-        return val.date() 
-    try:
-        return datetime.strptime(val, "%d/%m/%Y").date()
-    except Exception:
-        return None 
-    
+def serialize_me(user, profile):
+    """Datos de profiles/me; se guardan en caché por perfil."""
+    work_details = getattr(profile, 'work_details', None)
+
+    data = {
+        "id": str(profile.id),
+        "dni": profile.dni,
+        "role": profile.role,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "email": user.email,
+        "username": user.username,
+        "position": profile.position,
+        "description": profile.description,
+        "descriptionSP": profile.descriptionSP,
+        "start_date": profile.start_date.isoformat() if profile.start_date else None,
+        "end_date": profile.end_date.isoformat() if profile.end_date else None,
+        "resigned_date": profile.resigned_date.isoformat() if profile.resigned_date else None,
+        "resigned": profile.resigned,
+        "regimen": profile.regimen,
+        "category": profile.category,
+        "condition": profile.condition,
+        "identification_code": profile.identification_code,
+        "establishment": profile.establishment,
+        "is_active": profile.is_active,
+        "work_details": {
+            "worked_days": work_details.worked_days if work_details else 0,
+            "non_worked_days": work_details.non_worked_days if work_details else 0,
+            "worked_hours": work_details.worked_hours if work_details else 0,
+            "discount_academic_hours": work_details.discount_academic_hours if work_details else 0,
+            "discount_lateness": work_details.discount_lateness if work_details else 0,
+            "personal_leave_hours": work_details.personal_leave_hours if work_details else 0,
+            "sunday_discount": work_details.sunday_discount if work_details else 0,
+            "vacation_days": work_details.vacation_days if work_details else 0,
+            "vacation_hours": work_details.vacation_hours if work_details else 0,
+        } if work_details else None
+    }
+
+    return data
+
 class ProfileViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
 
@@ -111,8 +100,7 @@ class ProfileViewSet(viewsets.ViewSet):
             )
 
         try:
-            workbook = load_workbook(filename=file)
-            ws = workbook.active
+            reader = ExcelSheetReader(file)
         except Exception as e:
             return Response(
                 APIResponse.error(
@@ -122,94 +110,25 @@ class ProfileViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        headers = [str(cell.value).strip() if cell.value else '' for cell in ws[1]]
-        normalized_headers = [normalize(h) for h in headers]
-        column_map = {}
-
-        for idx, nh in enumerate(normalized_headers):
-            for field, variants in REQUIRED_COLUMNS.items():
-                if nh in [normalize(v) for v in variants]:
-                    column_map[idx] = field
-        
-        for idx, nh in enumerate(normalized_headers):
-            for field, variants in OPTIONAL_COLUMNS.items():
-                if nh in [normalize(v) for v in variants]:
-                    column_map[idx] = field
-
-        missing = [field for field in REQUIRED_COLUMNS.keys() if field not in column_map.values()]
-        if missing:
-            return Response(
-                APIResponse.error(
-                    message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
-                    code=status.HTTP_400_BAD_REQUEST
-                ),
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        results = {
-            'created_count': 0,
-            'updated_count': 0,
-            'skipped_rows': 0
-        }
-        error_messages = [] 
-
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-            row_data = {column_map[idx]: cell.value for idx, cell in enumerate(row) if idx in column_map}
-
-            dni = to_upper(row_data.get('dni'))
-            last_name = to_upper(row_data.get('last_name'))
-            first_name = to_upper(row_data.get('first_name'))
-
-            if not dni or not last_name or not first_name:
-                results['skipped_rows'] += 1
-                error_messages.append(f"Fila {row_idx}: DNI, Apellido o Nombre faltantes. (DNI: {dni or 'N/A'})")
-                continue
-
-            email = row_data.get('email')
-            user_data = {'first_name': first_name, 'last_name': last_name}
-            if email:
-                user_data['email'] = email
-
-            try:
-                user, created = User.objects.update_or_create(
-                    username=dni,
-                    defaults=user_data
+        with reader:
+            column_map = reader.map_columns(USER_COLUMN_LOOKUP)
+
+            missing = missing_columns(column_map, REQUIRED_COLUMNS)
+            if missing:
+                return Response(
+                    APIResponse.error(
+                        message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
+                        code=status.HTTP_400_BAD_REQUEST
+                    ),
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                if created:
-                    user.set_password(dni)
-                    user.save()
-                    results['created_count'] += 1
-                else:
-                    results['updated_count'] += 1
-            except Exception as e:
-                results['skipped_rows'] += 1
-                error_messages.append(f"Fila {row_idx}: Error al crear/actualizar usuario con DNI {dni}: {str(e)}")
-                continue
-
-            resigned_value = row_data.get('resigned')
-            resigned_bool = resigned_value in [1, "1", True, "TRUE", "True"]
-            profile_data = {
-                'user': user, 
-                'dni': dni, 
-                'role': 'user',
-                'position': to_upper(row_data.get('position')),
-                'description': to_upper(row_data.get('description')), 
-                'descriptionSP': to_upper(row_data.get('descriptionSP')),
-                'start_date': parse_date(row_data.get('start_date')),
-                'end_date': parse_date(row_data.get('end_date')), 
-                'resigned_date': parse_date(row_data.get('resigned_date')),
-                'resigned': resigned_bool, 
-                'regimen': to_upper(row_data.get('regimen')), 
-                'category': to_upper(row_data.get('category')),
-                'condition': to_upper(row_data.get('condition')),
-                'identification_code': to_upper(row_data.get('identification_code')),
-                'establishment': to_upper(row_data.get('establishment')),
-            }
-            try:
-                Profile.objects.update_or_create(user=user, defaults=profile_data)
-            except Exception as e:
-                error_messages.append(f"Fila {row_idx}: Error al actualizar perfil con DNI {dni}: {str(e)}")
 
+            if wants_background(request):
+                job = enqueue_import_job('users', file, request.user.profile)
+                return import_job_accepted(job, request)
+
+            results = import_user_rows(reader.iter_row_data(column_map))
+            error_messages = [message for _, message in results['errors']]
 
         final_messages = []
         
@@ -219,8 +138,8 @@ class ProfileViewSet(viewsets.ViewSet):
         if results['updated_count'] > 0:
             final_messages.append(f"{results['updated_count']} usuarios actualizados.")
 
-        if results['skipped_rows'] > 0:
-            final_messages.append(f"{results['skipped_rows']} filas fueron saltadas o con errores. ({len(error_messages)} errores detallados).")
+        if results['skipped_count'] > 0:
+            final_messages.append(f"{results['skipped_count']} filas fueron saltadas o con errores. ({len(error_messages)} errores detallados).")
 
         final_messages.extend(error_messages)
 
@@ -243,7 +162,11 @@ class ProfileViewSet(viewsets.ViewSet):
                     'messages': final_messages, 
                     'created_count': results['created_count'],
                     'updated_count': results['updated_count'],
-                    'skipped_rows': results['skipped_rows']
+                    'skipped_rows': results['skipped_count'],
+                    'timings': {
+                        'hashing_ms': results['hashing_ms'],
+                        'db_ms': results['db_ms']
+                    }
                 },
                 meta={  
                     "durationMs": int((time.time() - start_time) * 1000)
@@ -285,8 +208,7 @@ class ProfileViewSet(viewsets.ViewSet):
             )
 
         try:
-            workbook = load_workbook(filename=file)
-            ws = workbook.active
+            reader = ExcelSheetReader(file)
         except Exception as e:
             return Response(
                 APIResponse.error(
@@ -296,86 +218,29 @@ class ProfileViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        headers = [str(cell.value).strip() if cell.value else '' for cell in ws[1]]
-        normalized_headers = [normalize(h) for h in headers]
-
-        column_map = {}
-        for idx, nh in enumerate(normalized_headers):
-            for field, variants in WORK_DETAILS_COLUMNS.items():
-                if nh in [normalize(v) for v in variants]:
-                    column_map[idx] = field
-
-        missing = [field for field in WORK_DETAILS_COLUMNS.keys() if field not in column_map.values()]
-        if missing:
-            return Response(
-                APIResponse.error(
-                    message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
-                    code=status.HTTP_400_BAD_REQUEST
-                ),
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-        detailed_messages = [] 
-        
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2), start=2):
-            row_data = {column_map[idx]: cell.value for idx, cell in enumerate(row) if idx in column_map}
-
-            dni = to_upper(row_data.get('dni'))
-
-            if not dni:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: DNI es obligatorio.")
-                continue
+        with reader:
+            column_map = reader.map_columns(WORK_DETAILS_COLUMN_LOOKUP)
+
+            missing = missing_columns(column_map, WORK_DETAILS_COLUMNS)
+            if missing:
+                return Response(
+                    APIResponse.error(
+                        message=f"Faltan columnas obligatorias en el Excel: {', '.join(missing)}",
+                        code=status.HTTP_400_BAD_REQUEST
+                    ),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-            try:
-                profile = Profile.objects.get(dni=dni)
-            except Profile.DoesNotExist:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: No existe Profile con DNI {dni}.")
-                continue
-            except Exception as e:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: Error al buscar Profile con DNI {dni}: {str(e)}")
-                continue
-            
-            try:
-                work_data = {
-                    'worked_days': int(row_data.get('worked_days') or 0),
-                    'non_worked_days': int(row_data.get('non_worked_days') or 0),
-                    'worked_hours': int(row_data.get('worked_hours') or 0),
-                    'discount_academic_hours': int(row_data.get('discount_academic_hours') or 0),
-                    'discount_lateness': int(row_data.get('discount_lateness') or 0),
-                    'personal_leave_hours': int(row_data.get('personal_leave_hours') or 0),
-                    'sunday_discount': int(row_data.get('sunday_discount') or 0),
-                    'vacation_days': int(row_data.get('vacation_days') or 0),
-                    'vacation_hours': int(row_data.get('vacation_hours') or 0),
-                }
-            except ValueError as e:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: Error de formato numérico en datos laborales: {str(e)}")
-                continue
-            except Exception as e:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: Error al preparar datos laborales: {str(e)}")
-                continue
+            if wants_background(request):
+                job = enqueue_import_job('work_details', file, request.user.profile)
+                return import_job_accepted(job, request)
 
-            try:
-                work_details, created = ProfileWorkDetails.objects.update_or_create(
-                    profile=profile,
-                    defaults=work_data
-                )
-            except Exception as e:
-                skipped_count += 1
-                detailed_messages.append(f"Fila {row_idx}: Error al crear/actualizar WorkDetails para DNI {dni}: {str(e)}")
-                continue
+            result = import_work_details_rows(reader.iter_row_data(column_map))
 
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        created_count = result['created_count']
+        updated_count = result['updated_count']
+        skipped_count = result['skipped_count']
+        detailed_messages = [message for _, message in result['errors']]
 
         final_messages = []
         
@@ -429,6 +294,12 @@ class ProfileViewSet(viewsets.ViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        version = cache_version('profiles')
+        etag = make_etag('list-users', version, request.build_absolute_uri())
+        not_modified = not_modified_response(request, etag, version_timestamp(version))
+        if not_modified:
+            return not_modified
+
         try:
             page = int(request.query_params.get('page', 1))
             page_size = int(request.query_params.get('page_size', 20))
@@ -448,13 +319,30 @@ class ProfileViewSet(viewsets.ViewSet):
         queryset = Profile.objects.select_related('user').filter(role='user').order_by('-created_at')
 
         if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search)
-            )
+            queryset = queryset.filter(name_search_filter(search))
 
-        total = queryset.count()
-        profiles = queryset[offset:limit]
+        if wants_cursor_pagination(request):
+            try:
+                profiles, pagination = paginate_by_cursor(queryset, request, ('created_at', 'id'), page_size)
+            except InvalidCursor:
+                return Response(
+                    APIResponse.error(
+                        message="Cursor de paginación inválido.",
+                        code=status.HTTP_400_BAD_REQUEST
+                    ),
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            total = queryset.count()
+            profiles = queryset[offset:limit]
+            pagination = {
+                "current_page": page,
+                "page_size": page_size,
+                "total_items": total,
+                "total_pages": (total + page_size - 1) // page_size,
+                "has_next": limit < total,
+                "has_previous": page > 1
+            }
 
         results = []
         for p in profiles:
@@ -470,22 +358,17 @@ class ProfileViewSet(viewsets.ViewSet):
                 "created_at": p.created_at.isoformat() if p.created_at else None,
             })
 
-        pagination = {
-            "current_page": page,
-            "page_size": page_size,
-            "total_items": total,
-            "total_pages": (total + page_size - 1) // page_size,
-            "has_next": limit < total,
-            "has_previous": page > 1
-        }
-
-        return Response(
-            APIResponse.success(
-                data=results,
-                message=f"{len(results)} usuarios obtenidos.",
-                meta={"pagination": pagination}
+        return set_validators(
+            Response(
+                APIResponse.success(
+                    data=results,
+                    message=f"{len(results)} usuarios obtenidos.",
+                    meta={"pagination": pagination}
+                ),
+                status=status.HTTP_200_OK
             ),
-            status=status.HTTP_200_OK
+            etag,
+            version_timestamp(version)
         )
 
     @action(detail=False, methods=['get'], url_path='me')
@@ -500,46 +383,18 @@ class ProfileViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        work_details = getattr(profile, 'work_details', None)
-
-        data = {
-            "id": str(profile.id),
-            "dni": profile.dni,
-            "role": profile.role,
-            "first_name": request.user.first_name,
-            "last_name": request.user.last_name,
-            "email": request.user.email,
-            "username": request.user.username,
-            "position": profile.position,
-            "description": profile.description,
-            "descriptionSP": profile.descriptionSP,
-            "start_date": profile.start_date.isoformat() if profile.start_date else None,
-            "end_date": profile.end_date.isoformat() if profile.end_date else None,
-            "resigned_date": profile.resigned_date.isoformat() if profile.resigned_date else None,
-            "resigned": profile.resigned,
-            "regimen": profile.regimen,
-            "category": profile.category,
-            "condition": profile.condition,
-            "identification_code": profile.identification_code,
-            "establishment": profile.establishment,
-            "is_active": profile.is_active,
-            "work_details": {
-                "worked_days": work_details.worked_days if work_details else 0,
-                "non_worked_days": work_details.non_worked_days if work_details else 0,
-                "worked_hours": work_details.worked_hours if work_details else 0,
-                "discount_academic_hours": work_details.discount_academic_hours if work_details else 0,
-                "discount_lateness": work_details.discount_lateness if work_details else 0,
-                "personal_leave_hours": work_details.personal_leave_hours if work_details else 0,
-                "sunday_discount": work_details.sunday_discount if work_details else 0,
-                "vacation_days": work_details.vacation_days if work_details else 0,
-                "vacation_hours": work_details.vacation_hours if work_details else 0,
-            } if work_details else None
-        }
+        data, cache_hit = cached_for_profile(
+            'me',
+            profile.id,
+            [],
+            lambda: serialize_me(request.user, profile),
+        )
 
         return Response(
             APIResponse.success(
                 data=data,
-                message="Perfil obtenido correctamente."
+                message="Perfil obtenido correctamente.",
+                meta={"cacheHit": cache_hit}
             ),
             status=status.HTTP_200_OK
         )
@@ -591,6 +446,7 @@ class ProfileViewSet(viewsets.ViewSet):
 
         user.email = new_email
         user.save(update_fields=["email"])
+        invalidate_profile_cache([user.profile.id])
 
         create_audit_log(
             profile=request.user.profile,
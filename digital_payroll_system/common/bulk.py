@@ -0,0 +1,41 @@
+from django.db import transaction
+
+
+def bulk_create_rows(model, rows, batch_size=500, **options):
+    """
+    Inserta objetos por lotes con `bulk_create` (no dispara señales post_save). Si un lote
+    falla se reintenta fila a fila, cada una en su savepoint, para atribuir el error a su
+    fila. `rows` es una lista de (row_idx, objeto); devuelve {row_idx: error}.
+    """
+    failures = {}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in batch], **options)
+        except Exception:
+            for row_idx, obj in batch:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([obj], **options)
+                except Exception as e:
+                    failures[row_idx] = e
+    return failures
+
+
+def bulk_update_rows(model, rows, fields, batch_size=500):
+    """Igual que `bulk_create_rows`, pero con `bulk_update` sobre `fields`."""
+    failures = {}
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_update([obj for _, obj in batch], fields)
+        except Exception:
+            for row_idx, obj in batch:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_update([obj], fields)
+                except Exception as e:
+                    failures[row_idx] = e
+    return failures
@@ -0,0 +1,69 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = 'profile-cache:generation'
+
+def _version_key(profile_id):
+    return f"profile-cache:{profile_id}:version"
+
+def _current_version(key):
+    # Las versiones son marcas de tiempo en nanosegundos: sirven como Last-Modified y una
+    # versión perdida (p. ej. por desalojo) nunca vuelve a coincidir con entradas antiguas.
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+def profile_cache_state(profile_id):
+    """(generación global, versión del perfil) actuales."""
+    return _current_version(GENERATION_KEY), _current_version(_version_key(profile_id))
+
+def profile_cache_key(scope, profile_id, params=()):
+    """
+    Llave de una respuesta cacheada de un perfil. Incluye la versión del perfil y la
+    generación global, así que invalidar es solo avanzar una versión: las entradas
+    anteriores dejan de leerse y expiran solas.
+    """
+    generation, version = profile_cache_state(profile_id)
+    digest = hashlib.sha1(repr(sorted(params)).encode()).hexdigest()[:16]
+    return f"profile-cache:{scope}:{profile_id}:g{generation}:v{version}:{digest}"
+
+def cached_for_profile(scope, profile_id, params, builder, timeout=None):
+    """
+    Devuelve (valor, cache_hit). Si la llave no está en caché se calcula con `builder()`
+    y se guarda por `PROFILE_CACHE_TIMEOUT` segundos.
+    """
+    key = profile_cache_key(scope, profile_id, params)
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+
+    value = builder()
+    cache.set(key, value, settings.PROFILE_CACHE_TIMEOUT if timeout is None else timeout)
+    return value, False
+
+def _bump(key):
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), None)
+
+def invalidate_profile_cache(profile_ids):
+    """
+    Invalida las respuestas cacheadas de los perfiles indicados. Dentro de una transacción
+    se aplica al confirmarla, para que ninguna petición vuelva a cachear datos previos.
+    """
+    keys = [_version_key(profile_id) for profile_id in set(profile_ids)]
+    transaction.on_commit(lambda: [_bump(key) for key in keys])
+
+def invalidate_all_profile_caches():
+    transaction.on_commit(lambda: _bump(GENERATION_KEY))
+
+def cache_version(name):
+    """Versión (marca de tiempo en ns) de un conjunto de datos compartido, p. ej. 'profiles'."""
+    return _current_version(f"cache-version:{name}")
+
+def bump_cache_version(*names):
+    keys = [f"cache-version:{name}" for name in names]
+    transaction.on_commit(lambda: [_bump(key) for key in keys])
@@ -0,0 +1,29 @@
+import hashlib
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha1(repr(parts).encode()).hexdigest())
+
+def version_timestamp(*versions):
+    """Convierte versiones de caché (marcas de tiempo en ns) en segundos para Last-Modified."""
+    return max(versions) // 1_000_000_000
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # El navegador guarda la respuesta pero la revalida siempre con If-None-Match.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+def not_modified_response(request, etag, last_modified=None):
+    """
+    Responde 304 si el cliente ya tiene esta versión (If-None-Match / If-Modified-Since),
+    antes de consultar o serializar nada. Devuelve None si hay que generar la respuesta.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
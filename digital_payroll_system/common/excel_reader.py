@@ -0,0 +1,73 @@
+import unicodedata
+from openpyxl import load_workbook
+
+
+def normalize(s):
+    """Quita acentos, espacios y pasa a minúsculas"""
+    if not s:
+        return ''
+    s = ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+    return s.replace(' ', '').lower()
+
+
+def compile_columns(*column_specs):
+    """
+    Compila una o más especificaciones {campo: [variantes]} en un índice
+    {variante_normalizada: campo}. Las especificaciones posteriores tienen prioridad.
+    """
+    lookup = {}
+    for spec in column_specs:
+        for field, variants in spec.items():
+            for variant in variants:
+                lookup[normalize(variant)] = field
+    return lookup
+
+
+def missing_columns(column_map, *column_specs):
+    mapped = set(column_map.values())
+    return [field for spec in column_specs for field in spec.keys() if field not in mapped]
+
+
+class ExcelSheetReader:
+    """
+    Lector en streaming de la hoja activa de un Excel (.xlsx).
+    Usa el modo read-only de openpyxl y entrega las filas como tuplas de valores,
+    por lo que la memoria no crece con el tamaño de la hoja.
+    """
+
+    def __init__(self, file):
+        self.workbook = load_workbook(filename=file, read_only=True)
+        self.worksheet = self.workbook.active
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    @property
+    def max_row(self):
+        return self.worksheet.max_row
+
+    def headers(self):
+        first_row = next(self.worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        return [str(value).strip() if value else '' for value in first_row]
+
+    def map_columns(self, lookup):
+        """Devuelve {índice_columna: campo} a partir de un índice compilado con `compile_columns`."""
+        column_map = {}
+        for idx, header in enumerate(self.headers()):
+            field = lookup.get(normalize(header))
+            if field:
+                column_map[idx] = field
+        return column_map
+
+    def iter_row_data(self, column_map, min_row=2):
+        """Genera (row_idx, {campo: valor}) para cada fila de datos."""
+        columns = sorted(column_map.items())
+        for row_idx, values in enumerate(self.worksheet.iter_rows(min_row=min_row, values_only=True), start=min_row):
+            size = len(values)
+            yield row_idx, {field: values[idx] for idx, field in columns if idx < size}
@@ -0,0 +1,101 @@
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+from .conditional import make_etag, not_modified_response, set_validators
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+def parse_range(header, size):
+    """
+    (inicio, fin) inclusivos del rango pedido en `Range`, o None para enviar el archivo
+    completo (sin cabecera, con varios rangos o con un formato que no se reconoce).
+    """
+    match = RANGE_PATTERN.match((header or '').strip())
+    if not match or not any(match.groups()):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+
+    if start > end or start >= size:
+        raise RangeNotSatisfiable()
+    return start, end
+
+class FileRangeReader:
+    """Lee `length` bytes de `file` desde su posición actual; FileResponse lo recorre por bloques."""
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+def stored_file_response(request, field_file, filename, etag=None, content_type='application/pdf', as_attachment=False):
+    """
+    Respuesta para un archivo del storage ya autorizado. Con `FILE_DOWNLOAD_SENDFILE`
+    ('x-accel-redirect' o 'x-sendfile') solo envía la cabecera y el proxy sirve los bytes;
+    si no, lo transmite con FileResponse atendiendo `Range` (206) e `If-Range`. En ambos
+    casos responde 304 a las peticiones condicionales con ETag / Last-Modified vigentes.
+    """
+    storage = field_file.storage
+    name = field_file.name
+    size = storage.size(name)
+    last_modified = int(storage.get_modified_time(name).timestamp())
+    etag = etag or make_etag(name, size, last_modified)
+
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    disposition = content_disposition_header(as_attachment, filename)
+    mode = settings.FILE_DOWNLOAD_SENDFILE
+
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(f"{settings.FILE_DOWNLOAD_ACCEL_PREFIX}{name}")
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = storage.path(name)
+    else:
+        byte_range = None
+        if request.headers.get('If-Range') in (None, etag):
+            try:
+                byte_range = parse_range(request.headers.get('Range'), size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f"bytes */{size}"
+                return set_validators(response, etag, last_modified)
+
+        file = storage.open(name, 'rb')
+        if byte_range:
+            start, end = byte_range
+            file.seek(start)
+            response = FileResponse(FileRangeReader(file, end - start + 1), status=206, content_type=content_type)
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(file, content_type=content_type)
+            response['Content-Length'] = size
+        response['Accept-Ranges'] = 'bytes'
+
+    if disposition:
+        response['Content-Disposition'] = disposition
+    return set_validators(response, etag, last_modified)
@@ -0,0 +1,90 @@
+import base64
+import json
+from django.db.models import Q
+
+CURSOR_PARAM = 'cursor'
+
+class InvalidCursor(ValueError):
+    pass
+
+def wants_cursor_pagination(request):
+    """La paginación por cursor es opcional: se activa con ?pagination=cursor o enviando un ?cursor=."""
+    return request.query_params.get('pagination') == 'cursor' or bool(request.query_params.get(CURSOR_PARAM))
+
+def wants_total(request):
+    return request.query_params.get('with_total', '').lower() in ('1', 'true')
+
+def _serialize(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'d': direction, 'k': [_serialize(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, size):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        direction, values = payload['d'], payload['k']
+    except Exception:
+        raise InvalidCursor(token)
+
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(token)
+    return direction, values
+
+def _key(item, fields):
+    return [item[f] if isinstance(item, dict) else getattr(item, f) for f in fields]
+
+def _beyond(fields, values, descending):
+    """Condición de fila (a, b, ...) < (va, vb, ...) (o > en orden ascendente) expresada con Q."""
+    lookup = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        equal = {fields[j]: values[j] for j in range(i)}
+        condition |= Q(**equal, **{f"{field}__{lookup}": values[i]})
+    return condition
+
+def paginate_by_cursor(queryset, request, fields, page_size):
+    """
+    Paginación por llave (keyset) en orden descendente sobre `fields`, por ejemplo
+    ('issue_date', 'id') o ('created_at', 'id'). En lugar de OFFSET se filtra a partir de
+    la llave del último elemento entregado, por lo que el costo no crece con la
+    profundidad de la página. El total solo se calcula si se pide con ?with_total=1.
+
+    Devuelve (items, pagination). Lanza InvalidCursor si el cursor no es válido.
+    """
+    token = request.query_params.get(CURSOR_PARAM)
+    direction, values = decode_cursor(token, len(fields)) if token else ('next', None)
+    backwards = direction == 'prev'
+
+    page_qs = queryset.order_by(*[f if backwards else f"-{f}" for f in fields])
+    if values is not None:
+        page_qs = page_qs.filter(_beyond(fields, values, descending=not backwards))
+
+    items = list(page_qs[:page_size + 1])
+    has_more = len(items) > page_size
+    if backwards and not has_more:
+        # Retrocediendo se llegó al inicio sin llenar la página: se entrega la primera página
+        # completa y `has_next` sale de la fila centinela, igual que al avanzar.
+        backwards, values = False, None
+        items = list(queryset.order_by(*[f"-{f}" for f in fields])[:page_size + 1])
+        has_more = len(items) > page_size
+    items = items[:page_size]
+    if backwards:
+        items.reverse()
+
+    has_next = True if backwards else has_more
+    has_previous = has_more if backwards else values is not None
+
+    pagination = {
+        "mode": "cursor",
+        "page_size": page_size,
+        "next_cursor": encode_cursor(_key(items[-1], fields), 'next') if has_next and items else None,
+        "previous_cursor": encode_cursor(_key(items[0], fields), 'prev') if has_previous and items else None,
+        "has_next": has_next and bool(items),
+        "has_previous": has_previous and bool(items),
+    }
+    if wants_total(request):
+        pagination["total_items"] = queryset.count()
+
+    return items, pagination
@@ -16,7 +16,7 @@ class APIResponse:
             "meta": {
                 "durationMs": int((time.time() - start) * 1000),
                 "version": "v1.0.0",
-                "cacheHit": False,
+                "cacheHit": meta.get("cacheHit", False) if meta else False,
                 "pagination": meta.get("pagination") if meta else None,
                 "warnings": meta.get("warnings") if meta else [],
             }
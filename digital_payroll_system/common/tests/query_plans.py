@@ -0,0 +1,63 @@
+import re
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+def explain(sql):
+    """Plan de una consulta SQL ya capturada, con la configuración normal del planificador."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"EXPLAIN {sql}")
+            return "\n".join(row[0] for row in cursor.fetchall())
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(row[-1] for row in cursor.fetchall())
+
+def full_scans(plan, table):
+    """Líneas del plan en las que `table` se recorre completa, sin índice."""
+    if connection.vendor == 'postgresql':
+        pattern = rf"Seq Scan on {re.escape(table)}\b"
+    else:
+        pattern = rf"\bSCAN {re.escape(table)}\s*$"
+    return [line.strip() for line in plan.splitlines() if re.search(pattern, line.strip())]
+
+class QueryPlanAssertionsMixin:
+    """
+    Revisa el plan de las consultas que ejecuta de verdad un endpoint o servicio, en lugar
+    de querysets escritos a mano en la prueba. En PostgreSQL se ejecuta ANALYZE antes de
+    EXPLAIN para que el planificador vea el volumen de datos sembrado por la prueba.
+    """
+
+    def captureQueries(self, run, table, contains=None):
+        """Ejecuta `run()` y devuelve los SELECT que leen `table` (y contienen `contains`)."""
+        with CaptureQueriesContext(connection) as context:
+            run()
+        quoted = f'"{table}"'
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].lstrip().upper().startswith('SELECT')
+            and quoted in query['sql']
+            and (contains is None or contains in query['sql'])
+        ]
+
+    def assertQueriesUseIndex(self, run, table, index=None, contains=None):
+        """
+        Falla si alguna consulta de `run()` sobre `table` (filtrada por `contains`) la recorre
+        completa o, si se indica, si ninguna usa el índice `index`. Devuelve los planes.
+        """
+        queries = self.captureQueries(run, table, contains)
+        self.assertTrue(queries, f"No se ejecutó ninguna consulta sobre {table} que contenga {contains!r}.")
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        plans = []
+        for sql in queries:
+            plan = explain(sql)
+            self.assertFalse(full_scans(plan, table), f"La consulta recorre {table} sin índice:\n{sql}\n{plan}")
+            plans.append(plan)
+        if index:
+            self.assertTrue(
+                any(index in plan for plan in plans),
+                f"Ninguna consulta usa el índice {index}:\n" + "\n\n".join(plans)
+            )
+        return plans
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+class ZipChunkBuffer(io.RawIOBase):
+    """
+    Destino de escritura no posicionable para ZipFile: acumula lo escrito hasta que el
+    generador lo entrega. Al no poder hacer seek, zipfile escribe cada entrada con
+    descriptor de datos (CRC y tamaños al final) y nunca vuelve atrás.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def iter_zip(entries, chunk_size=64 * 1024):
+    """
+    Genera un ZIP por partes a partir de `entries`: (nombre en el ZIP, función que abre el
+    archivo en binario, tamaño, fecha de modificación). Solo hay en memoria un bloque de
+    `chunk_size` a la vez. Los PDF ya vienen comprimidos, así que se guardan sin deflate.
+    """
+    buffer = ZipChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for arcname, opener, size, modified in entries:
+            info = zipfile.ZipInfo(arcname, date_time=modified.timetuple()[:6])
+            info.file_size = size
+            with opener() as source, archive.open(info, 'w') as target:
+                for chunk in iter(lambda: source.read(chunk_size), b''):
+                    target.write(chunk)
+                    data = buffer.take()
+                    if data:
+                        yield data
+            data = buffer.take()
+            if data:
+                yield data
+    yield buffer.take()
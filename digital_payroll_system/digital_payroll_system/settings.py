@@ -7,6 +7,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+from corsheaders.defaults import default_headers
 
 # Carga de variables de entorno (.env)
 load_dotenv()
@@ -25,6 +26,10 @@ ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
 
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:4200,http://127.0.0.1:4200').split(',')
 
+# Peticiones condicionales (ETag / Last-Modified) desde el front end
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'if-modified-since')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
+
 CORS_ALLOW_METHODS = [
     "DELETE",
     "GET",
@@ -58,7 +63,8 @@ LOCAL_APPS = [
     'apps.payslips',
     'apps.password_resets',
     'apps.audit_logs',
-    'apps.notifications'
+    'apps.notifications',
+    'apps.import_jobs'
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -145,8 +151,66 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Descarga protegida de PDF (download-payslip). Django valida el acceso y, si hay proxy, le delega
+# el envío: 'x-accel-redirect' (nginx, con `location /protected-media/ { internal; alias <MEDIA_ROOT>/; }`)
+# o 'x-sendfile' (Apache). Vacío: Django transmite el archivo con soporte de Range.
+FILE_DOWNLOAD_SENDFILE = os.environ.get('FILE_DOWNLOAD_SENDFILE', '')
+FILE_DOWNLOAD_ACCEL_PREFIX = os.environ.get('FILE_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Importaciones de Excel en segundo plano (manage.py process_import_jobs)
+IMPORT_JOB_CHUNK_SIZE = int(os.environ.get('IMPORT_JOB_CHUNK_SIZE', 500))
+# Un trabajo 'running' sin avance (updated_at) durante este tiempo se considera abandonado por un
+# worker caído y se retoma desde la última fila confirmada, hasta IMPORT_JOB_MAX_ATTEMPTS veces.
+IMPORT_JOB_STALE_AFTER = int(os.environ.get('IMPORT_JOB_STALE_AFTER', 15 * 60))
+IMPORT_JOB_MAX_ATTEMPTS = int(os.environ.get('IMPORT_JOB_MAX_ATTEMPTS', 3))
+
+# Generación de boletas en PDF (manage.py process_render_jobs). Con PAYSLIP_RENDER_IN_BACKGROUND=False
+# generate-payslip genera el PDF dentro de la petición, como antes.
+PAYSLIP_RENDER_IN_BACKGROUND = os.environ.get('PAYSLIP_RENDER_IN_BACKGROUND', 'True') == 'True'
+PAYSLIP_RENDER_MAX_ATTEMPTS = int(os.environ.get('PAYSLIP_RENDER_MAX_ATTEMPTS', 3))
+PAYSLIP_RENDER_RETRY_DELAY = int(os.environ.get('PAYSLIP_RENDER_RETRY_DELAY', 30))
+# Un trabajo 'running' sin avance (updated_at) durante este tiempo se considera abandonado por un
+# worker caído y vuelve a la cola, hasta PAYSLIP_RENDER_MAX_ATTEMPTS intentos.
+PAYSLIP_RENDER_STALE_AFTER = int(os.environ.get('PAYSLIP_RENDER_STALE_AFTER', 15 * 60))
+# Backend de los PDF de boletas: 'pisa' (boleta.html con xhtml2pdf) o 'reportlab' (canvas directo).
+# Comparar con manage.py benchmark_payslip_renderers.
+PAYSLIP_PDF_RENDERER = os.environ.get('PAYSLIP_PDF_RENDERER', 'pisa')
+# Generación masiva de un periodo: procesos que renderizan en paralelo y boletas por lote guardado
+PAYSLIP_RENDER_WORKERS = int(os.environ.get('PAYSLIP_RENDER_WORKERS', os.cpu_count() or 1))
+PAYSLIP_RENDER_BATCH_SIZE = int(os.environ.get('PAYSLIP_RENDER_BATCH_SIZE', 200))
+# Optimización de los PDF con pypdf antes de guardarlos (streams comprimidos, objetos repetidos fusionados)
+PAYSLIP_PDF_OPTIMIZE = os.environ.get('PAYSLIP_PDF_OPTIMIZE', 'False') == 'True'
+# Firma digital de los PDF (pyHanko): ruta a un PKCS#12 local con el certificado y la clave.
+# Vacío: las boletas se guardan sin firmar.
+PAYSLIP_SIGNING_PKCS12 = os.environ.get('PAYSLIP_SIGNING_PKCS12', '')
+PAYSLIP_SIGNING_PASSWORD = os.environ.get('PAYSLIP_SIGNING_PASSWORD', '')
+PAYSLIP_SIGNING_LOCATION = os.environ.get('PAYSLIP_SIGNING_LOCATION', '')
+# Vigencia (segundos) de los enlaces de descarga firmados de los correos y QR, que no requieren sesión
+PAYSLIP_DOWNLOAD_LINK_MAX_AGE = int(os.environ.get('PAYSLIP_DOWNLOAD_LINK_MAX_AGE', 30 * 24 * 60 * 60))
+
+# Procesos usados para calcular los hashes de contraseñas en la carga masiva de usuarios
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+
+# Caché de respuestas por perfil (my-payslips, profiles/me). Con varios procesos (gunicorn,
+# worker de importaciones) usar un backend compartido, p. ej. FileBasedCache en un volumen común.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'boletas-cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 50000)),
+        },
+    }
+}
+PROFILE_CACHE_TIMEOUT = int(os.environ.get('PROFILE_CACHE_TIMEOUT', 3600))
+
+# QR de los correos de boletas: 'compact' (módulos de 4 px) o 'default' (10 px, el tamaño original).
+# Se guardan en la caché anterior por contenido durante QR_CODE_CACHE_TIMEOUT segundos.
+QR_CODE_STYLE = os.environ.get('QR_CODE_STYLE', 'compact')
+QR_CODE_CACHE_TIMEOUT = int(os.environ.get('QR_CODE_CACHE_TIMEOUT', 30 * 24 * 3600))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(weeks=1),
@@ -161,4 +225,7 @@ EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER') 
-EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
+# Envíos masivos (correos de boletas de un periodo): mensajes por conexión SMTP antes de cerrarla
+# y abrir otra (p. ej. Gmail limita los mensajes por sesión)
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 100))
@@ -1,7 +1,5 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,4 +8,5 @@ urlpatterns = [
     path('api/payslips/', include('apps.payslips.urls')),
     #path('api/password-resets/', include('apps.password_resets.urls')),
     path('api/audit-logs/', include('apps.audit_logs.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('api/import-jobs/', include('apps.import_jobs.urls')),
+]
\ No newline at end of file